@@ -12,13 +12,18 @@ import os
 from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
-import management.routing
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "TaskHive.settings")
 
+# sets Django up, which the consumers' model imports need when a server
+# such as daphne loads this module on its own
+django_asgi_application = get_asgi_application()
+
+import management.routing  # noqa: E402
+
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_application,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             management.routing.websocket_urlpatterns
@@ -44,8 +44,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "management.middleware.instrumentation.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "management.middleware.static_files.AsyncWhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -55,6 +56,43 @@ MIDDLEWARE = [
     "management.middleware.custom_middleware.RequireOrganizationMiddleware"
 ]
 
+# Two cache tiers: a per-process LRU in front of a tier shared by every process
+# (the database cache by default, any Django backend through the environment).
+# Local copies live at most CACHE_LOCAL_TIMEOUT seconds, which bounds how long
+# another process can serve a value that was changed or invalidated elsewhere.
+CACHE_LOCAL_TIMEOUT = int(os.environ.get("CACHE_LOCAL_TIMEOUT", 5))
+CACHES = {
+    "default": {
+        "BACKEND": "management.cache_backends.TieredCache",
+        "OPTIONS": {"LOCAL": "local", "SHARED": "shared", "LOCAL_TIMEOUT": CACHE_LOCAL_TIMEOUT},
+    },
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "taskhive",
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_LOCAL_MAX_ENTRIES", 5000))},
+    },
+    "shared": {
+        "BACKEND": os.environ.get("CACHE_SHARED_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.environ.get("CACHE_SHARED_LOCATION", "taskhive_cache"),
+    },
+}
+# Django culls a database cache at 300 rows, far below the calendar, fragment and
+# version keys of even a small deployment; a culled version key resets the version.
+# Other backends bound themselves (and reject the option).
+if CACHES["shared"]["BACKEND"] == "django.core.cache.backends.db.DatabaseCache":
+    CACHES["shared"]["OPTIONS"] = {"MAX_ENTRIES": int(os.environ.get("CACHE_SHARED_MAX_ENTRIES", 200000))}
+
+# Process-local LRU of organization rows used by RequireOrganizationMiddleware
+ORGANIZATION_CACHE_SIZE = 256
+ORGANIZATION_CACHE_TTL = 300
+
+# Rolling per-view query/timing summary of QueryInstrumentationMiddleware
+INSTRUMENTATION_WINDOW = 200
+INSTRUMENTATION_SUMMARY_INTERVAL = 60
+INSTRUMENTATION_SUMMARY_PATH = os.environ.get("INSTRUMENTATION_SUMMARY_PATH")
+# Template time needs a wrapper around every Template.render() call
+INSTRUMENTATION_TEMPLATE_TIMING = os.environ.get("INSTRUMENTATION_TEMPLATE_TIMING", "True") == "True"
+
 ROOT_URLCONF = "TaskHive.urls"
 
 TEMPLATES = [
@@ -76,11 +114,50 @@ TEMPLATES = [
 WSGI_APPLICATION = "TaskHive.wsgi.application"
 
 
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
+# "memory" only works with a single worker process; "postgres" and "socket" share
+# groups between processes (see management/layers.py)
+CHANNEL_LAYER_BACKEND = os.environ.get("CHANNEL_LAYER_BACKEND", "memory")
+
+if CHANNEL_LAYER_BACKEND == "postgres":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "management.layers.BrokerChannelLayer",
+            "CONFIG": {
+                "broker": "management.layers.PostgresBroker",
+            },
+        }
     }
-}
+elif CHANNEL_LAYER_BACKEND == "socket":
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "management.layers.BrokerChannelLayer",
+            "CONFIG": {
+                "broker": "management.layers.SocketBroker",
+                "broker_options": {
+                    "host": os.environ.get("CHANNEL_HUB_HOST", "127.0.0.1"),
+                    "port": int(os.environ.get("CHANNEL_HUB_PORT", 8765)),
+                },
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        }
+    }
+
+# Save chat messages in batches after broadcasting them instead of one INSERT per line
+CHAT_WRITE_BEHIND = os.environ.get("CHAT_WRITE_BEHIND", "") == "True"
+CHAT_WRITE_BEHIND_BATCH_SIZE = int(os.environ.get("CHAT_WRITE_BEHIND_BATCH_SIZE", 100))
+CHAT_WRITE_BEHIND_INTERVAL = float(os.environ.get("CHAT_WRITE_BEHIND_INTERVAL", 0.05))
+
+# Dashboard visits are counted in memory and written to WorkerStats every interval (seconds)
+VISIT_FLUSH_INTERVAL = float(os.environ.get("VISIT_FLUSH_INTERVAL", 60))
+
+# URL names (without the namespace) served by the async views of management/async_views.py,
+# e.g. ASYNC_VIEWS=index,task-list; "all" switches every view that has an async version
+ASYNC_VIEWS = [name for name in os.environ.get("ASYNC_VIEWS", "").split(",") if name]
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
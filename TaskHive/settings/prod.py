@@ -21,5 +21,42 @@ DATABASES = {
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": int(os.environ["POSTGRES_DB_PORT"]),
+        # persistent connections, checked before reuse after errors
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
     }
-}
\ No newline at end of file
+}
+
+# With DB_POOL=True every process borrows connections from a bounded pool
+# (management/db/pool.py) and returns them when Django closes them, so
+# connections follow requests and consumer calls instead of the threads
+# daphne runs them on. Pool metrics are part of the instrumentation summary;
+# `manage.py loadtest_db_pool` checks connection counts under load.
+if os.environ.get("DB_POOL", "") == "True":
+    DATABASES["default"].update({
+        "ENGINE": "management.db.postgresql",
+        "CONN_MAX_AGE": 0,
+        "POOL": {
+            "MAX_SIZE": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+            "MIN_SIZE": int(os.environ.get("DB_POOL_MIN_SIZE", 0)),
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+            "MAX_IDLE": float(os.environ.get("DB_POOL_MAX_IDLE", 300)),
+            "MAX_LIFETIME": float(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+        },
+    })
+
+# Sessions are read on every request and written only on login/logout.
+# cached_db serves reads from the cache and keeps the database as the store
+# of record, so restarts and cache evictions do not log anyone out;
+# signed_cookies is as fast but cannot be revoked server side. With the
+# default database cache as the shared tier a cached read is a query on the
+# cache table followed by one on the session table on a miss, so plain db
+# sessions are used there; with any other shared backend sessions are cached
+# in it directly, skipping the per-process tier that could serve a session
+# for a few seconds after logout.
+# Compare engines with `manage.py benchmark_sessions`.
+if CACHES["shared"]["BACKEND"] == "django.core.cache.backends.db.DatabaseCache":
+    SESSION_ENGINE = os.environ.get("SESSION_ENGINE", "django.contrib.sessions.backends.db")
+else:
+    SESSION_ENGINE = os.environ.get("SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+    SESSION_CACHE_ALIAS = "shared"
@@ -10,4 +10,10 @@ pip install -r requirements.txt
 python manage.py collectstatic --no-input
 
 # Apply any outstanding database migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# Table of the shared cache tier; migrate creates it, this covers a changed CACHE_SHARED_LOCATION
+python manage.py createcachetable
+
+# Build the full-text search index on first deploy
+python manage.py rebuild_search_index --if-empty
@@ -1,12 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from management.models import Worker
+from management.models import Position, Worker
 
 
 @admin.register(Worker)
 class WorkerAdmin(UserAdmin):
     list_display = UserAdmin.list_display + ("position",)
+    list_select_related = ("position__department",)
     fieldsets = UserAdmin.fieldsets + (
         (("Additional info", {"fields": ("position",)}),)
     )
@@ -23,4 +24,9 @@ class WorkerAdmin(UserAdmin):
                 },
             ),
         )
-    )
\ No newline at end of file
+    )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "position":
+            kwargs["queryset"] = Position.objects.with_labels()
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
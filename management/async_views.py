@@ -0,0 +1,218 @@
+"""
+Async versions of the busiest read views, served instead of the sync ones for
+the URL names listed in settings.ASYNC_VIEWS.
+
+They load their data with the async ORM. Templates still render in a sync
+thread: fragment caching, the session-backed messages and relations the
+templates follow may reach the database.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Prefetch
+from django.http import Http404
+from django.shortcuts import render
+from django.utils.functional import empty
+
+from management.board import build_status_groups, worker_tasks
+from management.calendar_data import aget_month_tasks
+from management.dashboard import aget_dashboard_stats
+from management.forms import CommentForm, SearchForm
+from management.models import Comment, Project, Task
+from management.pagination import CursorPaginator
+from management.tenancy import request_org_id
+from management.views import calendar_context, calendar_month
+from management.visits import avisit_count, visit_counter
+
+
+def login_required(view):
+    """django.contrib.auth's login_required only wraps sync views before Django 5.0."""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if getattr(request.user, "_wrapped", None) is empty:
+            await sync_to_async(request.user._setup)()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def _render(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+async def _get_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404(f"No {queryset.model._meta.verbose_name} found matching the query")
+
+
+async def _search(request, queryset, organization_id=None):
+    """SearchForm.search(); the search index is read with raw SQL, which has no async API."""
+    form = SearchForm(request.GET)
+    if not form.is_valid() or not form.cleaned_data.get("query"):
+        return queryset
+    return await sync_to_async(form.search)(queryset, organization_id)
+
+
+def _search_form(request, placeholder):
+    form = SearchForm(initial={"query": request.GET.get("query", "")})
+    form.fields["query"].widget.attrs["placeholder"] = placeholder
+    return form
+
+
+async def _cursor_page(request, queryset, per_page, ordering):
+    """Keyset pagination as CursorPaginationMixin and SearchRankOrderingMixin do it."""
+    if "search_rank" in queryset.query.annotations:
+        ordering = ("-search_rank", "id")
+    paginator = CursorPaginator(queryset, per_page, ordering)
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except ValueError:
+        raise Http404("Invalid cursor")
+    return paginator, page
+
+
+async def _number_page(request, queryset, per_page):
+    paginator = Paginator(queryset, per_page)
+    paginator.count = await queryset.acount()
+    number = request.GET.get("page") or 1
+    if number == "last":
+        number = paginator.num_pages
+    try:
+        page = paginator.page(number)
+    except InvalidPage as e:
+        raise Http404(f"Invalid page ({number}): {e}")
+    page.object_list = [obj async for obj in page.object_list]
+    return paginator, page
+
+
+def _list_context(name, paginator, page):
+    return {
+        "paginator": paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages(),
+        "object_list": page.object_list,
+        name: page.object_list,
+    }
+
+
+@login_required
+async def index(request):
+    organization_id = request_org_id(request)
+    num_visits = await avisit_count(request.user.id)
+    visit_counter.record(request.user.id)
+
+    # left lazy: the project dropdown is a cached fragment
+    project_list = Project.objects.filter(organization_id=organization_id)
+    project_id = request.GET.get("project")
+    selected_project = None
+    if project_id:
+        selected_project = await project_list.filter(id=project_id).afirst()
+    selected_id = selected_project.id if selected_project else None
+
+    year, month = calendar_month(request)
+    tasks = await aget_month_tasks(request.user.id, year, month, selected_id)
+    stats = await aget_dashboard_stats(organization_id, selected_id)
+    context = {
+        "num_visits": num_visits,
+        "project_list": project_list,
+        "selected_project": selected_project,
+        **stats,
+        **calendar_context(request, year, month, tasks),
+    }
+    return await _render(request, "management/index.html", context)
+
+
+@login_required
+async def task_list(request):
+    organization_id = request_org_id(request)
+    tasks = Task.objects.select_related("type").filter(organization_id=organization_id, workers=request.user)
+    tasks = await _search(request, tasks, organization_id)
+    paginator, page = await _cursor_page(request, tasks, 20, ("id",))
+    rows = worker_tasks(request.user).values("id", "name", "status")
+
+    context = {
+        **_list_context("task_list", paginator, page),
+        "query": request.GET.get("query", ""),
+        "search_form": _search_form(request, "Search tasks..."),
+        "status_groups": build_status_groups([row async for row in rows]),
+    }
+    return await _render(request, "management/task_list.html", context)
+
+
+@login_required
+async def task_detail(request, pk):
+    tasks = Task.objects.filter(organization_id=request_org_id(request))
+    task = await _get_or_404(tasks.select_related("project").prefetch_related("workers"), pk=pk)
+    return await _render(request, "management/task_detail.html", {"object": task, "task": task})
+
+
+@login_required
+async def project_list(request):
+    projects = Project.objects.filter(teams__workers=request.user).distinct()
+    projects = await _search(request, projects, request_org_id(request))
+    paginator, page = await _number_page(request, projects, 10)
+
+    context = {
+        **_list_context("project_list", paginator, page),
+        "query": request.GET.get("query", ""),
+        "search_form": _search_form(request, "Search projects..."),
+    }
+    return await _render(request, "management/project_list.html", context)
+
+
+@login_required
+async def project_detail(request, pk):
+    projects = Project.objects.filter(organization_id=request_org_id(request))
+    project = await _get_or_404(projects.prefetch_related("teams"), pk=pk)
+    comments = Comment.objects.select_related("worker").order_by("created_at", "id")
+    tasks = project.task_set.prefetch_related(Prefetch("comment_set", queryset=comments))
+    tasks = await _search(request, tasks, project.organization_id)
+
+    context = {
+        "object": project,
+        "project": project,
+        "comment_form": CommentForm(),
+        "search_form": _search_form(request, "Search tasks..."),
+        "tasks": [task async for task in tasks],
+    }
+    return await _render(request, "management/project_detail.html", context)
+
+
+@login_required
+async def comment_list(request):
+    organization_id = request_org_id(request)
+    comments = Comment.objects.select_related("worker", "task").filter(organization_id=organization_id)
+    comments = comments.exclude(worker=request.user).filter(task__workers=request.user)
+    comments = await _search(request, comments, organization_id)
+    paginator, page = await _cursor_page(request, comments, 10, ("-created_at", "-id"))
+
+    context = {
+        **_list_context("comment_list", paginator, page),
+        "query": request.GET.get("query", ""),
+        "search_form": _search_form(request, "Search comments..."),
+    }
+    return await _render(request, "management/comment_list.html", context)
+
+
+VIEWS = {
+    "index": index,
+    "task-list": task_list,
+    "task-detail": task_detail,
+    "project-list": project_list,
+    "project-detail": project_detail,
+    "comment-list": comment_list,
+}
+
+
+def select_view(name, sync_view):
+    """The async version of a view if its URL name is in settings.ASYNC_VIEWS (or it holds "all")."""
+    if name in VIEWS and (name in settings.ASYNC_VIEWS or "all" in settings.ASYNC_VIEWS):
+        return VIEWS[name]
+    return sync_view
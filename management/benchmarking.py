@@ -0,0 +1,392 @@
+"""
+Helpers of the benchmark commands: a weighted mix of requests against the
+management views, drivers replaying it in-process through the WSGI or the
+ASGI application, JSON baselines to compare runs with, and websockets that
+talk to the ASGI application in-process or to a server over a real socket.
+
+Queries per request come from the instrumentation middleware's
+request_measured signal, matched to the request that caused them by an
+X-Benchmark-Id header, so they are counted the same way in both modes.
+"""
+import asyncio
+import base64
+import hashlib
+import html
+import itertools
+import json
+import os
+import re
+import struct
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from management.middleware.instrumentation import request_measured
+from management.models import Project, Task
+
+HEADER = "X-Benchmark-Id"
+
+# samples of the requests in flight by their X-Benchmark-Id, filled in by _measured
+_samples = {}
+_ids = itertools.count()
+
+SEARCH_TERMS = ("fix", "login", "report", "api", "page", "test")
+
+NEXT_LINK = re.compile(r'href="\?([^"]*)">Next<')
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[int((len(values) - 1) * fraction)]
+
+
+def _measured(sender, request, view_name, stats, **kwargs):
+    sample = _samples.get(request.headers.get(HEADER))
+    if sample is not None:
+        sample["view"] = view_name
+        sample["queries"] = stats.queries
+
+
+def _new_sample():
+    """An id for the header of the next request and the sample _measured fills in for it."""
+    sample_id = str(next(_ids))
+    _samples[sample_id] = sample = {}
+    return sample_id, sample
+
+
+class Entry:
+    """A kind of request of the mix: a label, its weight and the paths to pick from."""
+
+    def __init__(self, label, weight, paths):
+        self.label = label
+        self.weight = weight
+        self.paths = paths
+
+
+def _next_page(client, path):
+    """The query string of the Next link of a list page, if it has one."""
+    response = client.get(path)
+    match = NEXT_LINK.search(response.content.decode())
+    return f"{path}?{html.unescape(match.group(1))}" if match else None
+
+
+def build_mix(client, organization_id, rng, samples=50):
+    """
+    The default mix for a logged in client: the index with calendar paging,
+    the task, project and comment lists with search and paging, and detail pages.
+    """
+    today = timezone.localdate()
+    months = []
+    for offset in range(-6, 7):
+        year, month = divmod(today.month - 1 + offset, 12)
+        months.append(f"{reverse('management:index')}?year={today.year + year}&month={month + 1}")
+    task_ids = list(Task.objects.filter(organization_id=organization_id).order_by("id").values_list("id", flat=True)[:1000])
+    project_ids = list(Project.objects.filter(organization_id=organization_id).values_list("id", flat=True)[:1000])
+
+    def lists(name):
+        path = reverse(f"management:{name}")
+        next_page = _next_page(client, path)
+        return [
+            Entry(name, 10, [path]),
+            Entry(f"{name} search", 4, [f"{path}?query={term}" for term in SEARCH_TERMS]),
+            Entry(f"{name} page 2", 4, [next_page] if next_page else []),
+        ]
+
+    mix = [
+        Entry("index", 10, [reverse("management:index")]),
+        Entry("index calendar", 5, months),
+        *lists("task-list"),
+        *lists("project-list"),
+        *lists("comment-list"),
+        Entry("task-detail", 10, [
+            reverse("management:task-detail", args=[pk]) for pk in rng.sample(task_ids, min(samples, len(task_ids)))
+        ]),
+        Entry("project-detail", 5, [
+            reverse("management:project-detail", args=[pk])
+            for pk in rng.sample(project_ids, min(samples, len(project_ids)))
+        ]),
+    ]
+    return [entry for entry in mix if entry.paths]
+
+
+def plan(mix, count, rng):
+    """count (label, path) pairs drawn from the mix by weight."""
+    entries = rng.choices(mix, weights=[entry.weight for entry in mix], k=count)
+    return [(entry.label, rng.choice(entry.paths)) for entry in entries]
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.views = {}
+        self.errors = defaultdict(int)
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, label, status, latency, sample):
+        with self._lock:
+            self.latencies[label].append(latency)
+            if "queries" in sample:
+                self.queries[label].append(sample["queries"])
+                self.views[label] = sample["view"]
+            # a redirect (e.g. to the login page) is not the page being measured
+            if status >= 300:
+                self.errors[label] += 1
+
+    def summary(self):
+        """Per label: requests, errors, p50/p95/p99 ms, requests per second and queries per request."""
+        summary = {}
+        for label, latencies in sorted(self.latencies.items()):
+            queries = self.queries[label]
+            summary[label] = {
+                "view": self.views.get(label, ""),
+                "requests": len(latencies),
+                "errors": self.errors[label],
+                "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                "rps": round(len(latencies) / self.elapsed, 1) if self.elapsed else 0.0,
+                "queries": round(sum(queries) / len(queries), 1) if queries else None,
+            }
+        return summary
+
+    def throughput(self):
+        return round(sum(map(len, self.latencies.values())) / self.elapsed, 1) if self.elapsed else 0.0
+
+
+def run_wsgi(clients, requests, results):
+    """Replays the requests through the WSGI handler, one thread per client."""
+    pending = iter(requests)
+    lock = threading.Lock()
+
+    def work(client):
+        try:
+            while True:
+                with lock:
+                    label, path = next(pending, (None, None))
+                if label is None:
+                    return
+                sample_id, sample = _new_sample()
+                start = time.perf_counter()
+                try:
+                    response = client.get(path, headers={HEADER: sample_id})
+                finally:
+                    del _samples[sample_id]
+                results.add(label, response.status_code, time.perf_counter() - start, sample)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=work, args=(client,)) for client in clients]
+    request_measured.connect(_measured)
+    start = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        request_measured.disconnect(_measured)
+    results.elapsed = time.perf_counter() - start
+    return results
+
+
+def run_asgi(application, headers, requests, concurrency, results):
+    """Replays the requests through the ASGI application, concurrency at a time."""
+    pending = iter(requests)
+
+    async def work(client_headers):
+        for label, path in pending:
+            sample_id, sample = _new_sample()
+            communicator = HttpCommunicator(
+                application, "GET", path, headers=[*client_headers, (HEADER.lower().encode(), sample_id.encode())],
+            )
+            start = time.perf_counter()
+            try:
+                response = await communicator.get_response(timeout=60)
+            finally:
+                del _samples[sample_id]
+            results.add(label, response["status"], time.perf_counter() - start, sample)
+
+    async def main():
+        await asyncio.gather(*(work(headers[n % len(headers)]) for n in range(concurrency)))
+
+    request_measured.connect(_measured)
+    start = time.perf_counter()
+    try:
+        asyncio.run(main())
+    finally:
+        request_measured.disconnect(_measured)
+    results.elapsed = time.perf_counter() - start
+    return results
+
+
+def logged_in_clients(workers, host):
+    """A django.test.Client with a session per worker."""
+    clients = []
+    for worker in workers:
+        client = Client(HTTP_HOST=host)
+        client.force_login(worker)
+        clients.append(client)
+    return clients
+
+
+def session_headers(client, host):
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+    return [(b"host", host.encode()), (b"cookie", cookie.encode())]
+
+
+def save_baseline(path, summary, throughput, meta):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "throughput": throughput, "results": summary}, f, indent=2)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, summary, throughput, threshold=0.2, min_ms=2.0):
+    """
+    The regressions of a run against a baseline: a p95 more than threshold
+    (and min_ms) slower, any extra query per request, or a lower throughput.
+    """
+    regressions = []
+    for label, result in summary.items():
+        before = baseline["results"].get(label)
+        if before is None:
+            continue
+        p95, base_p95 = result["p95_ms"], before["p95_ms"]
+        if p95 > base_p95 * (1 + threshold) and p95 - base_p95 > min_ms:
+            regressions.append(f"{label}: p95 {base_p95:.1f} -> {p95:.1f} ms")
+        if result["queries"] is not None and before["queries"] is not None and result["queries"] > before["queries"]:
+            regressions.append(f"{label}: queries {before['queries']} -> {result['queries']}")
+    base_throughput = baseline.get("throughput") or 0
+    if throughput < base_throughput * (1 - threshold):
+        regressions.append(f"throughput {base_throughput:.1f} -> {throughput:.1f} req/s")
+    return regressions
+
+
+class CommunicatorSocket:
+    """A websocket to the ASGI application in this process."""
+
+    def __init__(self, application, path, headers):
+        self.communicator = WebsocketCommunicator(application, path, headers=headers)
+
+    async def connect(self, timeout=30):
+        connected, _ = await self.communicator.connect(timeout=timeout)
+        if not connected:
+            raise ConnectionError("websocket rejected")
+
+    async def send(self, text):
+        await self.communicator.send_to(text_data=text)
+
+    async def receive(self, timeout=30):
+        return await self.communicator.receive_from(timeout=timeout)
+
+    async def close(self):
+        await self.communicator.disconnect()
+
+
+class RawWebSocket:
+    """
+    Just enough of a websocket client (RFC 6455) to talk to a real server such
+    as daphne: text frames out, text frames in, pings answered.
+    """
+    GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+    def __init__(self, url, path, headers):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = path
+        self.headers = [(name.decode(), value.decode()) for name, value in headers if name != b"host"]
+        self.reader = self.writer = None
+
+    async def connect(self, timeout=30):
+        await asyncio.wait_for(self._handshake(), timeout)
+
+    async def _handshake(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        key = base64.b64encode(os.urandom(16))
+        lines = [
+            f"GET {self.path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key.decode()}",
+            "Sec-WebSocket-Version: 13",
+            *(f"{name}: {value}" for name, value in self.headers),
+        ]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+        status = await self.reader.readline()
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1(key + self.GUID).digest()).decode()
+        if b" 101 " not in status or headers.get("sec-websocket-accept") != accept:
+            self.writer.close()
+            raise ConnectionError(f"websocket rejected: {status.decode().strip()}")
+
+    def _frame(self, opcode, payload):
+        # clients mask every frame
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = struct.pack("!BB", 0x80 | opcode, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, length)
+        repeated = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(repeated, "big")).to_bytes(length, "big")
+        return header + mask + masked
+
+    async def send(self, text):
+        self.writer.write(self._frame(0x1, text.encode()))
+        await self.writer.drain()
+
+    async def receive(self, timeout=30):
+        return await asyncio.wait_for(self._receive(), timeout)
+
+    async def _receive(self):
+        message = b""
+        while True:
+            first, second = await self.reader.readexactly(2)
+            length = second & 0x7F
+            if length == 126:
+                length, = struct.unpack("!H", await self.reader.readexactly(2))
+            elif length == 127:
+                length, = struct.unpack("!Q", await self.reader.readexactly(8))
+            payload = await self.reader.readexactly(length)
+            opcode = first & 0x0F
+            if opcode == 0x8:
+                raise ConnectionError("websocket closed by the server")
+            if opcode == 0x9:
+                self.writer.write(self._frame(0xA, payload))
+                continue
+            if opcode in (0x0, 0x1, 0x2):
+                message += payload
+                if first & 0x80:
+                    return message.decode()
+
+    async def close(self):
+        if self.writer is None or self.writer.is_closing():
+            return
+        try:
+            self.writer.write(self._frame(0x8, struct.pack("!H", 1000)))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
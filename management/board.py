@@ -0,0 +1,130 @@
+import threading
+import weakref
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from management.caching import invalidate_org, org_version
+from management.models import Task
+from management.tenancy import request_org_id
+
+BOARD = "board"
+
+# connections are per thread, and so is the pending change of the current transaction
+_pending = threading.local()
+
+
+def _changed_at_key(organization_id):
+    return f"board-changed:{organization_id}"
+
+
+class _BoardChanges(set):
+    """Organizations whose boards change when the current transaction commits."""
+
+    def __call__(self):
+        if _current_changes() is self:
+            _pending.changes = None
+        now = timezone.now()
+        for organization_id in self:
+            invalidate_org(BOARD, organization_id)
+            cache.set(_changed_at_key(organization_id), now, None)
+
+
+def _current_changes():
+    # only a weak reference: a rollback discards the on_commit callback, and with it the changes
+    ref = getattr(_pending, "changes", None)
+    return ref() if ref is not None else None
+
+
+def bump_board_revision(organization_id):
+    """
+    Marks every board of an organization as changed, once the current transaction
+    commits. The revision is a cache version, so task writes do not lock the
+    organization row, and a transaction bumps each organization once.
+    """
+    if not transaction.get_connection().in_atomic_block:
+        _BoardChanges([organization_id])()
+        return
+    changes = _current_changes()
+    if changes is None:
+        changes = _BoardChanges()
+        _pending.changes = weakref.ref(changes)
+        transaction.on_commit(changes)
+    changes.add(organization_id)
+
+
+def get_board_version(request):
+    """Returns (revision, changed_at) of the user's organization, read once per request."""
+    if not hasattr(request, "_board_version"):
+        organization_id = request_org_id(request)
+        key = _changed_at_key(organization_id)
+        changed_at = cache.get(key)
+        if changed_at is None:
+            # as with versions, an evicted time restarts from now rather than going back
+            cache.add(key, timezone.now(), None)
+            changed_at = cache.get(key)
+        request._board_version = (org_version(BOARD, organization_id), changed_at)
+    return request._board_version
+
+
+def board_etag(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    revision, _ = get_board_version(request)
+    return f"board-{request_org_id(request)}-{revision}-{request.user.id}"
+
+
+def board_last_modified(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    return get_board_version(request)[1]
+
+
+STATUS_COLORS = {
+    Task.Status.todo: "#3498db",
+    Task.Status.in_progress: "#f1c40f",
+    Task.Status.done: "#2ecc71",
+}
+
+
+def build_status_groups(tasks):
+    """Partitions tasks (ordered rows with a "status") into one group per status."""
+    by_status = {value: [] for value, _ in Task.Status.choices}
+    for task in tasks:
+        by_status.setdefault(task["status"], []).append(task)
+    return [
+        {
+            "label": label,
+            "value": value,
+            "tasks": by_status[value],
+            "color": STATUS_COLORS.get(value, "#ccc"),
+        }
+        for value, label in Task.Status.choices
+    ]
+
+
+def worker_tasks(worker):
+    return Task.objects.filter(organization_id=worker.organization_id, workers=worker)
+
+
+def build_board(worker):
+    """Returns the worker's tasks as kanban columns, one per status."""
+    tasks = worker_tasks(worker).values("id", "name", "status", "priority", "deadline")
+    return [
+        {
+            "status": group["value"],
+            "label": group["label"],
+            "color": group["color"],
+            "tasks": [
+                {
+                    "id": task["id"],
+                    "name": task["name"],
+                    "priority": task["priority"],
+                    "deadline": task["deadline"].isoformat() if task["deadline"] else None,
+                }
+                for task in group["tasks"]
+            ],
+        }
+        for group in build_status_groups(tasks)
+    ]
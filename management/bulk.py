@@ -0,0 +1,134 @@
+"""
+Changes to many tasks of an organization at once.
+
+Every operation runs in one transaction with a fixed number of statements
+(per batch, for deletes) and skips the per-task signals, so the caches, board
+revision, calendars and search documents those would maintain are updated here.
+"""
+from django.db import connection, transaction
+from django.db.models import ProtectedError
+
+from management.board import bump_board_revision
+from management.calendar_data import invalidate_calendar
+from management.dashboard import invalidate_dashboard
+from management.models import Comment, Task, Worker
+from management.search import remove_ids
+
+DELETE_BATCH_SIZE = 500
+
+# fields the calendar shows, see signals.CALENDAR_FIELDS
+CALENDAR_FIELDS = {"deadline", "status"}
+
+TaskWorker = Task.workers.through
+
+
+def _tasks(organization_id, task_ids):
+    return Task.objects.filter(organization_id=organization_id, pk__in=task_ids)
+
+
+def _assigned_worker_ids(task_ids):
+    return set(
+        TaskWorker.objects.filter(task_id__in=task_ids).values_list("worker_id", flat=True).distinct()
+    )
+
+
+def delete_rows(model, field_name, values):
+    """
+    Deletes the model's rows whose field is one of the values in a single DELETE; returns
+    how many went. QuerySet.delete() would load every row first to send its signals.
+    """
+    values = list(values)
+    if not values:
+        return 0
+    quote = connection.ops.quote_name
+    column = model._meta.get_field(field_name).column
+    placeholders = ", ".join(["%s"] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(column)} IN ({placeholders})", values)
+        return cursor.rowcount
+
+
+def protected_task_ids(organization_id, task_ids):
+    """The tasks that have comments, which protect them from deletion."""
+    return set(
+        Comment.objects.filter(task__in=_tasks(organization_id, task_ids).values("id"))
+        .values_list("task_id", flat=True).distinct()
+    )
+
+
+def _invalidate(organization_id, worker_ids):
+    # after the transaction, so nobody caches the old rows again in between
+    invalidate_dashboard(organization_id)
+    invalidate_calendar(*worker_ids)
+
+
+def update_tasks(organization_id, task_ids, **values):
+    """Sets the same field values (e.g. status, priority, deadline) on every task; returns how many changed."""
+    with transaction.atomic():
+        tasks = _tasks(organization_id, task_ids)
+        # one UPDATE: bulk_update() would spell out the same values row by row
+        updated = tasks.update(**values)
+        worker_ids = _assigned_worker_ids(tasks.values("id")) if CALENDAR_FIELDS & set(values) else set()
+        bump_board_revision(organization_id)
+    _invalidate(organization_id, worker_ids)
+    return updated
+
+
+def assign_workers(organization_id, task_ids, worker_ids):
+    """Adds the workers to every task; returns how many assignments were created."""
+    with transaction.atomic():
+        task_ids = list(_tasks(organization_id, task_ids).values_list("id", flat=True))
+        worker_ids = list(
+            Worker.objects.filter(organization_id=organization_id, pk__in=worker_ids).values_list("id", flat=True)
+        )
+        existing = set(
+            TaskWorker.objects.filter(task_id__in=task_ids, worker_id__in=worker_ids)
+            .values_list("task_id", "worker_id")
+        )
+        rows = [
+            TaskWorker(task_id=task_id, worker_id=worker_id)
+            for task_id in task_ids
+            for worker_id in worker_ids
+            if (task_id, worker_id) not in existing
+        ]
+        TaskWorker.objects.bulk_create(rows, ignore_conflicts=True)
+        bump_board_revision(organization_id)
+    _invalidate(organization_id, worker_ids)
+    return len(rows)
+
+
+def unassign_workers(organization_id, task_ids, worker_ids):
+    """Removes the workers from every task; returns how many assignments were removed."""
+    with transaction.atomic():
+        removed, _ = TaskWorker.objects.filter(
+            task__in=_tasks(organization_id, task_ids).values("id"), worker_id__in=worker_ids,
+        ).delete()
+        bump_board_revision(organization_id)
+    _invalidate(organization_id, worker_ids)
+    return removed
+
+
+def delete_tasks(organization_id, task_ids):
+    """
+    Deletes the tasks DELETE_BATCH_SIZE at a time; returns how many were deleted.
+    Raises ProtectedError, deleting nothing, if any of them has comments.
+    """
+    deleted = 0
+    worker_ids = set()
+    with transaction.atomic():
+        protected = protected_task_ids(organization_id, task_ids)
+        if protected:
+            raise ProtectedError(
+                f"{len(protected)} of the tasks have comments",
+                Comment.objects.filter(task_id__in=protected),
+            )
+        task_ids = list(_tasks(organization_id, task_ids).order_by("pk").values_list("id", flat=True))
+        for start in range(0, len(task_ids), DELETE_BATCH_SIZE):
+            batch = task_ids[start:start + DELETE_BATCH_SIZE]
+            worker_ids |= _assigned_worker_ids(batch)
+            TaskWorker.objects.filter(task_id__in=batch).delete()
+            remove_ids(Task, batch)
+            deleted += delete_rows(Task, "id", batch)
+        bump_board_revision(organization_id)
+    _invalidate(organization_id, worker_ids)
+    return deleted
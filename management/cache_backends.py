@@ -0,0 +1,140 @@
+import contextvars
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# true while the shared tier is being called, so SQL it runs can be told apart
+in_shared_tier = contextvars.ContextVar("in_shared_tier", default=False)
+
+
+class _SharedTier:
+    """Proxy of the shared cache marking every call with in_shared_tier."""
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def __getattr__(self, name):
+        method = getattr(self._cache, name)
+
+        def call(*args, **kwargs):
+            token = in_shared_tier.set(True)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                in_shared_tier.reset(token)
+        return call
+
+
+class TieredCache(BaseCache):
+    """
+    Cache reading from an in-process tier (LOCAL, e.g. LocMemCache) in front
+    of a tier shared by all processes (SHARED, e.g. the database cache).
+
+    Misses of the local tier are filled from the shared one. Writes and
+    deletes go to both, so this process never reads its own stale data; other
+    processes may keep a local copy for up to LOCAL_TIMEOUT seconds.
+
+    CACHES = {
+        "default": {
+            "BACKEND": "management.cache_backends.TieredCache",
+            "OPTIONS": {"LOCAL": "local", "SHARED": "shared", "LOCAL_TIMEOUT": 5},
+        },
+        "local": {...},
+        "shared": {...},
+    }
+    """
+
+    def __init__(self, location, params):
+        options = params.get("OPTIONS", {})
+        self.local_alias = options.get("LOCAL", "local")
+        self.shared_alias = options.get("SHARED", "shared")
+        self.local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        super().__init__({"TIMEOUT": params.get("TIMEOUT", DEFAULT_TIMEOUT)})
+
+    @property
+    def local(self):
+        return caches[self.local_alias]
+
+    @property
+    def shared(self):
+        return _SharedTier(caches[self.shared_alias])
+
+    def _local_timeout(self, timeout):
+        if timeout is None or timeout is DEFAULT_TIMEOUT:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def get(self, key, default=None, version=None):
+        missing = object()
+        value = self.local.get(key, missing, version=version)
+        if value is not missing:
+            return value
+        value = self.shared.get(key, missing, version=version)
+        if value is missing:
+            return default
+        self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    async def aget(self, key, default=None, version=None):
+        # the local tier is in memory, so hits are answered without leaving the event loop
+        missing = object()
+        value = self.local.get(key, missing, version=version)
+        if value is not missing:
+            return value
+        return await sync_to_async(self.get)(key, default, version=version)
+
+    def get_many(self, keys, version=None):
+        found = self.local.get_many(keys, version=version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            if shared:
+                self.local.set_many(shared, self.local_timeout, version=version)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        self.local.set(key, value, self._local_timeout(timeout), version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        self.local.set_many(data, self._local_timeout(timeout), version=version)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            self.local.set(key, value, self._local_timeout(timeout), version=version)
+        else:
+            # another process won; the local copy must not shadow its value
+            self.local.delete(key, version=version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self.local.delete_many(keys, version=version)
+        self.shared.delete_many(keys, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self.local.delete(key, version=version)
+        return value
+
+    def has_key(self, key, version=None):
+        return self.local.has_key(key, version=version) or self.shared.has_key(key, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.local.close(**kwargs)
+        self.shared.close(**kwargs)
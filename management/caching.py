@@ -0,0 +1,71 @@
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(namespace):
+    return f"version:{namespace}"
+
+
+def get_version(namespace):
+    """
+    Returns the current version of a cache namespace.
+    Keys built with make_key() go stale as soon as the version is bumped.
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # seed from the clock so an evicted counter never reuses an old version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(namespace):
+    key = _version_key(namespace)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_version(namespace):
+    key = _version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key)
+
+
+def make_key(namespace, *parts):
+    parts = ":".join(str(part) for part in parts)
+    return f"{namespace}:{get_version(namespace)}:{parts}"
+
+
+async def amake_key(namespace, *parts):
+    parts = ":".join(str(part) for part in parts)
+    return f"{namespace}:{await aget_version(namespace)}:{parts}"
+
+
+def org_namespace(name, organization_id):
+    """Namespace of data of one organization, e.g. org_namespace("dashboard", 3)."""
+    return f"{name}:{organization_id}"
+
+
+def org_version(name, organization_id):
+    return get_version(org_namespace(name, organization_id))
+
+
+def org_key(name, organization_id, *parts):
+    """Cache key of an organization's data that goes stale with invalidate_org(name, organization_id)."""
+    return make_key(org_namespace(name, organization_id), *parts)
+
+
+async def aorg_key(name, organization_id, *parts):
+    return await amake_key(org_namespace(name, organization_id), *parts)
+
+
+def invalidate_org(name, organization_id):
+    bump_version(org_namespace(name, organization_id))
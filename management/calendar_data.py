@@ -0,0 +1,88 @@
+from collections import namedtuple
+from datetime import datetime
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from management.caching import amake_key, bump_version, make_key
+from management.models import Task
+
+CACHE_TIMEOUT = 60 * 60
+
+CalendarTask = namedtuple(
+    "CalendarTask",
+    ["id", "name", "deadline", "is_completed", "status", "color"],
+)
+
+
+def _namespace(worker_id):
+    return f"calendar:{worker_id}"
+
+
+def invalidate_calendar(*worker_ids):
+    for worker_id in set(worker_ids):
+        bump_version(_namespace(worker_id))
+
+
+def month_range(year, month, tz=None):
+    """
+    Returns the half-open [start, end) datetime range covering a month
+    in the given (default: current) timezone.
+    """
+    tz = tz or timezone.get_current_timezone()
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return timezone.make_aware(start, tz), timezone.make_aware(end, tz)
+
+
+def _month_key_parts(year, month, project_id):
+    return timezone.get_current_timezone_name(), year, month, project_id or "all"
+
+
+def get_month_tasks(worker_id, year, month, project_id=None):
+    """
+    Returns the worker's tasks due in the month as CalendarTask rows ordered
+    by deadline, cached until one of the worker's tasks changes.
+    """
+    key = make_key(_namespace(worker_id), *_month_key_parts(year, month, project_id))
+    tasks = cache.get(key)
+    if tasks is None:
+        tasks = build_month_tasks(worker_id, year, month, project_id)
+        cache.set(key, tasks, CACHE_TIMEOUT)
+    return tasks
+
+
+async def aget_month_tasks(worker_id, year, month, project_id=None):
+    """get_month_tasks() with the async ORM."""
+    key = await amake_key(_namespace(worker_id), *_month_key_parts(year, month, project_id))
+    tasks = await cache.aget(key)
+    if tasks is None:
+        rows = _month_rows(worker_id, year, month, project_id)
+        tasks = [CalendarTask(*row) async for row in rows]
+        await cache.aset(key, tasks, CACHE_TIMEOUT)
+    return tasks
+
+
+def build_month_tasks(worker_id, year, month, project_id=None):
+    return [CalendarTask(*row) for row in _month_rows(worker_id, year, month, project_id)]
+
+
+def _month_rows(worker_id, year, month, project_id):
+    start, end = month_range(year, month)
+    tasks = Task.objects.filter(
+        workers=worker_id,
+        deadline__gte=start,
+        deadline__lt=end,
+    )
+    if project_id:
+        tasks = tasks.filter(project_id=project_id)
+    return tasks.order_by("deadline", "id").values_list(
+        "id", "name", "deadline", "is_completed", "status", "type__color",
+    )
+
+
+def group_by_day(tasks, days):
+    tasks_by_day = {day: [] for day in days}
+    for task in tasks:
+        tasks_by_day[timezone.localtime(task.deadline).date()].append(task)
+    return tasks_by_day
@@ -0,0 +1,119 @@
+import asyncio
+import atexit
+import logging
+import threading
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from management.models import Message
+
+logger = logging.getLogger(__name__)
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind queue for chat messages: messages are collected per process and
+    saved with one bulk_create every `interval` seconds or `batch_size` messages.
+    A batch that fails to save is queued again, up to `max_attempts` failed saves
+    in a row. Whatever is left is saved when the process exits.
+    """
+
+    def __init__(self, batch_size=100, interval=0.05, max_attempts=5):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self._failures = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self._timer_loop = None
+        self._tasks = set()
+        atexit.register(self.flush_sync)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, message):
+        with self._lock:
+            self._pending.append(message)
+            size = len(self._pending)
+        loop = asyncio.get_running_loop()
+        if size >= self.batch_size:
+            self._cancel_timer()
+            self._spawn_save(loop)
+        else:
+            self._schedule(loop, self.interval)
+
+    def _schedule(self, loop, delay):
+        if self._timer is None or self._timer_loop is not loop:
+            self._timer = loop.call_later(delay, self._on_timer, loop)
+            self._timer_loop = loop
+
+    def _on_timer(self, loop):
+        self._timer = None
+        self._spawn_save(loop)
+
+    def _spawn_save(self, loop):
+        task = loop.create_task(self._save_pending())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _take(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        return batch
+
+    def _restore(self, batch):
+        with self._lock:
+            self._pending = batch + self._pending
+
+    def _save(self, batch):
+        """Saves a batch, or queues it again; returns whether it was saved."""
+        try:
+            with transaction.atomic():
+                Message.objects.bulk_create(batch)
+        except DatabaseError:
+            self._failures += 1
+            if self._failures >= self.max_attempts:
+                logger.exception("Could not save %d chat messages, dropping them", len(batch))
+                self._failures = 0
+                return False
+            logger.warning("Could not save %d chat messages, keeping them for the next flush", len(batch))
+            self._restore(batch)
+            return False
+        self._failures = 0
+        return True
+
+    async def _save_pending(self):
+        batch = self._take()
+        if batch and not await database_sync_to_async(self._save)(batch) and self._pending:
+            # retry even if nobody sends another message, backing off while the database is down
+            self._schedule(asyncio.get_running_loop(), self.interval * 2 ** self._failures)
+
+    async def flush(self):
+        """Saves everything queued so far, including batches already being written."""
+        self._cancel_timer()
+        await self._save_pending()
+        loop = asyncio.get_running_loop()
+        writing = [task for task in self._tasks if task.get_loop() is loop]
+        if writing:
+            await asyncio.wait(writing)
+
+    def flush_sync(self):
+        self._cancel_timer()
+        batch = self._take()
+        if batch:
+            self._save(batch)
+
+
+message_buffer = MessageWriteBuffer(
+    batch_size=settings.CHAT_WRITE_BEHIND_BATCH_SIZE,
+    interval=settings.CHAT_WRITE_BEHIND_INTERVAL,
+)
@@ -1,75 +1,110 @@
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 
+from management.chat_buffer import message_buffer
 from management.models import ChatRoom, Message
-
-
-class PrivateChatConsumer(AsyncWebsocketConsumer):
-
-    @database_sync_to_async
-    def get_or_create_room(self, uid1, uid2):
-        name = f"private_{uid1}_{uid2}"
-        room, created = ChatRoom.objects.get_or_create(name=name)
-        return room
+from management.pagination import NEXT, CursorPaginator, decode_cursor
+
+HISTORY_PAGE_SIZE = 50
+
+# even as six-byte JSON escapes, a chat line this long fits in one NOTIFY payload
+MAX_MESSAGE_LENGTH = 1000
+HISTORY_ORDERING = ("-timestamp", "-id")
+
+
+def history_queryset(room_id):
+    return (
+        Message.objects.filter(room_id=room_id)
+        .order_by(*HISTORY_ORDERING)
+        .values("id", "content", "timestamp", "sender_id", "sender__username")
+    )
+
+
+def load_history_page(room_id, before=None, page_size=HISTORY_PAGE_SIZE):
+    """
+    Returns (messages, cursor) for the newest page of a room's history, or for the
+    page older than `before`. Messages are oldest first; `cursor` is None at the start.
+    Raises ValueError for a cursor that is invalid or does not page towards older messages.
+    """
+    if before and decode_cursor(before)[0] != NEXT:
+        raise ValueError("Invalid cursor")
+    paginator = CursorPaginator(history_queryset(room_id), page_size, HISTORY_ORDERING)
+    page = paginator.page(before)
+    messages = [
+        {
+            "id": m["id"],
+            "sender": m["sender__username"],
+            "sender_id": m["sender_id"],
+            "content": m["content"],
+            "timestamp": m["timestamp"].isoformat(),
+        }
+        for m in reversed(page.object_list)
+    ]
+    return messages, page.next_cursor
+
+
+class ChatConsumer(AsyncWebsocketConsumer):
+    """
+    Shared protocol of the chat sockets: the latest history page is sent on connect,
+    {"type": "load_older", "before": <cursor>} returns the previous page and any other
+    frame is a chat line broadcast to the room.
+    """
 
     @database_sync_to_async
-    def add_members(self, room, w1, w2):
-        room.members.add(w1, w2)
-
-    @database_sync_to_async
-    def load_history(self, room):
-        messages = room.chats.order_by("timestamp")
-        return [
-            {
-                "sender": m.sender.username,
-                "sender_id": m.sender.id,
-                "content": m.content,
-                "timestamp": m.timestamp.isoformat()
-            }
-            for m in messages
-        ]
+    def load_history(self, before=None):
+        return load_history_page(self.room.id, before)
 
     @database_sync_to_async
     def save_message(self, sender, content, room):
         Message.objects.create(sender=sender, content=content, room=room)
 
-    async def connect(self):
-        self.worker1 = self.scope['user']
-        self.worker1_id = int(self.scope['url_route']['kwargs']['worker1_id'])
-        self.worker2_id = int(self.scope['url_route']['kwargs']['worker2_id'])
-
-        uid1, uid2 = sorted([self.worker1_id, self.worker2_id])
-        self.room_group_name = f"private_{uid1}_{uid2}"
-
-        # FIXED: ORM must be awaited with database_sync_to_async
-        self.room = await self.get_or_create_room(uid1, uid2)
-        await self.add_members(self.room, self.worker1_id, self.worker2_id)
-
-        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
-        await self.accept()
-
-        # FIXED: async ORM wrapper
-        history = await self.load_history(self.room)
-
+    async def send_history(self, message_type, before=None):
+        if settings.CHAT_WRITE_BEHIND:
+            await message_buffer.flush()
+        try:
+            messages, cursor = await self.load_history(before)
+        except ValueError:
+            await self.send(text_data=json.dumps({
+                "type": "error",
+                "error": "invalid cursor",
+            }))
+            return
         await self.send(text_data=json.dumps({
-            "type": "history",
-            "messages": history
+            "type": message_type,
+            "messages": messages,
+            "before": cursor,
         }))
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        if settings.CHAT_WRITE_BEHIND:
+            await message_buffer.flush()
+        if hasattr(self, "room_group_name"):
+            await self.channel_layer.group_discard(
+                self.room_group_name,
+                self.channel_name
+            )
 
     async def receive(self, text_data=None, bytes_data=None):
         data = json.loads(text_data)
+        if data.get("type") == "load_older":
+            await self.send_history("older", data.get("before"))
+            return
+
         message = data["message"]
         sender = self.scope["user"]
-
-        # FIXED: async save
-        await self.save_message(sender, message, self.room)
+        if len(message) > MAX_MESSAGE_LENGTH:
+            await self.send(text_data=json.dumps({
+                "type": "error",
+                "error": "message too long",
+            }))
+            return
+
+        if settings.CHAT_WRITE_BEHIND:
+            message_buffer.add(Message(sender_id=sender.id, content=message, room_id=self.room.id))
+        else:
+            await self.save_message(sender, message, self.room)
 
         await self.channel_layer.group_send(
             self.room_group_name,
@@ -83,70 +118,55 @@ class PrivateChatConsumer(AsyncWebsocketConsumer):
 
     async def chat_message(self, event):
         await self.send(text_data=json.dumps({
+            "type": "message",
             "message": event["message"],
             "sender": event["sender"],
             "sender_id": event["sender_id"],
         }))
 
 
+class PrivateChatConsumer(ChatConsumer):
 
-class GroupChatConsumer(AsyncWebsocketConsumer):
     @database_sync_to_async
-    def get_room(self, room_id):
-        return ChatRoom.objects.get(id=room_id)
-
-    @database_sync_to_async
-    def load_history(self, room):
-        return [
-            {
-                "sender": m.sender.username,
-                "sender_id": m.sender.id,
-                "content": m.content,
-                "timestamp": m.timestamp.isoformat()
-            }
-            for m in room.chats.order_by("timestamp")
-        ]
+    def get_or_create_room(self, uid1, uid2):
+        name = f"private_{uid1}_{uid2}"
+        room, created = ChatRoom.objects.get_or_create(name=name)
+        return room
 
     @database_sync_to_async
-    def save_message(self, sender, content, room):
-        Message.objects.create(sender=sender, content=content, room=room)
+    def add_members(self, room, w1, w2):
+        room.members.add(w1, w2)
 
     async def connect(self):
-        self.room_id = int(self.scope["url_route"]["kwargs"]["room_id"])
-        self.room = await self.get_room(self.room_id)
+        self.worker1 = self.scope['user']
+        self.worker1_id = int(self.scope['url_route']['kwargs']['worker1_id'])
+        self.worker2_id = int(self.scope['url_route']['kwargs']['worker2_id'])
 
-        self.room_group_name = f"group_{self.room_id}"
+        uid1, uid2 = sorted([self.worker1_id, self.worker2_id])
+        self.room_group_name = f"private_{uid1}_{uid2}"
+
+        # FIXED: ORM must be awaited with database_sync_to_async
+        self.room = await self.get_or_create_room(uid1, uid2)
+        await self.add_members(self.room, self.worker1_id, self.worker2_id)
 
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
         await self.accept()
 
-        history = await self.load_history(self.room)
+        await self.send_history("history")
 
-        await self.send(text_data=json.dumps({
-            "type": "history",
-            "messages": history
-        }))
 
-    async def receive(self, text_data=None, bytes_data=None):
-        data = json.loads(text_data)
-        message = data["message"]
-        sender = self.scope["user"]
+class GroupChatConsumer(ChatConsumer):
+    @database_sync_to_async
+    def get_room(self, room_id):
+        return ChatRoom.objects.get(id=room_id)
 
-        await self.save_message(sender, message, self.room)
+    async def connect(self):
+        self.room_id = int(self.scope["url_route"]["kwargs"]["room_id"])
+        self.room = await self.get_room(self.room_id)
 
-        await self.channel_layer.group_send(
-            self.room_group_name,
-            {
-                "type": "chat_message",
-                "message": message,
-                "sender": sender.username,
-                "sender_id": sender.id,
-            }
-        )
+        self.room_group_name = f"group_{self.room_id}"
 
-    async def chat_message(self, event):
-        await self.send(text_data=json.dumps({
-            "message": event["message"],
-            "sender": event["sender"],
-            "sender_id": event["sender_id"],
-        }))
+        await self.channel_layer.group_add(self.room_group_name, self.channel_name)
+        await self.accept()
+
+        await self.send_history("history")
@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from management.caching import aorg_key, invalidate_org, org_key
+from management.models import Task, Worker
+
+CACHE_TIMEOUT = 60 * 5
+
+
+def invalidate_dashboard(organization_id):
+    invalidate_org("dashboard", organization_id)
+
+
+def get_dashboard_stats(organization_id, project_id=None):
+    """
+    Returns the dashboard numbers for an organization (optionally one project),
+    served from the cache until a task or worker of the organization changes.
+    """
+    key = org_key("dashboard", organization_id, project_id or "all")
+    stats = cache.get(key)
+    if stats is None:
+        stats = build_dashboard_stats(organization_id, project_id)
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
+
+
+async def aget_dashboard_stats(organization_id, project_id=None):
+    """get_dashboard_stats() with the async ORM."""
+    key = await aorg_key("dashboard", organization_id, project_id or "all")
+    stats = await cache.aget(key)
+    if stats is None:
+        stats = await abuild_dashboard_stats(organization_id, project_id)
+        await cache.aset(key, stats, CACHE_TIMEOUT)
+    return stats
+
+
+def _stats_querysets(organization_id, project_id):
+    tasks = Task.objects.filter(organization_id=organization_id)
+    task_filter = Q(tasks__organization_id=organization_id)
+    if project_id:
+        tasks = tasks.filter(project_id=project_id)
+        task_filter &= Q(tasks__project_id=project_id)
+
+    totals = {
+        "num_tasks": Count("id"),
+        "num_tasks_done": Count("id", filter=Q(status=Task.Status.done)),
+        "urgent": Count("id", filter=Q(priority=Task.Priority.urgent)),
+        "medium": Count("id", filter=Q(priority=Task.Priority.medium)),
+        "low": Count("id", filter=Q(priority=Task.Priority.low)),
+    }
+    workers = (
+        Worker.objects.filter(organization_id=organization_id)
+        .annotate(
+            tasks_count=Count("tasks", filter=task_filter),
+            done_tasks_count=Count(
+                "tasks", filter=task_filter & Q(tasks__status=Task.Status.done)
+            ),
+        )
+        .order_by("username")
+        .values("id", "first_name", "last_name", "tasks_count", "done_tasks_count")
+    )
+    return tasks.order_by(), totals, workers
+
+
+def build_dashboard_stats(organization_id, project_id=None):
+    """Builds the dashboard numbers with one query for tasks and one for workers."""
+    tasks, totals, workers = _stats_querysets(organization_id, project_id)
+    return _stats(tasks.aggregate(**totals), list(workers), project_id)
+
+
+async def abuild_dashboard_stats(organization_id, project_id=None):
+    tasks, totals, workers = _stats_querysets(organization_id, project_id)
+    return _stats(await tasks.aaggregate(**totals), [row async for row in workers], project_id)
+
+
+def _stats(totals, rows, project_id):
+    workers = [row for row in rows if row["tasks_count"]] if project_id else rows
+
+    return {
+        "num_workers": len(rows),
+        "num_tasks": totals["num_tasks"],
+        "num_tasks_done": totals["num_tasks_done"],
+        "num_tasks_todo": totals["num_tasks"] - totals["num_tasks_done"],
+        "workers": workers,
+        "datapoints": [
+            {
+                "label": f"{worker['first_name']} {worker['last_name']}",
+                "y": f"{worker['tasks_count']}",
+            }
+            for worker in workers
+        ],
+        "priority_counts": [
+            {"label": "Urgent", "y": totals["urgent"]},
+            {"label": "Medium", "y": totals["medium"]},
+            {"label": "Low", "y": totals["low"]},
+        ],
+    }
@@ -0,0 +1,195 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# pools of this process by (database alias, database name), see management/db/postgresql
+pools = {}
+pools_lock = threading.Lock()
+
+
+def pool_stats():
+    """Stats of every pool of this process, as {"alias:database name": stats}."""
+    return {f"{alias}:{name}": pool.stats() for (alias, name), pool in list(pools.items())}
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections.
+
+    At most `max_size` connections exist at once; callers wait up to `timeout`
+    seconds for one to be returned. Idle connections are checked with `check`
+    before reuse when they sat longer than `check_after` seconds, closed after
+    `max_idle` seconds unused (keeping `min_size`) and replaced after
+    `max_lifetime` seconds. `reset` is called on every returned connection and
+    should return False for one that cannot be reused.
+    """
+
+    def __init__(self, connect, max_size=10, min_size=0, timeout=10, max_idle=300,
+                 max_lifetime=3600, check_after=30, check=None, reset=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.min_size = min_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+        self.check = check
+        self.reset = reset
+        # (connection, created_at, returned_at), most recently returned last
+        self._idle = deque()
+        self._created = {}
+        self._lock = threading.Lock()
+        self._returned = threading.Condition(self._lock)
+        self._size = 0
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+            "failed_checks": 0,
+            "max_checked_out": 0,
+        }
+
+    def stats(self):
+        """Counters of the pool plus its current size, idle and checked out connections."""
+        with self._lock:
+            return {
+                **self._stats,
+                "size": self._size,
+                "idle": len(self._idle),
+                "checked_out": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def getconn(self):
+        deadline = None
+        while True:
+            with self._lock:
+                self._reap_locked(time.monotonic())
+                entry = self._idle.pop() if self._idle else None
+                if entry is None and self._size < self.max_size:
+                    self._size += 1
+                    entry = "new"
+                if entry is None:
+                    now = time.monotonic()
+                    if deadline is None:
+                        deadline = now + self.timeout
+                        wait_start = now
+                        self._stats["waits"] += 1
+                    if now >= deadline:
+                        self._stats["timeouts"] += 1
+                        self._stats["wait_time"] += now - wait_start
+                        raise PoolTimeout(
+                            f"No connection available within {self.timeout}s "
+                            f"({self.max_size} checked out)"
+                        )
+                    self._returned.wait(deadline - now)
+                    continue
+                if deadline is not None:
+                    self._stats["wait_time"] += time.monotonic() - wait_start
+
+            connection = self._open() if entry == "new" else self._validate(entry)
+            if connection is None:
+                continue
+            with self._lock:
+                self._stats["checkouts"] += 1
+                checked_out = self._size - len(self._idle)
+                self._stats["max_checked_out"] = max(self._stats["max_checked_out"], checked_out)
+            return connection
+
+    def putconn(self, connection, discard=False):
+        reusable = not discard
+        if reusable and self.reset is not None:
+            try:
+                reusable = self.reset(connection)
+            except Exception:
+                logger.warning("Could not reset a pooled connection, closing it", exc_info=True)
+                reusable = False
+        now = time.monotonic()
+        with self._lock:
+            created_at = self._created.get(id(connection), now)
+            if reusable and now - created_at < self.max_lifetime:
+                self._idle.append((connection, created_at, now))
+                self._returned.notify()
+                return
+        self._discard(connection)
+
+    def reap(self):
+        """Closes connections idle for longer than max_idle or older than max_lifetime."""
+        with self._lock:
+            self._reap_locked(time.monotonic())
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def _open(self):
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self._lock:
+                self._size -= 1
+                self._returned.notify()
+            raise
+        with self._lock:
+            self._created[id(connection)] = time.monotonic()
+            self._stats["connections_created"] += 1
+        return connection
+
+    def _validate(self, entry):
+        connection, _, returned_at = entry
+        if self.check is None or time.monotonic() - returned_at < self.check_after:
+            return connection
+        try:
+            healthy = self.check(connection)
+        except Exception:
+            healthy = False
+        if healthy:
+            return connection
+        with self._lock:
+            self._stats["failed_checks"] += 1
+        self._discard(connection)
+        return None
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created.pop(id(connection), None)
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+            self._returned.notify()
+
+    def _reap_locked(self, now):
+        """Drops stale idle connections; the oldest returned are at the left."""
+        expired = []
+        for entry in list(self._idle):
+            connection, created_at, returned_at = entry
+            too_old = now - created_at >= self.max_lifetime
+            unused = now - returned_at >= self.max_idle and self._size - len(expired) > self.min_size
+            if too_old or unused:
+                self._idle.remove(entry)
+                expired.append(connection)
+        for connection in expired:
+            try:
+                connection.close()
+            except Exception:
+                pass
+            self._created.pop(id(connection), None)
+            self._size -= 1
+            self._stats["connections_closed"] += 1
+        if expired:
+            self._returned.notify(len(expired))
@@ -0,0 +1,90 @@
+"""
+PostgreSQL backend that takes its connections from a per-process pool.
+
+    DATABASES = {
+        "default": {
+            "ENGINE": "management.db.postgresql",
+            ...,
+            "CONN_MAX_AGE": 0,
+            "POOL": {"MAX_SIZE": 10, "TIMEOUT": 10, "MAX_IDLE": 300},
+        }
+    }
+
+Closing a connection (at the end of every request and around every
+database_sync_to_async call when CONN_MAX_AGE is 0) returns it to the pool,
+so connections are no longer tied to the threads of the ASGI thread pool.
+"""
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from management.db.pool import ConnectionPool, PoolTimeout, pools, pools_lock
+
+# libpq's PQTRANS_IDLE: connected and outside of a transaction
+TRANSACTION_IDLE = 0
+
+
+def check_connection(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return True
+
+
+def reset_connection(connection):
+    """Rolls back whatever the borrower left open; False if the connection is unusable."""
+    if connection.closed:
+        return False
+    if connection.info.transaction_status != TRANSACTION_IDLE:
+        connection.rollback()
+    return connection.info.transaction_status == TRANSACTION_IDLE
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    @property
+    def pool_key(self):
+        # the test runner renames the database of an alias; its connections must not mix
+        return self.alias, self.settings_dict["NAME"]
+
+    @property
+    def pool(self):
+        pool = pools.get(self.pool_key)
+        if pool is None:
+            with pools_lock:
+                pool = pools.get(self.pool_key)
+                if pool is None:
+                    pool = pools[self.pool_key] = self._create_pool()
+        return pool
+
+    def _create_pool(self):
+        options = self.settings_dict.get("POOL", {})
+        conn_params = self.get_connection_params()
+        return ConnectionPool(
+            connect=lambda: PostgresDatabaseWrapper.get_new_connection(self, conn_params),
+            max_size=options.get("MAX_SIZE", 10),
+            min_size=options.get("MIN_SIZE", 0),
+            timeout=options.get("TIMEOUT", 10),
+            max_idle=options.get("MAX_IDLE", 300),
+            max_lifetime=options.get("MAX_LIFETIME", 3600),
+            check_after=options.get("CHECK_AFTER", 30),
+            check=check_connection,
+            reset=reset_connection,
+        )
+
+    def get_new_connection(self, conn_params):
+        self.isolation_level = IsolationLevel(
+            self.settings_dict["OPTIONS"].get("isolation_level", IsolationLevel.READ_COMMITTED)
+        )
+        try:
+            return self.pool.getconn()
+        except PoolTimeout as e:
+            raise self.Database.OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is not None:
+            # a connection that raised errors is not trusted for the next borrower
+            self.pool.putconn(self.connection, discard=self.errors_occurred)
+
+    def close_pool(self):
+        pool = pools.pop(self.pool_key, None)
+        if pool is not None:
+            pool.close_all()
+
@@ -0,0 +1,149 @@
+"""
+Streaming exports of an organization's tasks, comments and chat history.
+
+Rows are read with values() and iterator(chunk_size=...) and written out one
+chunk at a time, so memory stays flat whatever the size of the export. CSV
+output starts with its header before the first query runs.
+"""
+import csv
+import json
+import zlib
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from management.models import ChatRoom, Comment, Message, Task
+
+CHUNK_SIZE = 1000
+
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+def _task_rows(organization_id, **filters):
+    return (
+        Task.objects.filter(organization_id=organization_id)
+        .order_by("id")
+        .values(
+            "id", "name", "description", "status", "priority", "deadline", "is_completed",
+            "project_id", "project__name", "type__name",
+        )
+    )
+
+
+def _with_assignees(rows):
+    """Adds the usernames of every task's workers, one query per chunk of tasks."""
+    ids = [row["id"] for row in rows]
+    assignees = {task_id: [] for task_id in ids}
+    workers = (
+        Task.workers.through.objects.filter(task_id__in=ids)
+        .order_by("task_id", "worker__username")
+        .values_list("task_id", "worker__username")
+    )
+    for task_id, username in workers:
+        assignees[task_id].append(username)
+    for row in rows:
+        row["assignees"] = assignees[row["id"]]
+    return rows
+
+
+def _comment_rows(organization_id, **filters):
+    return (
+        Comment.objects.filter(organization_id=organization_id)
+        .order_by("id")
+        .values("id", "task_id", "task__name", "worker__username", "text", "created_at")
+    )
+
+
+def _message_rows(organization_id, worker_id=None, room_id=None):
+    rooms = ChatRoom.objects.filter(organization_id=organization_id)
+    if worker_id is not None:
+        rooms = rooms.filter(members=worker_id)
+    if room_id is not None:
+        rooms = rooms.filter(pk=room_id)
+    return (
+        Message.objects.filter(room__in=rooms.values("id"))
+        .order_by("room_id", "timestamp", "id")
+        .values("id", "room_id", "room__name", "sender__username", "content", "timestamp")
+    )
+
+
+# kind: (rows, enrich each chunk, CSV columns)
+EXPORTS = {
+    "tasks": (_task_rows, _with_assignees, [
+        "id", "name", "description", "status", "priority", "deadline", "is_completed",
+        "project_id", "project__name", "type__name", "assignees",
+    ]),
+    "comments": (_comment_rows, None, ["id", "task_id", "task__name", "worker__username", "text", "created_at"]),
+    "messages": (_message_rows, None, ["id", "room_id", "room__name", "sender__username", "content", "timestamp"]),
+}
+
+
+def export_chunks(kind, organization_id, chunk_size=CHUNK_SIZE, **filters):
+    """Yields lists of row dicts of an export, chunk_size rows at a time."""
+    rows, enrich, _ = EXPORTS[kind]
+    iterator = rows(organization_id, **filters).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield enrich(chunk) if enrich else chunk
+
+
+class _Line:
+    """File-like target for csv.writer that hands back what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(kind, chunks):
+    columns = EXPORTS[kind][2]
+    writer = csv.writer(_Line())
+    yield writer.writerow(columns)
+    for chunk in chunks:
+        yield "".join(
+            writer.writerow([
+                ";".join(value) if isinstance(value, list) else value
+                for value in (row[column] for column in columns)
+            ])
+            for row in chunk
+        )
+
+
+def jsonl_lines(kind, chunks):
+    for chunk in chunks:
+        yield "".join(json.dumps(row, cls=DjangoJSONEncoder) + "\n" for row in chunk)
+
+
+def export_stream(kind, organization_id, fmt="csv", compress=False, chunk_size=CHUNK_SIZE, **filters):
+    """Encoded pieces of an export in the given format, optionally gzipped."""
+    chunks = export_chunks(kind, organization_id, chunk_size, **filters)
+    lines = csv_lines(kind, chunks) if fmt == "csv" else jsonl_lines(kind, chunks)
+    encoded = (piece.encode() for piece in lines)
+    return gzip_stream(encoded) if compress else encoded
+
+
+def gzip_stream(pieces):
+    """Gzips a stream of bytes on the fly, flushing after every piece so nothing waits for the end."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for piece in pieces:
+        yield compressor.compress(piece) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+async def aiterate(iterator):
+    """
+    Pulls a sync iterator from the request's sync thread. ASGI would otherwise
+    read a sync StreamingHttpResponse to the end before sending anything.
+    """
+    done = object()
+    pull = sync_to_async(next)
+    while True:
+        piece = await pull(iterator, done)
+        if piece is done:
+            return
+        yield piece
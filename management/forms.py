@@ -1,13 +1,20 @@
+import io
 import random
 import string
 import uuid
 
 from django import forms
 from django.contrib.auth.forms import UserChangeForm
+from django.core.exceptions import ValidationError
 from django.db.transaction import commit
 from django.forms import ModelForm
+from django.forms.models import ModelChoiceIterator
+from django.urls import reverse_lazy
 
 from .models import Worker, Organization, Project, ChatRoom, Task, Team, TaskType, Comment, Feedback
+from . import bulk, imports
+from .lookups import worker_label
+from .search import search_queryset
 
 COLOR_CHOICES = [
     ("#ffd6d1", "Soft Red"),
@@ -19,6 +26,222 @@ COLOR_CHOICES = [
 ]
 
 
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    """
+    Evaluates the field's queryset once and reuses the (value, label) pairs for
+    every render and len(), instead of querying each time the widget iterates.
+    Labels come from __str__, so the queryset should load what it needs
+    (see the with_labels() managers).
+    """
+
+    def _choices(self):
+        cached = getattr(self.field, "_cached_choices", None)
+        if cached is None or cached[0] is not self.queryset:
+            cached = (self.queryset, [self.choice(obj) for obj in self.queryset])
+            self.field._cached_choices = cached
+        return cached[1]
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from self._choices()
+
+    def __len__(self):
+        return len(self._choices()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self._choices())
+
+
+class LabelledModelChoiceField(forms.ModelChoiceField):
+    iterator = CachedModelChoiceIterator
+
+
+class LabelledModelMultipleChoiceField(forms.ModelMultipleChoiceField):
+    iterator = CachedModelChoiceIterator
+
+
+class AutocompleteMixin:
+    """
+    Select widget filled by an autocomplete endpoint as the user types.
+    Only the selected options are rendered, loaded with one pk IN query,
+    instead of every row of the field's queryset.
+    """
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    class Media:
+        js = ("js/autocomplete.js",)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = str(self.url)
+        return attrs
+
+    def selected_choices(self, values):
+        values = [value for value in values if value not in (None, "")]
+        queryset = getattr(self.choices, "queryset", None)
+        if not values or queryset is None:
+            return []
+        try:
+            return [self.choices.choice(obj) for obj in queryset.filter(pk__in=values)]
+        except (TypeError, ValueError, ValidationError):
+            return []
+
+    def optgroups(self, name, value, attrs=None):
+        return [
+            (None, [self.create_option(name, option_value, label, True, index, attrs=attrs)], index)
+            for index, (option_value, label) in enumerate(self.selected_choices(value))
+        ]
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
+
+
+class WorkerChoiceField(forms.ModelChoiceField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", Worker.objects.all())
+        kwargs.setdefault("widget", AutocompleteSelect(reverse_lazy("management:worker-autocomplete")))
+        super().__init__(**kwargs)
+
+    def label_from_instance(self, obj):
+        return worker_label(obj)
+
+
+class WorkerMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """Workers picked through the autocomplete; submitted ids are checked with one IN query."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", Worker.objects.all())
+        kwargs.setdefault("widget", AutocompleteSelectMultiple(reverse_lazy("management:worker-autocomplete")))
+        super().__init__(**kwargs)
+
+    def label_from_instance(self, obj):
+        return worker_label(obj)
+
+
+class OrganizationWorkersMixin:
+    """
+    Limits the worker fields in `worker_fields`, and the choices of other organization-owned
+    models in `organization_fields`, to the organization passed as `organization_id`.
+    """
+    worker_fields = ()
+    organization_fields = ()
+
+    def __init__(self, *args, organization_id=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if organization_id is not None:
+            for name in self.worker_fields + self.organization_fields:
+                field = self.fields[name]
+                field.queryset = field.queryset.filter(organization_id=organization_id)
+
+
+class IdListField(forms.Field):
+    """Integer ids, submitted as repeated values (tasks=1&tasks=2) or comma-separated."""
+    widget = forms.MultipleHiddenInput
+    default_error_messages = {"invalid": "Enter a list of ids."}
+
+    def to_python(self, value):
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = [value]
+        try:
+            return sorted({int(part) for item in value for part in str(item).split(",") if part.strip()})
+        except ValueError:
+            raise ValidationError(self.error_messages["invalid"], code="invalid")
+
+
+class BulkTaskForm(OrganizationWorkersMixin, forms.Form):
+    """One action applied to many tasks of an organization, see management.bulk."""
+    UPDATE, ASSIGN, UNASSIGN, DELETE = "update", "assign", "unassign", "delete"
+
+    action = forms.ChoiceField(choices=[
+        (UPDATE, "Update"),
+        (ASSIGN, "Assign"),
+        (UNASSIGN, "Unassign"),
+        (DELETE, "Delete"),
+    ])
+    tasks = IdListField()
+    status = forms.ChoiceField(choices=Task.Status.choices, required=False)
+    priority = forms.ChoiceField(choices=Task.Priority.choices, required=False)
+    deadline = forms.DateTimeField(required=False)
+    workers = WorkerMultipleChoiceField(required=False)
+    worker_fields = ("workers",)
+
+    def __init__(self, *args, organization_id=None, **kwargs):
+        super().__init__(*args, organization_id=organization_id, **kwargs)
+        self.organization_id = organization_id
+
+    def clean_tasks(self):
+        ids = self.cleaned_data["tasks"]
+        found = set(
+            Task.objects.filter(organization_id=self.organization_id, pk__in=ids).values_list("id", flat=True)
+        )
+        unknown = [task_id for task_id in ids if task_id not in found]
+        if unknown:
+            raise ValidationError(f"Unknown tasks: {', '.join(map(str, unknown[:20]))}", code="unknown")
+        return ids
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get("action")
+        if action == self.UPDATE and not self.values():
+            raise ValidationError("Choose a status, priority or deadline to set.")
+        if action in (self.ASSIGN, self.UNASSIGN) and not cleaned_data.get("workers"):
+            self.add_error("workers", "Choose at least one worker.")
+        if action == self.DELETE and cleaned_data.get("tasks"):
+            protected = bulk.protected_task_ids(self.organization_id, cleaned_data["tasks"])
+            if protected:
+                ids = ", ".join(map(str, sorted(protected)[:20]))
+                self.add_error("tasks", f"Tasks with comments cannot be deleted: {ids}")
+        return cleaned_data
+
+    def values(self):
+        fields = ("status", "priority", "deadline")
+        return {name: self.cleaned_data[name] for name in fields if self.cleaned_data.get(name)}
+
+    def save(self):
+        """Applies the action; returns how many tasks (or assignments) changed."""
+        action, task_ids = self.cleaned_data["action"], self.cleaned_data["tasks"]
+        worker_ids = [worker.id for worker in self.cleaned_data.get("workers") or []]
+        if action == self.UPDATE:
+            return bulk.update_tasks(self.organization_id, task_ids, **self.values())
+        if action == self.ASSIGN:
+            return bulk.assign_workers(self.organization_id, task_ids, worker_ids)
+        if action == self.UNASSIGN:
+            return bulk.unassign_workers(self.organization_id, task_ids, worker_ids)
+        return bulk.delete_tasks(self.organization_id, task_ids)
+
+
+class TaskImportForm(forms.Form):
+    """A CSV, JSON lines or JSON file of tasks, see management.imports."""
+    file = forms.FileField()
+    format = forms.ChoiceField(
+        choices=[("", "From the file name")] + [(fmt, fmt.upper()) for fmt in imports.FORMATS],
+        required=False,
+    )
+
+    def __init__(self, *args, organization_id=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.organization_id = organization_id
+
+    def save(self):
+        """Imports the file; returns the ImportResult."""
+        upload = self.cleaned_data["file"]
+        fmt = self.cleaned_data["format"] or imports.guess_format(upload.name)
+        # utf-8-sig drops the byte order mark spreadsheets like to write
+        text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", errors="replace", newline="")
+        return imports.import_tasks(self.organization_id, imports.read_rows(text, fmt))
+
+
 class WorkerRegistrationForm(forms.ModelForm):
     first_name = forms.CharField(
         widget=forms.TextInput(attrs={'class': 'form-control'}),
@@ -97,8 +320,8 @@ class WorkerUpdateForm(UserChangeForm):
 
 
 class ProjectForm(ModelForm):
-    teams = forms.ModelMultipleChoiceField(
-        queryset=Team.objects.all(),
+    teams = LabelledModelMultipleChoiceField(
+        queryset=Team.objects.with_labels(),
         widget=forms.CheckboxSelectMultiple,
         required=False,
     )
@@ -116,23 +339,30 @@ class ProjectForm(ModelForm):
         exclude = ("organization",)
 
 
-class ChatGroupForm(ModelForm):
-    members = forms.ModelMultipleChoiceField(
-        queryset=Worker.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
-        required=False,
-    )
+class ChatGroupForm(OrganizationWorkersMixin, ModelForm):
+    members = WorkerMultipleChoiceField(required=False)
+    worker_fields = ("members",)
+
     class Meta:
         model = ChatRoom
         fields = ["name", "members"]
 
 
-class TaskForm(ModelForm):
-    workers = forms.ModelMultipleChoiceField(
-        queryset=Worker.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
-        required=False,
+class PrivateChatForm(OrganizationWorkersMixin, forms.Form):
+    worker_id = WorkerChoiceField(
+        label="Chat with",
+        widget=AutocompleteSelect(
+            reverse_lazy("management:worker-autocomplete"), attrs={"data-exclude-self": "1"},
+        ),
     )
+    worker_fields = ("worker_id",)
+
+
+class TaskForm(OrganizationWorkersMixin, ModelForm):
+    workers = WorkerMultipleChoiceField(required=False)
+    worker_fields = ("workers",)
+    project = LabelledModelChoiceField(queryset=Project.objects.with_labels())
+    organization_fields = ("project",)
     type = forms.ModelChoiceField(
         queryset=TaskType.objects.all(),
         required=False,
@@ -211,17 +441,16 @@ class TaskForm(ModelForm):
 
         return instance
 
-class TeamForm(ModelForm):
-    workers = forms.ModelMultipleChoiceField(
-        queryset=Worker.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
-        required=False,
-    )
-    project = forms.ModelMultipleChoiceField(
-        queryset=Project.objects.all(),
+class TeamForm(OrganizationWorkersMixin, ModelForm):
+    workers = WorkerMultipleChoiceField(required=False)
+    worker_fields = ("workers",)
+    project = LabelledModelMultipleChoiceField(
+        queryset=Project.objects.with_labels(),
         widget=forms.CheckboxSelectMultiple,
         required=False,
     )
+    organization_fields = ("project",)
+
     class Meta:
         model = Team
         exclude = ("organization",)
@@ -258,6 +487,12 @@ class SearchForm(forms.Form):
         )
     )
 
+    def search(self, queryset, organization_id=None):
+        """Returns the ranked full-text matches of the query, or the queryset unchanged without one."""
+        if not self.is_valid() or not self.cleaned_data.get("query"):
+            return queryset
+        return search_queryset(queryset, self.cleaned_data["query"], organization_id)
+
 class FeedbackForm(forms.ModelForm):
     class Meta:
         model = Feedback
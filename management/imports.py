@@ -0,0 +1,252 @@
+"""
+Bulk import of tasks from CSV, JSON lines or a JSON array.
+
+Rows are validated and created BATCH_SIZE at a time: one lookup query each for
+the projects, types and workers a batch names (types are created on demand),
+one bulk insert for the tasks and one for their assignments. Rows that don't
+validate are skipped and reported with their line number. Like management.bulk,
+this skips the per-task signals and updates the caches and search index itself.
+"""
+import csv
+import json
+from datetime import datetime, time
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from management.board import bump_board_revision
+from management.calendar_data import invalidate_calendar
+from management.dashboard import invalidate_dashboard
+from management.models import Project, Task, TaskType, Worker
+from management.search import index_new_objects
+
+BATCH_SIZE = 1000
+
+FORMATS = ("csv", "jsonl", "json")
+
+# the columns of management.exports, so an export can be imported again
+COLUMN_ALIASES = {"project__name": "project", "type__name": "type", "assignees": "workers"}
+
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+FALSE_VALUES = {"", "0", "false", "no", "n", "f"}
+
+# the enums build these lists on every access
+STATUSES = Task.Status.values
+PRIORITIES = Task.Priority.values
+
+TaskWorker = Task.workers.through
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []  # (line, message)
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def guess_format(filename):
+    extension = filename.rsplit(".", 1)[-1].lower()
+    return extension if extension in FORMATS else "csv"
+
+
+def read_rows(file, fmt="csv"):
+    """Yields (line, row) pairs from a text file; a row that can't be parsed is None."""
+    if fmt == "csv":
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == "jsonl":
+        for line, text in enumerate(file, 1):
+            if text.strip():
+                try:
+                    yield line, json.loads(text)
+                except ValueError:
+                    yield line, None
+    else:
+        try:
+            rows = json.load(file)
+        except ValueError:
+            rows = None
+        if not isinstance(rows, list):
+            yield 1, None
+            return
+        # entries of an array have no line of their own, so they are numbered
+        yield from enumerate(rows, 1)
+
+
+def _text(row, name):
+    value = row.get(name)
+    return "" if value is None else str(value).strip()
+
+
+def _choice(row, name, choices, default):
+    value = _text(row, name) or default
+    if value not in choices:
+        raise ValueError(f"{name}: {value!r} is not one of {', '.join(choices)}.")
+    return value
+
+
+def _boolean(row, name):
+    value = row.get(name)
+    if isinstance(value, bool):
+        return value
+    value = _text(row, name).lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"{name}: {value!r} is not a boolean.")
+
+
+def _deadline(row):
+    value = _text(row, "deadline")
+    if not value:
+        return None
+    try:
+        deadline = parse_datetime(value)
+        if deadline is None:
+            day = parse_date(value)
+            deadline = day and datetime.combine(day, time())
+    except ValueError:
+        deadline = None
+    if deadline is None:
+        raise ValueError(f"deadline: {value!r} is not a date.")
+    if timezone.is_naive(deadline):
+        deadline = timezone.make_aware(deadline)
+    return deadline
+
+
+def _workers(row):
+    value = row.get("workers")
+    if isinstance(value, list):
+        names = [str(name).strip() for name in value]
+    else:
+        names = _text(row, "workers").replace(",", ";").split(";")
+    return sorted({name for name in names if name})
+
+
+def clean_row(row):
+    """The task fields of a row; raises ValueError describing what is wrong with it."""
+    if not isinstance(row, dict):
+        raise ValueError("Not a row of named fields.")
+    row = {COLUMN_ALIASES.get(key, key): value for key, value in row.items()}
+    cleaned = {
+        "name": _text(row, "name"),
+        "description": _text(row, "description"),
+        "status": _choice(row, "status", STATUSES, Task.Status.todo),
+        "priority": _choice(row, "priority", PRIORITIES, Task.Priority.urgent),
+        "deadline": _deadline(row),
+        "is_completed": _boolean(row, "is_completed"),
+        "project": _text(row, "project"),
+        "type": _text(row, "type"),
+        "workers": _workers(row),
+    }
+    for name, max_length in (("name", 100), ("project", 100), ("type", 30)):
+        if not cleaned[name]:
+            raise ValueError(f"{name}: this field is required.")
+        if len(cleaned[name]) > max_length:
+            raise ValueError(f"{name}: at most {max_length} characters.")
+    return cleaned
+
+
+class _Lookups:
+    """Ids by name, remembered across batches so every name is looked up once."""
+
+    def __init__(self, organization_id):
+        self.organization_id = organization_id
+        self.projects = {}
+        self.types = {}
+        self.workers = {}
+
+    def _load(self, known, names, queryset, field):
+        missing = set(names) - known.keys()
+        if missing:
+            known.update(dict.fromkeys(missing))
+            # the lowest id wins when a name is taken twice
+            rows = queryset.filter(**{f"{field}__in": missing}).order_by("-id").values_list(field, "id")
+            known.update(rows)
+
+    def load_projects(self, names):
+        self._load(self.projects, names, Project.objects.filter(organization_id=self.organization_id), "name")
+
+    def load_workers(self, names):
+        self._load(self.workers, names, Worker.objects.filter(organization_id=self.organization_id), "username")
+
+    def load_types(self, names):
+        names = set(names)
+        self._load(self.types, names, TaskType.objects.all(), "name")
+        missing = sorted(name for name in names if self.types[name] is None)
+        for task_type in TaskType.objects.bulk_create(TaskType(name=name) for name in missing):
+            self.types[task_type.name] = task_type.id
+
+
+def _import_batch(organization_id, batch, lookups, result):
+    cleaned = []
+    for line, row in batch:
+        try:
+            cleaned.append((line, clean_row(row)))
+        except ValueError as error:
+            result.error(line, str(error))
+
+    lookups.load_projects(row["project"] for _, row in cleaned)
+    lookups.load_workers(name for _, row in cleaned for name in row["workers"])
+    valid = []
+    for line, row in cleaned:
+        unknown = [name for name in row["workers"] if lookups.workers[name] is None]
+        if lookups.projects[row["project"]] is None:
+            result.error(line, f"project: no project named {row['project']!r}.")
+        elif unknown:
+            result.error(line, f"workers: no workers named {', '.join(unknown)}.")
+        else:
+            valid.append(row)
+    if not valid:
+        return set()
+
+    lookups.load_types(row["type"] for row in valid)
+    tasks = Task.objects.bulk_create(
+        Task(
+            name=row["name"],
+            description=row["description"],
+            status=row["status"],
+            priority=row["priority"],
+            deadline=row["deadline"],
+            is_completed=row["is_completed"],
+            project_id=lookups.projects[row["project"]],
+            type_id=lookups.types[row["type"]],
+            organization_id=organization_id,
+        )
+        for row in valid
+    )
+    assignments = [
+        TaskWorker(task_id=task.id, worker_id=lookups.workers[name])
+        for task, row in zip(tasks, valid)
+        for name in row["workers"]
+    ]
+    TaskWorker.objects.bulk_create(assignments)
+    index_new_objects(tasks)
+    result.created += len(tasks)
+    return {assignment.worker_id for assignment in assignments}
+
+
+def import_tasks(organization_id, rows, batch_size=BATCH_SIZE):
+    """
+    Creates the tasks of (line, row) pairs such as read_rows() yields in one
+    transaction; returns an ImportResult with the count and the skipped rows.
+    """
+    result = ImportResult()
+    lookups = _Lookups(organization_id)
+    worker_ids = set()
+    rows = iter(rows)
+    with transaction.atomic():
+        while batch := list(islice(rows, batch_size)):
+            worker_ids |= _import_batch(organization_id, batch, lookups, result)
+        if result.created:
+            bump_board_revision(organization_id)
+    if result.created:
+        invalidate_dashboard(organization_id)
+        invalidate_calendar(*worker_ids)
+    return result
@@ -0,0 +1,493 @@
+"""
+Channel layer that shares groups and channels between processes.
+
+Every process keeps its own mailboxes and group memberships and talks to the
+others through a broker: group_send() and sends to channels owned by another
+process are published to all processes, and each one delivers the message to
+its local members. Two brokers are shipped:
+
+* PostgresBroker uses LISTEN/NOTIFY on the project's database.
+* SocketBroker connects to a SocketHub (``manage.py runchannelhub``), a small
+  TCP fan-out relay that stands in for a real broker locally and in tests.
+"""
+import asyncio
+import json
+import logging
+import select
+import socket
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("!I")
+
+
+class MessageTooLarge(ValueError):
+    """Raised for a message that does not fit in one broker payload; nobody receives it."""
+
+
+class _Mailbox:
+    def __init__(self):
+        self.messages = deque()
+        self.waiters = deque()
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class BrokerChannelLayer(BaseChannelLayer):
+    extensions = ["groups", "flush"]
+
+    def __init__(
+        self,
+        broker="management.layers.PostgresBroker",
+        broker_options=None,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        **kwargs,
+    ):
+        super().__init__(
+            expiry=expiry,
+            capacity=capacity,
+            channel_capacity=channel_capacity,
+            **kwargs,
+        )
+        broker_class = import_string(broker) if isinstance(broker, str) else broker
+        self.broker = broker_class(**(broker_options or {}))
+        self.group_expiry = group_expiry
+        self.client_prefix = f"specific.{uuid.uuid4().hex[:12]}!"
+        self.channels = {}
+        self.groups = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    # Channel layer API
+
+    async def new_channel(self, prefix="specific"):
+        return f"{self.client_prefix}{uuid.uuid4().hex[:12]}"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        self._ensure_started()
+        if self._is_local(channel):
+            if not self._deliver(channel, message):
+                raise ChannelFull(channel)
+            return
+        payload = self._encode({"channel": channel, "message": message})
+        self._deliver(channel, message)
+        await self.broker.publish(payload)
+
+    async def receive(self, channel):
+        self.require_valid_channel_name(channel)
+        self._ensure_started()
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                mailbox = self.channels.setdefault(channel, _Mailbox())
+                while mailbox.messages:
+                    expires, message = mailbox.messages.popleft()
+                    if expires >= time.time():
+                        return message
+                future = loop.create_future()
+                waiter = (loop, future)
+                mailbox.waiters.append(waiter)
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter in mailbox.waiters:
+                        mailbox.waiters.remove(waiter)
+                    elif mailbox.messages:
+                        # we were woken for a message we will never take
+                        self._wake_next(mailbox)
+                    if not mailbox.messages and not mailbox.waiters:
+                        self.channels.pop(channel, None)
+                raise
+
+    async def flush(self):
+        with self._lock:
+            self.channels = {}
+            self.groups = {}
+
+    async def close(self):
+        self.broker.stop()
+        self._started = False
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        with self._lock:
+            self.groups.setdefault(group, {})[channel] = time.time() + self.group_expiry
+
+    async def group_discard(self, group, channel):
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        with self._lock:
+            members = self.groups.get(group)
+            if members is not None:
+                members.pop(channel, None)
+                if not members:
+                    del self.groups[group]
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_group_name(group)
+        self._ensure_started()
+        # encoded first, so a message too large to publish is not delivered locally either
+        payload = self._encode({"group": group, "message": message})
+        self._deliver_group(group, message)
+        await self.broker.publish(payload)
+
+    # Internals
+
+    def _is_local(self, channel):
+        return channel.startswith(self.client_prefix)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._lock:
+            if not self._started:
+                self.broker.start(self._on_payload)
+                self._started = True
+
+    def _encode(self, envelope):
+        envelope["origin"] = self.client_prefix
+        # UTF-8 instead of \uXXXX escapes, which take six bytes per character
+        payload = json.dumps(envelope, ensure_ascii=False).encode()
+        if self.broker.MAX_PAYLOAD is not None and len(payload) > self.broker.MAX_PAYLOAD:
+            raise MessageTooLarge(f"Channel layer message of {len(payload)} bytes is too large for the broker")
+        return payload
+
+    def _on_payload(self, payload):
+        """Called by the broker thread for every message published by any process."""
+        try:
+            envelope = json.loads(payload)
+        except ValueError:
+            logger.warning("Dropping malformed channel layer payload")
+            return
+        if envelope.get("origin") == self.client_prefix:
+            return
+        if "group" in envelope:
+            self._deliver_group(envelope["group"], envelope["message"])
+        elif "channel" in envelope:
+            self._deliver(envelope["channel"], envelope["message"])
+
+    def _deliver_group(self, group, message):
+        now = time.time()
+        with self._lock:
+            members = self.groups.get(group, {})
+            for channel, expires in list(members.items()):
+                if expires < now:
+                    del members[channel]
+            channels = list(members)
+        for channel in channels:
+            if not self._deliver(channel, message):
+                logger.debug("Channel %s is full, dropping group message", channel)
+
+    def _deliver(self, channel, message):
+        """Queues a message for a channel listened to in this process; returns False if it is full."""
+        with self._lock:
+            mailbox = self.channels.get(channel)
+            if mailbox is None:
+                if not self._is_local(channel):
+                    return True
+                mailbox = self.channels[channel] = _Mailbox()
+            if len(mailbox.messages) >= self.get_capacity(channel):
+                return False
+            mailbox.messages.append((time.time() + self.expiry, message))
+            self._wake_next(mailbox)
+        return True
+
+    @staticmethod
+    def _wake_next(mailbox):
+        while mailbox.waiters:
+            loop, future = mailbox.waiters.popleft()
+            if not future.done() and not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, future)
+                return
+
+
+class PostgresBroker:
+    """Publishes with pg_notify() and listens on a dedicated connection."""
+
+    # NOTIFY payloads must be shorter than 8000 bytes
+    MAX_PAYLOAD = 7999
+
+    def __init__(self, channel="taskhive_layer", database="default", poll_interval=1.0,
+                 reconnect_delay=0.5, max_reconnect_delay=30.0):
+        self.channel = channel
+        self.database = database
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self._publish_lock = threading.Lock()
+        self._publisher = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+        from django.db import connections
+
+        params = connections[self.database].get_connection_params()
+        conn = psycopg2.connect(**params)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    def _listener(self):
+        listener = self._connect()
+        with listener.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return listener
+
+    def start(self, callback):
+        self._stopping.clear()
+        listener = self._listener()
+        self._thread = threading.Thread(
+            target=self._listen, args=(listener, callback), daemon=True,
+            name="channel-layer-listener",
+        )
+        self._thread.start()
+
+    def _listen(self, listener, callback):
+        """
+        Hands every notification to the callback; a lost connection is reopened
+        (and LISTEN issued again) with exponential backoff. Notifications sent
+        while disconnected are lost, as NOTIFY does not queue them.
+        """
+        import psycopg2
+
+        delay = self.reconnect_delay
+        while not self._stopping.is_set():
+            try:
+                if listener is None:
+                    listener = self._listener()
+                    logger.info("Channel layer listener reconnected")
+                    delay = self.reconnect_delay
+                if select.select([listener], [], [], self.poll_interval) == ([], [], []):
+                    continue
+                listener.poll()
+                while listener.notifies:
+                    callback(listener.notifies.pop(0).payload)
+            except (psycopg2.Error, OSError, ValueError) as error:
+                # ValueError: select() on a connection that was closed under us
+                if self._stopping.is_set():
+                    break
+                logger.warning("Channel layer listener lost its connection (%s), reconnecting in %.1fs", error, delay)
+                self._close(listener)
+                listener = None
+                self._stopping.wait(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        self._close(listener)
+
+    @staticmethod
+    def _close(listener):
+        if listener is not None and not listener.closed:
+            listener.close()
+
+    def _notify(self, payload):
+        with self._publish_lock:
+            if self._publisher is None or self._publisher.closed:
+                self._publisher = self._connect()
+            with self._publisher.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    async def publish(self, payload):
+        if len(payload) > self.MAX_PAYLOAD:
+            raise MessageTooLarge(f"Channel layer message of {len(payload)} bytes is too large for NOTIFY")
+        await asyncio.get_running_loop().run_in_executor(None, self._notify, payload.decode())
+
+    def stop(self):
+        self._stopping.set()
+        with self._publish_lock:
+            if self._publisher is not None:
+                self._publisher.close()
+                self._publisher = None
+
+
+def _read_exactly(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return data
+
+
+class SocketBroker:
+    """Client of a SocketHub; frames are length-prefixed payloads."""
+
+    MAX_PAYLOAD = None
+
+    def __init__(self, host="127.0.0.1", port=8765, reconnect_delay=0.5, send_attempts=3):
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.send_attempts = send_attempts
+        self._sock = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _open(self):
+        sock = socket.create_connection((self.host, self.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _replace(self, dead):
+        """Swaps a dead socket for a new connection, unless another thread already has. Needs the lock."""
+        if self._sock is dead:
+            self._sock = None
+            if dead is not None:
+                dead.close()
+            self._sock = self._open()
+
+    def start(self, callback):
+        self._stopping.clear()
+        self._sock = self._open()
+        self._thread = threading.Thread(
+            target=self._listen, args=(callback,), daemon=True,
+            name="channel-layer-listener",
+        )
+        self._thread.start()
+
+    def _listen(self, callback):
+        while not self._stopping.is_set():
+            sock = self._sock
+            try:
+                if sock is None:
+                    raise ConnectionError("Not connected")
+                size, = FRAME_HEADER.unpack(_read_exactly(sock, FRAME_HEADER.size))
+                callback(_read_exactly(sock, size))
+            except OSError:
+                if self._stopping.is_set():
+                    return
+                if self._sock is not sock:
+                    # a publisher reconnected already
+                    continue
+                logger.warning("Lost connection to channel hub, reconnecting")
+                self._stopping.wait(self.reconnect_delay)
+                try:
+                    with self._lock:
+                        self._replace(sock)
+                except OSError:
+                    continue
+
+    def _send(self, frame):
+        with self._lock:
+            for attempt in range(self.send_attempts):
+                sock = self._sock
+                try:
+                    if sock is None:
+                        raise ConnectionError("Not connected")
+                    sock.sendall(frame)
+                    return
+                except OSError as error:
+                    if self._stopping.is_set():
+                        return
+                    logger.warning("Sending to channel hub failed (%s), reconnecting", error)
+                    if attempt:
+                        time.sleep(self.reconnect_delay)
+                    try:
+                        self._replace(sock)
+                    except OSError:
+                        pass
+        logger.error("Channel hub unreachable, dropping a channel layer message")
+
+    async def publish(self, payload):
+        # sendall() blocks, and the lock is shared with the listener thread
+        frame = FRAME_HEADER.pack(len(payload)) + payload
+        await asyncio.get_running_loop().run_in_executor(None, self._send, frame)
+
+    def stop(self):
+        self._stopping.set()
+        if self._sock is not None:
+            self._sock.close()
+
+
+class SocketHub:
+    """Relays every frame it receives to all other connected SocketBrokers."""
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.host = host
+        self.port = port
+        self.clients = set()
+        self._server = None
+        self._loop = None
+
+    async def _handle(self, reader, writer):
+        self.clients.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                frame = header + await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+                for client in list(self.clients):
+                    if client is not writer:
+                        client.write(frame)
+                for client in list(self.clients):
+                    if client is not writer:
+                        await client.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    async def serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def serve_forever(self):
+        async def run():
+            server = await self.serve()
+            async with server:
+                await server.serve_forever()
+
+        asyncio.run(run())
+
+    def start_in_thread(self):
+        """Starts the hub on a background event loop and returns once it is listening."""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        threading.Thread(target=run, daemon=True, name="channel-hub").start()
+        ready.wait()
+        return self
+
+    async def _shutdown(self):
+        self._server.close()
+        for client in list(self.clients):
+            client.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        if tasks:
+            await asyncio.wait(tasks, timeout=1)
+        self._loop.stop()
+
+    def stop(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
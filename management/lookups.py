@@ -0,0 +1,77 @@
+import sys
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Upper
+
+from management.models import Worker
+from management.pagination import CursorPaginator
+
+PAGE_SIZE = 20
+NAME_FIELDS = ("username", "first_name", "last_name")
+
+
+def _sqlite_upper(text):
+    return "".join(char.upper() if char.isascii() else char for char in text)
+
+
+def _upper_prefixes(term):
+    """What UPPER() of a name starting with the term starts with."""
+    if connection.vendor != "sqlite" or term.isascii():
+        return {term.upper()}
+    # SQLite's UPPER() folds ASCII letters only and leaves "Ölga" as "ÖLGA" but "ölga" as
+    # "öLGA", so a non-ASCII term matches its lower, upper and capitalized spellings only
+    return {_sqlite_upper(spelling) for spelling in (term, term.lower(), term.upper(), term.capitalize())}
+
+
+def _prefix_range(field, term):
+    """
+    Case-insensitive prefix match written as ranges on UPPER(field), so the
+    (organization, UPPER(field)) indexes of Worker serve it; LIKE/ILIKE would not.
+    """
+    condition = Q()
+    for upper in _upper_prefixes(term):
+        prefix = Q(**{f"{field}__gte": upper})
+        if ord(upper[-1]) < sys.maxunicode:
+            prefix &= Q(**{f"{field}__lt": upper[:-1] + chr(ord(upper[-1]) + 1)})
+        condition |= prefix
+    return condition
+
+
+def worker_lookup_queryset(organization_id, query=""):
+    """Workers of an organization where every term of the query starts one of their names."""
+    queryset = Worker.objects.filter(organization_id=organization_id).annotate(
+        **{f"{field}_upper": Upper(field) for field in NAME_FIELDS}
+    )
+    for term in query.split():
+        condition = Q()
+        for field in NAME_FIELDS:
+            condition |= _prefix_range(f"{field}_upper", term)
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def worker_label(worker):
+    """Display name of a worker row (model instance or values() dict)."""
+    if isinstance(worker, dict):
+        username, first_name, last_name = (worker[field] for field in NAME_FIELDS)
+    else:
+        username, first_name, last_name = (getattr(worker, field) for field in NAME_FIELDS)
+    full_name = f"{first_name} {last_name}".strip()
+    return f"{full_name} ({username})" if full_name else username
+
+
+def worker_lookup_page(organization_id, query="", cursor=None, exclude_ids=()):
+    """
+    One page of lookup results as {"results": [{"id", "label"}], "next": cursor}.
+    Raises ValueError for a cursor that was not made by this lookup.
+    """
+    queryset = worker_lookup_queryset(organization_id, query)
+    if exclude_ids:
+        queryset = queryset.exclude(pk__in=exclude_ids)
+    queryset = queryset.values("id", *NAME_FIELDS)
+    page = CursorPaginator(queryset, PAGE_SIZE, ("username", "id")).page(cursor)
+    return {
+        "results": [{"id": row["id"], "label": worker_label(row)} for row in page],
+        "next": page.next_cursor,
+    }
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from collections import defaultdict
+
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from management.async_views import VIEWS
+from management.benchmarking import percentile
+from management.models import ChatRoom
+
+User = get_user_model()
+
+ROOM_PREFIX = "benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives the ASGI application in this process with concurrent HTTP clients and chatting "
+        "websocket clients, reporting latencies, peak concurrency and event loop lag. Run it "
+        "with different ASYNC_VIEWS settings to compare the sync and async views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--http-clients", type=int, default=20)
+        parser.add_argument("--ws-clients", type=int, default=20)
+        parser.add_argument("--duration", type=float, default=10, help="Seconds of load.")
+        parser.add_argument("--url", action="append", dest="urls", help="Path to request (repeatable).")
+        parser.add_argument("--username", help="Worker the clients log in as (default: first with an organization).")
+        parser.add_argument("--host", default=(settings.ALLOWED_HOSTS or ["testserver"])[0])
+
+    def handle(self, *args, **options):
+        from TaskHive.asgi import application
+
+        workers = User.objects.filter(organization__isnull=False)
+        if options["username"]:
+            workers = workers.filter(username=options["username"])
+        user = workers.order_by("id").first()
+        if user is None:
+            raise CommandError("No worker with an organization to log in as.")
+
+        client = Client()
+        client.force_login(user)
+        cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        headers = [(b"host", options["host"].encode()), (b"cookie", cookie.encode())]
+        urls = options["urls"] or [
+            reverse(f"management:{name}") for name in ("index", "task-list", "project-list", "comment-list")
+        ]
+        # one room per websocket client, so every send is answered by exactly one echo
+        rooms = [
+            ChatRoom.objects.create(name=f"{ROOM_PREFIX} {n}", organization_id=user.organization_id)
+            for n in range(options["ws_clients"])
+        ]
+        try:
+            results = asyncio.run(self._run(application, headers, urls, rooms, options))
+        finally:
+            ChatRoom.objects.filter(id__in=[room.id for room in rooms]).delete()
+        self._report(results, options["duration"])
+
+    async def _run(self, application, headers, urls, rooms, options):
+        deadline = time.monotonic() + options["duration"]
+        results = {
+            "latencies": defaultdict(list),
+            "errors": defaultdict(int),
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "ws_latencies": [],
+            "ws_errors": 0,
+            "loop_lag": [],
+        }
+
+        async def http_client():
+            while time.monotonic() < deadline:
+                for url in urls:
+                    communicator = HttpCommunicator(application, "GET", url, headers=headers)
+                    results["in_flight"] += 1
+                    results["peak_in_flight"] = max(results["peak_in_flight"], results["in_flight"])
+                    start = time.perf_counter()
+                    try:
+                        response = await communicator.get_response(timeout=60)
+                    finally:
+                        results["in_flight"] -= 1
+                    results["latencies"][url].append(time.perf_counter() - start)
+                    if response["status"] >= 400:
+                        results["errors"][url] += 1
+
+        async def ws_client(room):
+            communicator = WebsocketCommunicator(application, f"/ws/group/{room.id}/", headers=headers)
+            connected, _ = await communicator.connect(timeout=30)
+            if not connected:
+                results["ws_errors"] += 1
+                return
+            try:
+                await communicator.receive_json_from(timeout=30)
+                while time.monotonic() < deadline:
+                    start = time.perf_counter()
+                    await communicator.send_json_to({"message": "benchmark"})
+                    await communicator.receive_json_from(timeout=30)
+                    results["ws_latencies"].append(time.perf_counter() - start)
+            finally:
+                await communicator.disconnect()
+
+        async def loop_monitor():
+            # a blocked event loop wakes this sleeper late
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                results["loop_lag"].append(time.perf_counter() - start - 0.01)
+
+        await asyncio.gather(
+            loop_monitor(),
+            *(http_client() for _ in range(options["http_clients"])),
+            *(ws_client(room) for room in rooms),
+        )
+        return results
+
+    def _report(self, results, duration):
+        selected = settings.ASYNC_VIEWS
+        async_names = sorted(VIEWS) if "all" in selected else sorted(set(selected) & set(VIEWS))
+        self.stdout.write(f"async views: {', '.join(async_names) or 'none'}")
+        self.stdout.write(f"{'url':<30} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        total = 0
+        for url, latencies in results["latencies"].items():
+            total += len(latencies)
+            self.stdout.write(
+                f"{url:<30} {len(latencies):>9} {results['errors'][url]:>7} {len(latencies) / duration:>8.1f} "
+                f"{percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f}"
+            )
+        ws = results["ws_latencies"]
+        self.stdout.write(
+            f"{'websocket round trips':<30} {len(ws):>9} {results['ws_errors']:>7} {len(ws) / duration:>8.1f} "
+            f"{percentile(ws, 0.5) * 1000:>8.1f} {percentile(ws, 0.95) * 1000:>8.1f}"
+        )
+        lag = results["loop_lag"]
+        self.stdout.write(
+            f"{total / duration:.1f} HTTP req/s, peak {results['peak_in_flight']} requests in flight, "
+            f"event loop lag p95 {percentile(lag, 0.95) * 1000:.1f} ms, max {max(lag, default=0) * 1000:.1f} ms"
+        )
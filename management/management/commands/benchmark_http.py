@@ -0,0 +1,126 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.utils import timezone
+
+from management.benchmarking import (
+    Results, build_mix, compare, load_baseline, logged_in_clients, plan, run_asgi, run_wsgi, save_baseline,
+    session_headers,
+)
+from management.models import Task
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays a weighted mix of requests to the management views through the WSGI or ASGI "
+        "application in this process, as several logged in workers, and reports p50/p95/p99 "
+        "latency, throughput and queries per request. --save writes a JSON baseline, --compare "
+        "flags regressions against one. Seed the database first (e.g. seed_scale_data) for "
+        "representative numbers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=("wsgi", "asgi"), default="wsgi")
+        parser.add_argument("--requests", type=int, default=500, help="Measured requests in total.")
+        parser.add_argument("--clients", type=int, default=4, help="Concurrent clients.")
+        parser.add_argument("--users", type=int, default=4, help="Workers to log in as, round robin.")
+        parser.add_argument("--organization", help="Organization id or name (default: the one with most tasks).")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the request mix.")
+        parser.add_argument("--host", default=(settings.ALLOWED_HOSTS or ["testserver"])[0])
+        parser.add_argument("--save", metavar="PATH", help="Write the results as a JSON baseline.")
+        parser.add_argument("--compare", metavar="PATH", help="Baseline to flag regressions against.")
+        parser.add_argument("--threshold", type=float, default=0.2, help="Tolerated slowdown (default 20%%).")
+
+    def handle(self, *args, **options):
+        workers = self._workers(options)
+        rng = random.Random(options["seed"])
+        # a session of its own for every concurrent client, the workers taking turns
+        clients = logged_in_clients(
+            [workers[n % len(workers)] for n in range(max(options["clients"], 1))], options["host"],
+        )
+        mix = build_mix(clients[0], workers[0].organization_id, rng)
+        requests = plan(mix, options["requests"], rng)
+        # one of each first, so caches are warm and lazy imports done before measuring
+        warmup = [(entry.label, entry.paths[0]) for entry in mix]
+
+        if options["mode"] == "wsgi":
+            run_wsgi(clients[:1], warmup, Results())
+            results = run_wsgi(clients, requests, Results())
+        else:
+            from TaskHive.asgi import application
+
+            headers = [session_headers(client, options["host"]) for client in clients]
+            run_asgi(application, headers, warmup, 1, Results())
+            results = run_asgi(application, headers, requests, options["clients"], Results())
+
+        summary, throughput = results.summary(), results.throughput()
+        self._report(summary, throughput)
+
+        regressions = []
+        if options["compare"]:
+            try:
+                baseline = load_baseline(options["compare"])
+            except (OSError, ValueError) as error:
+                raise CommandError(f"Cannot read the baseline: {error}")
+            regressions = compare(baseline, summary, throughput, options["threshold"])
+            differing = [
+                name for name in ("mode", "clients", "organization_id")
+                if name in baseline.get("meta", {})
+                and baseline["meta"][name] != (workers[0].organization_id if name == "organization_id" else options[name])
+            ]
+            if differing:
+                self.stdout.write(self.style.WARNING(f"The baseline ran with a different {', '.join(differing)}."))
+        if options["save"]:
+            meta = {
+                "created": timezone.now().isoformat(),
+                **{name: options[name] for name in ("mode", "requests", "clients", "users", "seed")},
+                "organization_id": workers[0].organization_id,
+            }
+            save_baseline(options["save"], summary, throughput, meta)
+            self.stdout.write(f"Saved the baseline to {options['save']}.")
+        if options["compare"]:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f"REGRESSION {regression}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regressions against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
+
+    def _workers(self, options):
+        organization = options["organization"]
+        workers = User.objects.filter(organization__isnull=False, is_active=True)
+        if organization:
+            workers = workers.filter(
+                organization_id=organization) if organization.isdigit() else workers.filter(organization__name=organization)
+        else:
+            busiest = (
+                Task.objects.filter(organization__isnull=False)
+                .values("organization_id")
+                .annotate(tasks=Count("id"))
+                .order_by("-tasks", "organization_id")
+                .values_list("organization_id", flat=True)
+                .first()
+            )
+            workers = workers.filter(organization_id=busiest)
+        workers = list(workers.order_by("id")[:options["users"]])
+        if not workers:
+            raise CommandError("No workers to log in as.")
+        return workers
+
+    def _report(self, summary, throughput):
+        self.stdout.write(
+            f"{'request':<26} {'view':<28} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'req/s':>7} {'queries':>7}"
+        )
+        for label, result in summary.items():
+            queries = "" if result["queries"] is None else f"{result['queries']:.1f}"
+            self.stdout.write(
+                f"{label:<26} {result['view']:<28} {result['requests']:>6} {result['errors']:>6} "
+                f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                f"{result['rps']:>7.1f} {queries:>7}"
+            )
+        self.stdout.write(f"{throughput:.1f} requests/s in total")
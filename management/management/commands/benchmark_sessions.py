@@ -0,0 +1,58 @@
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+ENGINES = [
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+    "django.contrib.sessions.backends.cache",
+    "django.contrib.sessions.backends.signed_cookies",
+]
+
+
+def _measure(func, iterations):
+    """Returns (ms per call, queries per call) of func over the given iterations."""
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+    return elapsed / iterations * 1000, len(queries) / iterations
+
+
+class Command(BaseCommand):
+    help = "Times reading and writing an authenticated session with each session engine."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500)
+        parser.add_argument("--engine", action="append", dest="engines", help="Engine to test (repeatable).")
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        self.stdout.write(f"{'engine':<50} {'read ms':>8} {'read q':>7} {'write ms':>9} {'write q':>8}")
+        for engine in options["engines"] or ENGINES:
+            store_class = import_module(engine).SessionStore
+            session = store_class()
+            session.update({"_auth_user_id": "1", "_auth_user_backend": "x", "_auth_user_hash": "h" * 64})
+            session.save()
+            key = session.session_key
+
+            def read():
+                store_class(key).get("_auth_user_id")
+
+            def write():
+                nonlocal key
+                store = store_class(key)
+                store["counter"] = store.get("counter", 0) + 1
+                store.save()
+                key = store.session_key
+
+            read_ms, read_queries = _measure(read, iterations)
+            write_ms, write_queries = _measure(write, iterations)
+            store_class(key).delete()
+            self.stdout.write(
+                f"{engine:<50} {read_ms:>8.3f} {read_queries:>7.1f} {write_ms:>9.3f} {write_queries:>8.1f}"
+            )
@@ -0,0 +1,376 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from management.benchmarking import (
+    CommunicatorSocket, RawWebSocket, logged_in_clients, percentile, session_headers,
+)
+from management.models import ChatRoom, Message, Organization, Worker
+from management.seeding import create_dated
+
+SCENARIOS = ("fanout", "storm", "history", "sustained")
+
+# the temporary organization of a run is named "<PREFIX> <random hex>"
+PREFIX = "wsbench"
+
+
+def _ms(values, fraction):
+    return f"{percentile(values, fraction) * 1000:.1f}"
+
+
+def _stamp(size):
+    """A chat line carrying the time it was sent, padded to size characters."""
+    stamp = f"{time.perf_counter():.6f}"
+    return stamp + " " + "x" * max(size - len(stamp) - 1, 0)
+
+
+def _rss_kb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the chat consumers with four scenarios: fanout (N rooms x M members, one "
+        "sender per room), storm (many sockets connecting at once to rooms with a large history), "
+        "history (paging a socket through a whole history) and sustained (a steady send rate). "
+        "Reports connect latency, history payload sizes, end-to-end delivery latency and memory "
+        "per connection. Sockets talk to the ASGI application in this process, or over real "
+        "sockets to daphne with --serve (started here) or --url (already running on this database)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenario", action="append", dest="scenarios", choices=SCENARIOS)
+        parser.add_argument("--rooms", type=int, default=10)
+        parser.add_argument("--members", type=int, default=10, help="Sockets per room (fanout, sustained).")
+        parser.add_argument("--private", action="store_true", help="Use private chats (two members per room).")
+        parser.add_argument("--messages", type=int, default=20, help="Lines each fanout sender sends.")
+        parser.add_argument("--message-size", type=int, default=100)
+        parser.add_argument("--connections", type=int, default=200, help="Sockets of the connect storm.")
+        parser.add_argument("--history", type=int, default=5000, help="Messages already in every room.")
+        parser.add_argument("--rate", type=float, default=200, help="Lines per second of the sustained scenario.")
+        parser.add_argument("--duration", type=float, default=10, help="Seconds of the sustained scenario.")
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument("--serve", action="store_true", help="Start daphne and use real sockets.")
+        parser.add_argument("--port", type=int, default=8865)
+        parser.add_argument("--url", help="ws://host:port of a running server to use instead.")
+        parser.add_argument("--host", default=(settings.ALLOWED_HOSTS or ["testserver"])[0])
+
+    def handle(self, *args, **options):
+        if options["private"]:
+            options["members"] = 2
+        if options["rooms"] < 1 or options["members"] < 1:
+            raise CommandError("--rooms and --members must be at least 1.")
+        self.options = options
+        self.server = None
+        self.clients = []
+        organization = Organization.objects.create(name=f"{PREFIX} {uuid.uuid4().hex[:12]}")
+        try:
+            rooms = self._setup(organization, options)
+            if options["serve"]:
+                self.server = self._serve(options["port"])
+                options["url"] = f"ws://127.0.0.1:{options['port']}"
+            if options["url"]:
+                self.open_socket = lambda path, headers: RawWebSocket(options["url"], path, headers)
+                self.stdout.write(f"real sockets to {options['url']}")
+            else:
+                from TaskHive.asgi import application
+
+                self.open_socket = lambda path, headers: CommunicatorSocket(application, path, headers)
+                self.stdout.write("in-process sockets (WebsocketCommunicator)")
+            self.headers = {client.worker_id: session_headers(client, options["host"]) for client in self.clients}
+            for scenario in options["scenarios"] or SCENARIOS:
+                asyncio.run(getattr(self, scenario)(rooms))
+        finally:
+            if self.server:
+                self.server.terminate()
+                self.server.wait(10)
+            self._teardown(organization)
+
+    # -----------------------------------------------------------------
+    # fixtures
+    # -----------------------------------------------------------------
+    def _setup(self, organization, options):
+        worker_count = options["rooms"] * 2 if options["private"] else options["members"]
+        password = make_password(None)
+        workers = Worker.objects.bulk_create(
+            Worker(username=f"{PREFIX}-{organization.id}-{n}", password=password, organization=organization)
+            for n in range(worker_count)
+        )
+        rooms = []
+        for n in range(options["rooms"]):
+            if options["private"]:
+                members = sorted(workers[2 * n:2 * n + 2], key=lambda worker: worker.id)
+                # the name PrivateChatConsumer looks the room up by
+                name = f"private_{members[0].id}_{members[1].id}"
+            else:
+                members, name = workers, f"{PREFIX} room {n}"
+            room = ChatRoom.objects.create(name=name, organization=organization)
+            room.members.add(*members)
+            room.member_ids = [worker.id for worker in members]
+            rooms.append(room)
+
+        if options["history"]:
+            start = timezone.now() - timedelta(days=30)
+            for room in rooms:
+                create_dated(Message, (
+                    Message(
+                        room=room,
+                        sender_id=room.member_ids[n % len(room.member_ids)],
+                        content=f"history line {n}",
+                        timestamp=start + timedelta(seconds=n),
+                        organization=organization,
+                    )
+                    for n in range(options["history"])
+                ), "timestamp", batch_size=2000)
+
+        self.clients = logged_in_clients(workers, options["host"])
+        for client, worker in zip(self.clients, workers):
+            client.worker_id = worker.id
+        self.stdout.write(
+            f"{len(rooms)} rooms, {len(workers)} workers, {options['history']} messages of history per room"
+        )
+        return rooms
+
+    def _teardown(self, organization):
+        for client in self.clients:
+            client.logout()
+        # messages have no delete signals, so this is one DELETE
+        Message.objects.filter(room__organization=organization).delete()
+        ChatRoom.objects.filter(organization=organization).delete()
+        Worker.objects.filter(organization=organization).delete()
+        organization.delete()
+
+    def _serve(self, port):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "TaskHive.settings")}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "daphne", "-b", "127.0.0.1", "-p", str(port), "TaskHive.asgi:application"],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("daphne exited while starting.")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError("daphne did not start listening.")
+
+    # -----------------------------------------------------------------
+    # sockets
+    # -----------------------------------------------------------------
+    def _path(self, room, worker_id):
+        if self.options["private"]:
+            other = next(member for member in room.member_ids if member != worker_id)
+            return f"/ws/private/{worker_id}/{other}/"
+        return f"/ws/group/{room.id}/"
+
+    async def _connect(self, room, worker_id):
+        """A socket that has received its history; returns (socket, seconds, history frame size)."""
+        socket_ = self.open_socket(self._path(room, worker_id), self.headers[worker_id])
+        start = time.perf_counter()
+        await socket_.connect(self.options["timeout"])
+        history = await socket_.receive(self.options["timeout"])
+        return socket_, time.perf_counter() - start, len(history.encode())
+
+    async def _connect_all(self, targets):
+        """Connects (room, worker id) pairs at once; returns the sockets, latencies, sizes and failures."""
+        results = await asyncio.gather(*(self._connect(room, worker_id) for room, worker_id in targets),
+                                       return_exceptions=True)
+        connected = [result for result in results if not isinstance(result, BaseException)]
+        failures = len(results) - len(connected)
+        return [r[0] for r in connected], [r[1] for r in connected], [r[2] for r in connected], failures
+
+    async def _close_all(self, sockets):
+        await asyncio.gather(*(socket_.close() for socket_ in sockets), return_exceptions=True)
+
+    async def _read_deliveries(self, socket_, latencies):
+        """
+        Collects the delivery latency of every chat line a socket receives, until
+        cancelled: a communicator that times out takes its consumer down with it.
+        """
+        while True:
+            try:
+                frame = json.loads(await socket_.receive(3600))
+            except (ConnectionError, asyncio.IncompleteReadError):
+                return
+            if frame.get("type") == "message":
+                latencies.append(time.perf_counter() - float(frame["message"].split(" ", 1)[0]))
+
+    async def _drain(self, readers, latencies, expected):
+        """Waits for the expected deliveries (or the timeout) and stops the readers."""
+        deadline = time.perf_counter() + self.options["timeout"]
+        while len(latencies) < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        for reader in readers:
+            reader.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+
+    def _by_room(self, members, sockets):
+        """The connected sockets of every room, senders first."""
+        by_room, offset = [], 0
+        for room in members:
+            by_room.append(sockets[offset:offset + len(room)])
+            offset += len(room)
+        return by_room
+
+    def _members(self, rooms):
+        return [[(room, worker_id) for worker_id in room.member_ids[:self.options["members"]]] for room in rooms]
+
+    # -----------------------------------------------------------------
+    # scenarios
+    # -----------------------------------------------------------------
+    async def fanout(self, rooms):
+        members = self._members(rooms)
+        sockets, connects, _, failures = await self._connect_all([target for room in members for target in room])
+        by_room = self._by_room(members, sockets)
+
+        latencies = []
+        readers = [asyncio.create_task(self._read_deliveries(s, latencies)) for s in sockets]
+        expected = sum(len(room_sockets) for room_sockets in by_room) * self.options["messages"]
+        start = time.perf_counter()
+        for _ in range(self.options["messages"]):
+            await asyncio.gather(*(
+                room_sockets[0].send(json.dumps({"message": _stamp(self.options["message_size"])}))
+                for room_sockets in by_room if room_sockets
+            ))
+        await self._drain(readers, latencies, expected)
+        elapsed = time.perf_counter() - start
+        await self._close_all(sockets)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"fanout: {len(rooms)} rooms x {self.options['members']} members, "
+            f"{self.options['messages']} lines per room"
+        ))
+        self.stdout.write(
+            f"  connect    {len(sockets)} ok, {failures} failed, p50 {_ms(connects, 0.5)} ms, p95 {_ms(connects, 0.95)} ms"
+        )
+        self.stdout.write(
+            f"  delivery   {len(latencies)}/{expected} delivered, {len(latencies) / elapsed:.0f}/s, "
+            f"p50 {_ms(latencies, 0.5)} ms, p95 {_ms(latencies, 0.95)} ms, p99 {_ms(latencies, 0.99)} ms"
+        )
+
+    async def storm(self, rooms):
+        count = self.options["connections"]
+        targets = []
+        for n in range(count):
+            room = rooms[n % len(rooms)]
+            targets.append((room, room.member_ids[(n // len(rooms)) % len(room.member_ids)]))
+
+        in_process = not self.options["url"]
+        server_rss = _rss_kb(self.server.pid) if self.server else None
+        if in_process:
+            tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        sockets, connects, sizes, failures = await self._connect_all(targets)
+        elapsed = time.perf_counter() - start
+        if in_process:
+            after, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            memory = f"{(after - before) / max(len(sockets), 1) / 1024:.1f} KiB per connection (tracemalloc, this process)"
+        elif self.server:
+            # give the server a moment to settle before reading its resident size
+            await asyncio.sleep(0.5)
+            memory = (
+                f"{(_rss_kb(self.server.pid) - server_rss) / max(len(sockets), 1):.1f} KiB per connection "
+                f"(daphne resident size)"
+            )
+        else:
+            memory = "not measured (server not started here)"
+        await self._close_all(sockets)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"storm: {count} sockets at once over {len(rooms)} rooms of {self.options['history']} messages"
+        ))
+        self.stdout.write(
+            f"  connect    {len(sockets)} ok, {failures} failed in {elapsed:.2f}s ({len(sockets) / elapsed:.0f}/s), "
+            f"p50 {_ms(connects, 0.5)} ms, p95 {_ms(connects, 0.95)} ms, p99 {_ms(connects, 0.99)} ms"
+        )
+        if sizes:
+            self.stdout.write(f"  history    {sum(sizes) / len(sizes) / 1024:.1f} KiB per connect")
+        self.stdout.write(f"  memory     {memory}")
+
+    async def history(self, rooms):
+        room, worker_id = rooms[0], rooms[0].member_ids[0]
+        socket_ = self.open_socket(self._path(room, worker_id), self.headers[worker_id])
+        start = time.perf_counter()
+        await socket_.connect(self.options["timeout"])
+        text = await socket_.receive(self.options["timeout"])
+        connect = time.perf_counter() - start
+        page_times, page_sizes = [], [len(text.encode())]
+        frame = json.loads(text)
+        messages = len(frame["messages"])
+        while frame.get("before"):
+            start = time.perf_counter()
+            await socket_.send(json.dumps({"type": "load_older", "before": frame["before"]}))
+            text = await socket_.receive(self.options["timeout"])
+            page_times.append(time.perf_counter() - start)
+            page_sizes.append(len(text.encode()))
+            frame = json.loads(text)
+            messages += len(frame["messages"])
+        await socket_.close()
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"history: one socket paging through {messages} messages"))
+        self.stdout.write(f"  connect    {connect * 1000:.1f} ms with the newest page")
+        self.stdout.write(
+            f"  pages      {len(page_sizes)}, {sum(page_sizes) / len(page_sizes) / 1024:.1f} KiB each, "
+            f"older page p50 {_ms(page_times, 0.5)} ms, p95 {_ms(page_times, 0.95)} ms"
+        )
+
+    async def sustained(self, rooms):
+        members = self._members(rooms)
+        sockets, _, _, failures = await self._connect_all([target for room in members for target in room])
+        by_room = [room_sockets for room_sockets in self._by_room(members, sockets) if room_sockets]
+        if not by_room:
+            raise CommandError("No socket could connect.")
+
+        latencies = []
+        readers = [asyncio.create_task(self._read_deliveries(s, latencies)) for s in sockets]
+        interval = 1 / self.options["rate"]
+        sent = expected = 0
+        start = time.perf_counter()
+        deadline = start + self.options["duration"]
+        while (now := time.perf_counter()) < deadline:
+            # the rooms take turns, and so do the members of each room
+            room_sockets = by_room[sent % len(by_room)]
+            sender = room_sockets[(sent // len(by_room)) % len(room_sockets)]
+            await sender.send(json.dumps({"message": _stamp(self.options["message_size"])}))
+            sent += 1
+            expected += len(room_sockets)
+            await asyncio.sleep(max(start + sent * interval - time.perf_counter(), 0))
+        sending = time.perf_counter() - start
+        await self._drain(readers, latencies, expected)
+        await self._close_all(sockets)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"sustained: {self.options['rate']:.0f} lines/s for {self.options['duration']:g}s over "
+            f"{len(by_room)} rooms x {self.options['members']} members"
+        ))
+        self.stdout.write(f"  sockets    {len(sockets)} ok, {failures} failed")
+        self.stdout.write(
+            f"  sent       {sent} lines, {sent / sending:.0f}/s achieved; "
+            f"{len(latencies)}/{expected} delivered"
+        )
+        self.stdout.write(
+            f"  delivery   p50 {_ms(latencies, 0.5)} ms, p95 {_ms(latencies, 0.95)} ms, "
+            f"p99 {_ms(latencies, 0.99)} ms, max {max(latencies, default=0) * 1000:.1f} ms"
+        )
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management.exports import CHUNK_SIZE, EXPORTS, FORMATS, export_stream
+from management.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Streams an organization's tasks, comments or chat history as CSV or JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(EXPORTS))
+        parser.add_argument("--organization", required=True, help="Organization id or name.")
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--gzip", action="store_true", help="Compress the output.")
+        parser.add_argument("--room", type=int, help="Only this chat room's messages.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--output", help="File to write (default: standard output).")
+
+    def handle(self, *args, **options):
+        organization = options["organization"]
+        organizations = Organization.objects.filter(
+            pk=organization) if organization.isdigit() else Organization.objects.filter(name=organization)
+        organization_id = organizations.values_list("id", flat=True).first()
+        if organization_id is None:
+            raise CommandError(f"No organization {organization!r}.")
+
+        filters = {"room_id": options["room"]} if options["kind"] == "messages" and options["room"] else {}
+        stream = export_stream(
+            options["kind"], organization_id, options["format"], options["gzip"], options["chunk_size"], **filters,
+        )
+        output = open(options["output"], "wb") if options["output"] else sys.stdout.buffer
+        try:
+            for piece in stream:
+                output.write(piece)
+        finally:
+            if options["output"]:
+                output.close()
+            else:
+                output.flush()
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management.imports import BATCH_SIZE, FORMATS, guess_format, import_tasks, read_rows
+from management.models import Organization
+
+
+class Command(BaseCommand):
+    help = "Creates an organization's tasks from a CSV, JSON lines or JSON file, reporting the rows it skips."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--organization", required=True, help="Organization id or name.")
+        parser.add_argument("--format", choices=FORMATS, help="Default: from the file name.")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        organization = options["organization"]
+        organizations = Organization.objects.filter(
+            pk=organization) if organization.isdigit() else Organization.objects.filter(name=organization)
+        organization_id = organizations.values_list("id", flat=True).first()
+        if organization_id is None:
+            raise CommandError(f"No organization {organization!r}.")
+
+        fmt = options["format"] or guess_format(options["path"])
+        start = time.perf_counter()
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as file:
+                result = import_tasks(organization_id, read_rows(file, fmt), options["batch_size"])
+        except OSError as error:
+            raise CommandError(error)
+
+        for line, message in result.errors:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(
+            f"Imported {result.created} tasks, skipped {len(result.errors)} rows "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
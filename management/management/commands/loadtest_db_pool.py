@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from management.db.pool import pool_stats
+from management.models import ChatRoom
+from management.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+
+def _server_connections():
+    """Connections the database server sees for this database, None if it cannot tell."""
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()")
+        return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent HTTP and websocket clients in this process and samples the "
+        "database connections once per second, to check they stay bounded by the pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--http-clients", type=int, default=20)
+        parser.add_argument("--ws-clients", type=int, default=20)
+        parser.add_argument("--duration", type=float, default=10, help="Seconds of load.")
+        parser.add_argument("--url", action="append", dest="urls", help="Path to request (repeatable).")
+        parser.add_argument("--username", help="Worker the clients log in as (default: first with an organization).")
+        parser.add_argument("--host", default=(settings.ALLOWED_HOSTS or ["testserver"])[0])
+
+    def handle(self, *args, **options):
+        user = self._user(options["username"])
+        urls = options["urls"] or [reverse("management:index"), reverse("management:task-list")]
+        deadline = time.monotonic() + options["duration"]
+        counts = {"requests": 0, "errors": 0, "messages": 0}
+        counts_lock = threading.Lock()
+
+        def count(name):
+            with counts_lock:
+                counts[name] += 1
+
+        room = ChatRoom.objects.create(name="loadtest", organization_id=user.organization_id)
+        threads = [
+            threading.Thread(target=self._http_client, args=(user, urls, options["host"], deadline, count))
+            for _ in range(options["http_clients"])
+        ]
+        if options["ws_clients"]:
+            threads.append(threading.Thread(
+                target=asyncio.run, args=(self._ws_clients(user, room, options["ws_clients"], deadline, count),)
+            ))
+        try:
+            for thread in threads:
+                thread.start()
+            samples = self._sample(deadline, threads, counts)
+            for thread in threads:
+                thread.join()
+        finally:
+            room.delete()
+            connections.close_all()
+        self._report(samples, counts)
+
+    def _user(self, username):
+        workers = User.objects.filter(organization__isnull=False)
+        if username:
+            workers = workers.filter(username=username)
+        user = workers.order_by("id").first()
+        if user is None:
+            raise CommandError("No worker with an organization to log in as.")
+        return user
+
+    def _http_client(self, user, urls, host, deadline, count):
+        client = Client(HTTP_HOST=host)
+        client.force_login(user)
+        try:
+            while time.monotonic() < deadline:
+                for url in urls:
+                    response = client.get(url)
+                    count("requests" if response.status_code < 400 else "errors")
+        finally:
+            connections.close_all()
+
+    async def _ws_clients(self, user, room, clients, deadline, count):
+        application = URLRouter(websocket_urlpatterns)
+
+        async def chat(n):
+            communicator = WebsocketCommunicator(application, f"/ws/group/{room.id}/")
+            communicator.scope["user"] = user
+            connected, _ = await communicator.connect()
+            if not connected:
+                count("errors")
+                return
+            await communicator.receive_json_from(timeout=30)
+            try:
+                while time.monotonic() < deadline:
+                    await communicator.send_json_to({"message": f"load {n}"})
+                    # every client of the room receives every message; drain them all
+                    while not await communicator.receive_nothing(timeout=0.05):
+                        await communicator.receive_json_from()
+                    count("messages")
+            finally:
+                await communicator.disconnect()
+
+        await asyncio.gather(*(chat(n) for n in range(clients)))
+
+    def _sample(self, deadline, threads, counts):
+        samples = []
+        start = time.monotonic()
+        while time.monotonic() < deadline or any(thread.is_alive() for thread in threads):
+            time.sleep(1)
+            samples.append({
+                "second": round(time.monotonic() - start),
+                "pools": pool_stats(),
+                "server": _server_connections(),
+                "requests": counts["requests"],
+            })
+        connection.close()
+        return samples
+
+    def _report(self, samples, counts):
+        self.stdout.write(f"{'s':>4} {'requests':>9} {'server':>7} {'size':>5} {'out':>4} {'waits':>6} {'timeouts':>9}")
+        for sample in samples:
+            pools = sample["pools"].values()
+            self.stdout.write(
+                f"{sample['second']:>4} {sample['requests']:>9} {sample['server'] if sample['server'] is not None else '-':>7} "
+                f"{sum(p['size'] for p in pools):>5} {sum(p['checked_out'] for p in pools):>4} "
+                f"{sum(p['waits'] for p in pools):>6} {sum(p['timeouts'] for p in pools):>9}"
+            )
+        self.stdout.write(
+            f"{counts['requests']} requests, {counts['messages']} websocket messages, {counts['errors']} errors"
+        )
+
+        final = samples[-1]["pools"] if samples else {}
+        if not final:
+            self.stdout.write(self.style.WARNING(
+                "No connection pool in this process; set DB_POOL=True to use management.db.postgresql."
+            ))
+            return
+        limit = sum(p["max_size"] for p in final.values())
+        peak = max(sum(p["size"] for p in s["pools"].values()) for s in samples)
+        server_peak = max((s["server"] for s in samples if s["server"] is not None), default=None)
+        if peak <= limit:
+            self.stdout.write(self.style.SUCCESS(
+                f"Pooled connections peaked at {peak} of {limit} (server saw {server_peak})."
+            ))
+        else:
+            self.stdout.write(self.style.ERROR(f"Pooled connections reached {peak}, above the limit of {limit}."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from management.models import SearchDocument
+from management.search import INDEXED_MODELS, index_queryset
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search documents of tasks, projects, teams and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Only build the index when it has no documents yet.",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_empty"] and SearchDocument.objects.exists():
+            self.stdout.write("Search index already built.")
+            return
+
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+            for model in INDEXED_MODELS:
+                count = index_queryset(model.objects.all())
+                self.stdout.write(f"Indexed {count} {model._meta.verbose_name_plural}")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from management.layers import SocketHub
+
+
+class Command(BaseCommand):
+    help = "Runs the TCP hub that relays channel layer messages between processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        hub = SocketHub(options["host"], options["port"])
+        self.stdout.write(f"Channel hub listening on {options['host']}:{options['port']}")
+        try:
+            hub.serve_forever()
+        except KeyboardInterrupt:
+            pass
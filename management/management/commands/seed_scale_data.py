@@ -0,0 +1,56 @@
+import time
+from datetime import date, datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from management.seeding import BATCH_SIZE, EPOCH, PASSWORD, PREFIX, ScaleSeeder, flush
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates deterministic, production-sized data for performance tests and EXPLAIN checks, "
+        "e.g. --organizations 50 --tasks 100000 --messages 5000000. Counts are totals over all "
+        f"organizations, which are named '{PREFIX} SEED.NNN'; every seeded worker's password is '{PASSWORD}'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organizations", type=int, default=5)
+        parser.add_argument("--workers", type=int, default=200)
+        parser.add_argument("--teams", type=int, default=20)
+        parser.add_argument("--projects", type=int, default=50)
+        parser.add_argument("--tasks", type=int, default=2000)
+        parser.add_argument("--comments", type=int, default=4000)
+        parser.add_argument("--rooms", type=int, default=50)
+        parser.add_argument("--messages", type=int, default=20000)
+        parser.add_argument("--seed", type=int, default=0, help="Same seed, same data.")
+        parser.add_argument(
+            "--start", type=date.fromisoformat,
+            help=f"Day (YYYY-MM-DD) the data is dated around; {EPOCH.date()} by default, so runs compare.",
+        )
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--flush", action="store_true", help="Delete the previously seeded organizations first.")
+
+    def handle(self, *args, **options):
+        if options["organizations"] < 1:
+            raise CommandError("--organizations must be at least 1.")
+        start = time.perf_counter()
+        if options["flush"]:
+            self.stdout.write(f"Deleted {flush()} seeded organizations.")
+
+        def log(message):
+            self.stdout.write(f"{time.perf_counter() - start:8.1f}s  {message}")
+
+        day = options["start"]
+        seeder = ScaleSeeder(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            start=day and datetime(day.year, day.month, day.day, tzinfo=timezone.utc),
+            log=log,
+        )
+        if seeder.organizations().exists():
+            raise CommandError(f"Seed {options['seed']} was seeded already; pass --flush to seed it again.")
+        seeder.run(**{
+            name: options[name]
+            for name in ("organizations", "workers", "teams", "projects", "tasks", "comments", "rooms", "messages")
+        })
+        self.stdout.write(f"Seeded in {time.perf_counter() - start:.1f}s.")
@@ -1,21 +1,57 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+
+from management.tenancy import get_organization
+
+# paths served without a session or an organization
+SKIPPED_PREFIXES = ("/ws/",)
 
 
 class RequireOrganizationMiddleware:
+    """
+    Resolves the user's organization id once per request as request.org_id
+    (request.organization loads the row lazily from the process-local cache)
+    and sends users without one to assign-organization.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.skipped_prefixes = SKIPPED_PREFIXES + ((settings.STATIC_URL,) if settings.STATIC_URL else ())
+        self.allowed_paths = frozenset([
+            reverse("logout"),
+            reverse("management:assign-organization"),
+        ])
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path.startswith(self.skipped_prefixes):
+            return self.get_response(request)
+        return self.resolve_organization(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        if not request.path.startswith(self.skipped_prefixes):
+            # loading the user reads the session and the database
+            response = await sync_to_async(self.resolve_organization)(request)
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def resolve_organization(self, request):
+        """Sets request.org_id, returning the redirect for users without an organization."""
+        org_id = None
         #apply only to authenticated users
         if request.user.is_authenticated:
-            #check if organization field is missing
-            if not getattr(request.user, 'organization', None) or not getattr(request.user, 'organization', None):
-                allowed_paths = [
-                    reverse("logout"),
-                    reverse("assign-organization"),
-                ]
-                if request.path not in allowed_paths:
-                    return redirect("assign-organization")
-        response = self.get_response(request)
-        return response
+            org_id = request.user.organization_id
+            if org_id is None and request.path not in self.allowed_paths:
+                return redirect("management:assign-organization")
+        request.org_id = org_id
+        request.organization = SimpleLazyObject(lambda: get_organization(org_id))
+        return None
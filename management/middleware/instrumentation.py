@@ -0,0 +1,220 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+from django.utils.functional import empty
+from django.template.backends.django import Template
+
+from management.cache_backends import in_shared_tier
+from management.db.pool import pool_stats
+
+logger = logging.getLogger(__name__)
+
+# sent with (request, view_name, stats) after every measured request
+request_measured = Signal()
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+class RequestStats:
+    """SQL and template timings of one request; also the execute_wrapper counting its queries."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_queries = 0
+        self.cache_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = ""
+        self.template_time = 0.0
+        self.total_time = 0.0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            # statements of a database cache tier are cache time, not the view's queries
+            if in_shared_tier.get():
+                self.cache_queries += 1
+                self.cache_time += elapsed
+            else:
+                self.queries += 1
+                self.db_time += elapsed
+                if elapsed > self.slowest_time:
+                    self.slowest_time = elapsed
+                    self.slowest_sql = sql
+
+    def server_timing(self):
+        slowest = " ".join(self.slowest_sql.split())[:100].replace("\\", "").replace('"', "'")
+        return ", ".join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'cache;dur={self.cache_time * 1000:.1f};desc="{self.cache_queries} queries"',
+            f"tpl;dur={self.template_time * 1000:.1f}",
+            f'slowest;dur={self.slowest_time * 1000:.1f};desc="{slowest}"',
+            f"total;dur={self.total_time * 1000:.1f}",
+        ])
+
+
+_original_render = None
+
+
+def _timed_render(self, context=None, request=None):
+    stats = _current.get()
+    if stats is None or stats._template_depth:
+        return _original_render(self, context, request)
+    stats._template_depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        stats.template_time += time.perf_counter() - start
+        stats._template_depth -= 1
+
+
+def install_template_timing():
+    """Wraps the Django template backend's render() to time templates; once per process."""
+    global _original_render
+    if Template.render is not _timed_render:
+        _original_render = Template.render
+        Template.render = _timed_render
+
+
+class RollingSummary:
+    """
+    Keeps the last `window` requests per view name and logs an overview every `interval` seconds,
+    from a background thread so no request waits for the log or the file.
+    """
+
+    def __init__(self, window=200, interval=60, path=None):
+        self.interval = interval
+        self.path = path
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+        self._last_write = time.monotonic()
+        self._writer = None
+
+    def add(self, view_name, stats):
+        with self._lock:
+            self.samples[view_name].append(
+                (stats.queries, stats.db_time, stats.template_time, stats.total_time,
+                 stats.slowest_time, stats.slowest_sql)
+            )
+            # a write still in progress covers this interval too
+            due = time.monotonic() - self._last_write >= self.interval and not (
+                self._writer and self._writer.is_alive()
+            )
+            if due:
+                self._last_write = time.monotonic()
+                self._writer = threading.Thread(target=self.write, name="request-summary", daemon=True)
+                self._writer.start()
+
+    def summary(self):
+        with self._lock:
+            samples = {name: list(rows) for name, rows in self.samples.items()}
+        summary = {}
+        for name, rows in samples.items():
+            total_times = sorted(row[3] for row in rows)
+            slowest = max(rows, key=lambda row: row[4])
+            summary[name] = {
+                "requests": len(rows),
+                "queries_avg": round(sum(row[0] for row in rows) / len(rows), 1),
+                "queries_max": max(row[0] for row in rows),
+                "db_ms_avg": round(sum(row[1] for row in rows) / len(rows) * 1000, 2),
+                "template_ms_avg": round(sum(row[2] for row in rows) / len(rows) * 1000, 2),
+                "total_ms_p95": round(total_times[int((len(total_times) - 1) * 0.95)] * 1000, 2),
+                "slowest_sql_ms": round(slowest[4] * 1000, 2),
+                "slowest_sql": slowest[5],
+            }
+        return summary
+
+    def write(self):
+        summary = self.summary()
+        pools = pool_stats()
+        if pools:
+            summary["<db pools>"] = pools
+        logger.info("Request summary: %s", json.dumps(summary))
+        if self.path:
+            with open(self.path, "w") as f:
+                json.dump(summary, f, indent=2)
+
+
+summary = RollingSummary(
+    window=settings.INSTRUMENTATION_WINDOW,
+    interval=settings.INSTRUMENTATION_SUMMARY_INTERVAL,
+    path=settings.INSTRUMENTATION_SUMMARY_PATH,
+)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Measures the queries, DB time, template time and slowest statement of each request.
+    Staff users get them back in a Server-Timing header.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        if settings.INSTRUMENTATION_TEMPLATE_TIMING:
+            install_template_timing()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                self.wrap_connections(stack, stats)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        stats.total_time = time.perf_counter() - start
+        return self.finish(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        stack = ExitStack()
+        try:
+            # connections belong to the thread the async ORM runs queries in
+            await sync_to_async(self.wrap_connections)(stack, stats)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            _current.reset(token)
+        stats.total_time = time.perf_counter() - start
+        return await sync_to_async(self.finish)(request, response, stats)
+
+    def wrap_connections(self, stack, stats):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+
+    def finish(self, request, response, stats):
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else "<unresolved>"
+        summary.add(view_name, stats)
+        request_measured.send(sender=self.__class__, request=request, view_name=view_name, stats=stats)
+
+        user = getattr(request, "user", None)
+        # never load the session just for the header (static files skip it)
+        if getattr(user, "_wrapped", None) is empty:
+            user = None
+        if user is not None and user.is_staff:
+            response["Server-Timing"] = stats.server_timing()
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 06:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0005_feedback'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='deadline',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
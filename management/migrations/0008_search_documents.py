@@ -0,0 +1,86 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE management_searchdocument_fts USING fts5(
+        body, content='management_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER management_searchdocument_ai AFTER INSERT ON management_searchdocument BEGIN
+        INSERT INTO management_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER management_searchdocument_ad AFTER DELETE ON management_searchdocument BEGIN
+        INSERT INTO management_searchdocument_fts(management_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER management_searchdocument_au AFTER UPDATE ON management_searchdocument BEGIN
+        INSERT INTO management_searchdocument_fts(management_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+        INSERT INTO management_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS management_searchdocument_au",
+    "DROP TRIGGER IF EXISTS management_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS management_searchdocument_ai",
+    "DROP TABLE IF EXISTS management_searchdocument_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX searchdocument_body_gin ON management_searchdocument "
+    "USING gin (to_tsvector('simple', body))",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS searchdocument_body_gin",
+]
+
+
+def run_for_vendor(sqlite, postgres):
+    def run(apps, schema_editor):
+        statements = {"sqlite": sqlite, "postgresql": postgres}.get(schema_editor.connection.vendor, [])
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0007_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('task', 'task'), ('project', 'project'), ('team', 'team'), ('comment', 'comment')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('body', models.TextField()),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='management.organization')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'kind'], name='searchdocument_org_kind_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='searchdocument_object_uniq'),
+        ),
+        migrations.RunPython(
+            run_for_vendor(SQLITE_FORWARD, POSTGRES_FORWARD),
+            run_for_vendor(SQLITE_BACKWARD, POSTGRES_BACKWARD),
+        ),
+    ]
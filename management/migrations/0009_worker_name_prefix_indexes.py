@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:25
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0008_search_documents'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(models.F('organization'), django.db.models.functions.text.Upper('username'), name='worker_org_username_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(models.F('organization'), django.db.models.functions.text.Upper('first_name'), name='worker_org_first_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='worker',
+            index=models.Index(models.F('organization'), django.db.models.functions.text.Upper('last_name'), name='worker_org_last_name_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('management', '0009_worker_name_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkerStats',
+            fields=[
+                ('worker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('dashboard_visits', models.PositiveBigIntegerField(default=0)),
+                ('last_visit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'worker stats',
+            },
+        ),
+    ]
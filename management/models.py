@@ -1,7 +1,8 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.db.models import ForeignKey
+from django.db.models import Count, F, ForeignKey, Prefetch
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
@@ -16,7 +17,7 @@ class Organization(models.Model):
 
 class OrganizationManager(models.Manager):
     def for_user(self, user):
-        return self.filter(organization=user.organization)
+        return self.filter(organization_id=user.organization_id)
 
 
 class WorkerManager(BaseUserManager):
@@ -73,6 +74,12 @@ class Worker(AbstractUser):
     objects = WorkerManager()
     class Meta:
         ordering = ["username",]
+        indexes = [
+            # case-insensitive prefix lookups of the worker autocomplete
+            models.Index(F("organization"), Upper("username"), name="worker_org_username_idx"),
+            models.Index(F("organization"), Upper("first_name"), name="worker_org_first_name_idx"),
+            models.Index(F("organization"), Upper("last_name"), name="worker_org_last_name_idx"),
+        ]
 
     def get_absolute_url(self):
         return reverse("management:worker-detail", kwargs={"pk": self.pk})
@@ -82,6 +89,24 @@ class Worker(AbstractUser):
         return f"{self.first_name} {self.last_name} ({self.email})"
 
 
+class WorkerStats(models.Model):
+    """Per-worker counters, written in batches by management/visits.py."""
+    worker = models.OneToOneField(
+        Worker,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    dashboard_visits = models.PositiveBigIntegerField(default=0)
+    last_visit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = "worker stats"
+
+    def __str__(self):
+        return f"Stats of {self.worker_id}"
+
+
 class TaskType(models.Model):
     name = models.CharField(max_length=30)
     color = models.CharField(
@@ -119,7 +144,7 @@ class Task(models.Model):
         choices=Status.choices,
         default=Status.todo
     )
-    deadline = models.DateTimeField(null=True, blank=True)
+    deadline = models.DateTimeField(null=True, blank=True, db_index=True)
     organization = models.ForeignKey(
         Organization,
         on_delete=models.CASCADE,
@@ -129,6 +154,27 @@ class Task(models.Model):
 
     class Meta:
         ordering = ["project", "priority", "name",]
+        indexes = [
+            models.Index(fields=["organization", "status"], name="task_org_status_idx"),
+            models.Index(fields=["organization", "deadline"], name="task_org_deadline_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember loaded values so signal handlers can tell what changed
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def changed_fields(self, field_names):
+        """Returns the given fields whose value differs from the one loaded from the db."""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return set(field_names)
+        return {
+            name for name in field_names
+            if name not in loaded or loaded[name] != getattr(self, name)
+        }
 
     def get_absolute_url(self):
         return reverse("management:task-detail", kwargs={"pk": self.pk})
@@ -145,6 +191,12 @@ class Department(models.Model):
     )
 
 
+class PositionManager(models.Manager):
+    def with_labels(self):
+        """Loads what __str__ needs, so choice labels cost no extra queries."""
+        return self.select_related("department")
+
+
 class Position(models.Model):
     name = models.CharField(
         max_length=100,
@@ -157,6 +209,7 @@ class Position(models.Model):
         null=True,
         blank=True,
     )
+    objects = PositionManager()
 
     class Meta:
         ordering = ["department", "name",]
@@ -164,6 +217,12 @@ class Position(models.Model):
     def __str__(self):
         return f"{self.name} ({self.department.name} department)"
 
+class TeamManager(models.Manager):
+    def with_labels(self):
+        """Annotates what __str__ needs, so choice labels cost no extra queries."""
+        return self.annotate(worker_count=Count("workers"))
+
+
 class Team(models.Model):
     name = models.CharField(max_length=100)
     workers = models.ManyToManyField("Worker", related_name="teams")
@@ -174,6 +233,7 @@ class Team(models.Model):
         null=True,
         blank=True,
     )
+    objects = TeamManager()
 
     class Meta:
         ordering = ["name",]
@@ -182,7 +242,19 @@ class Team(models.Model):
         return reverse("management:team-detail", kwargs={"pk": self.pk})
 
     def __str__(self):
-        return f"{self.name}: ({self.workers.count()} workers)"
+        worker_count = getattr(self, "worker_count", None)
+        if worker_count is None:
+            worker_count = self.workers.count()
+        return f"{self.name}: ({worker_count} workers)"
+
+
+class ProjectManager(models.Manager):
+    def with_labels(self):
+        """Prefetches what __str__ needs, so choice labels cost no extra queries."""
+        return self.prefetch_related(
+            Prefetch("teams", queryset=Team.objects.only("id", "name"))
+        )
+
 
 class Project(models.Model):
     name = models.CharField(max_length=100)
@@ -190,6 +262,7 @@ class Project(models.Model):
     description = models.TextField(blank=True)
     deadline = models.DateTimeField(blank=True, null=True)
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, null=True, blank=True)
+    objects = ProjectManager()
 
     class Meta:
         ordering = ["name"]
@@ -215,7 +288,10 @@ class Comment(models.Model):
     )
 
     class Meta:
-        pass
+        indexes = [
+            models.Index(fields=["task", "created_at"], name="comment_task_created_idx"),
+            models.Index(fields=["organization", "created_at"], name="comment_org_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.worker} left comment on task ({self.task}): {self.text}"
@@ -260,6 +336,11 @@ class Message(models.Model):
         blank=True,
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["room", "timestamp"], name="message_room_timestamp_idx"),
+        ]
+
     def __str__(self):
         return f"{self.sender} -> {self.content}"
 
@@ -271,4 +352,34 @@ class Feedback(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Feedback from {self.name}: {self.email}"
\ No newline at end of file
+        return f"Feedback from {self.name}: {self.email}"
+
+class SearchDocument(models.Model):
+    """Text of a task, project, team or comment as indexed for full-text search."""
+
+    class Kind(models.TextChoices):
+        task = "task", _("task")
+        project = "project", _("project")
+        team = "team", _("team")
+        comment = "comment", _("comment")
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+    )
+    body = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="searchdocument_object_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["organization", "kind"], name="searchdocument_org_kind_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
@@ -0,0 +1,195 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from django.http import Http404
+from django.utils.dateparse import parse_date, parse_datetime
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return parse_datetime(value["dt"])
+        if "d" in value:
+            return parse_date(value["d"])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(direction, values):
+    """Packs a page direction and the ordering values of a row into an opaque token."""
+    payload = json.dumps([direction, [_encode_value(v) for v in values]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Returns (direction, values) for a token made by encode_cursor, raising ValueError if it is invalid."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return direction, [_decode_value(v) for v in values]
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: pages are selected with a WHERE on the ordering key of the
+    row they start after, so there is no COUNT(*) and no OFFSET scan.
+    The last ordering field must be unique (usually the primary key).
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.fields = [
+            (name.lstrip("-"), name.startswith("-"), self._is_nullable(queryset, name.lstrip("-")))
+            for name in ordering
+        ]
+
+    @staticmethod
+    def _is_nullable(queryset, name):
+        try:
+            return queryset.model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            # annotations (e.g. Max over a reverse relation) may be NULL
+            return True
+
+    def _order_by(self, reverse=False):
+        ordering = []
+        for name, descending, nullable in self.fields:
+            nulls = {}
+            if nullable:
+                # NULLs sort after every value when paging forwards
+                nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+            if descending != reverse:
+                ordering.append(F(name).desc(**nulls))
+            else:
+                ordering.append(F(name).asc(**nulls))
+        return ordering
+
+    def _beyond(self, values, reverse=False):
+        """Builds the condition selecting rows after (or before, if reverse) the given key."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.fields, values):
+            lookup = "lt" if descending != reverse else "gt"
+            if value is None:
+                step = Q(**{f"{name}__isnull": False}) if reverse else Q(pk__in=[])
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                step = Q(**{f"{name}__{lookup}": value})
+                if nullable and not reverse:
+                    step |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            condition |= equal & step
+            equal &= same
+        return condition
+
+    def _key(self, obj):
+        if isinstance(obj, dict):
+            return [obj[name] for name, _, _ in self.fields]
+        return [getattr(obj, name) for name, _, _ in self.fields]
+
+    def page(self, cursor=None):
+        queryset, values, reverse = self._page_queryset(cursor)
+        return self._make_page(list(queryset), values, reverse)
+
+    async def apage(self, cursor=None):
+        """page() with the async ORM."""
+        queryset, values, reverse = self._page_queryset(cursor)
+        return self._make_page([row async for row in queryset], values, reverse)
+
+    def _page_queryset(self, cursor):
+        direction, values = decode_cursor(cursor) if cursor else (NEXT, None)
+        if values is not None and len(values) != len(self.fields):
+            raise ValueError("Invalid cursor")
+        reverse = direction == PREVIOUS
+
+        queryset = self.queryset.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._beyond(values, reverse))
+        return queryset[:self.per_page + 1], values, reverse
+
+    def _make_page(self, rows, values, reverse):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows)
+
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = encode_cursor(NEXT, self._key(rows[-1])) if has_next else None
+        previous_cursor = encode_cursor(PREVIOUS, self._key(rows[0])) if has_previous else None
+        return CursorPage(rows, next_cursor, previous_cursor)
+
+
+class CursorPaginationMixin:
+    """
+    Replaces page-number pagination of a ListView with keyset pagination
+    on cursor_ordering, using opaque ?cursor= tokens.
+    """
+    cursor_ordering = ("id",)
+    cursor_kwarg = "cursor"
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(queryset, page_size, self.get_cursor_ordering())
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except ValueError:
+            raise Http404("Invalid cursor")
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,187 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from management.models import Comment, Project, SearchDocument, Task, Team
+
+Kind = SearchDocument.Kind
+
+BATCH_SIZE = 1000
+
+
+def _task_text(task):
+    return [task.name, task.description]
+
+
+def _project_text(project):
+    return [project.name, project.description]
+
+
+def _team_text(team):
+    return [team.name]
+
+
+def _comment_text(comment):
+    worker = comment.worker
+    return [comment.text, comment.task.name, worker.username, worker.first_name, worker.last_name]
+
+
+INDEXED_MODELS = {
+    Task: (Kind.task, _task_text, ()),
+    Project: (Kind.project, _project_text, ()),
+    Team: (Kind.team, _team_text, ()),
+    Comment: (Kind.comment, _comment_text, ("task", "worker")),
+}
+
+
+def _document(obj):
+    kind, text, _ = INDEXED_MODELS[type(obj)]
+    return SearchDocument(
+        kind=kind,
+        object_id=obj.pk,
+        organization_id=obj.organization_id,
+        body="\n".join(part for part in text(obj) if part),
+    )
+
+
+def index_object(obj):
+    document = _document(obj)
+    SearchDocument.objects.update_or_create(
+        kind=document.kind,
+        object_id=document.object_id,
+        defaults={"organization_id": document.organization_id, "body": document.body},
+    )
+
+
+def remove_object(obj):
+    kind = INDEXED_MODELS[type(obj)][0]
+    SearchDocument.objects.filter(kind=kind, object_id=obj.pk).delete()
+
+
+def remove_ids(model, ids):
+    """Drops the documents of objects deleted without signals (e.g. by bulk operations)."""
+    kind = INDEXED_MODELS[model][0]
+    SearchDocument.objects.filter(kind=kind, object_id__in=ids).delete()
+
+
+def index_queryset(queryset):
+    """(Re)indexes every object of a queryset in batches; returns how many were indexed."""
+    kind, _, related = INDEXED_MODELS[queryset.model]
+    queryset = queryset.select_related(*related).order_by("pk")
+    count = 0
+    batch = []
+    for obj in queryset.iterator(chunk_size=BATCH_SIZE):
+        batch.append(_document(obj))
+        if len(batch) == BATCH_SIZE:
+            count += _replace_documents(kind, batch)
+            batch = []
+    if batch:
+        count += _replace_documents(kind, batch)
+    return count
+
+
+def index_new_objects(objects):
+    """Indexes objects bulk-created without signals; they have no documents to replace yet."""
+    documents = SearchDocument.objects.bulk_create(_document(obj) for obj in objects)
+    return len(documents)
+
+
+def _replace_documents(kind, documents):
+    SearchDocument.objects.filter(kind=kind, object_id__in=[d.object_id for d in documents]).delete()
+    SearchDocument.objects.bulk_create(documents)
+    return len(documents)
+
+
+def _terms(query):
+    return re.findall(r"\w+", query.lower())
+
+
+def _postgres_matches(terms, where, params):
+    """(from, where, params, score) of the documents matching every term; higher scores are better."""
+    tsquery = " & ".join(f"{term}:*" for term in terms)
+    return (
+        "management_searchdocument, to_tsquery('simple', %s) q",
+        f"to_tsvector('simple', body) @@ q AND {where}",
+        [tsquery, *params],
+        # ts_rank() is a float4; cursors hand the rank back as a float8, which must compare equal
+        "ts_rank(to_tsvector('simple', body), q)::double precision",
+    )
+
+
+def _sqlite_matches(terms, where, params):
+    """(from, where, params, score) of the documents matching every term; higher scores are better."""
+    match = " ".join(f'"{term}"*' for term in terms)
+    return (
+        # CROSS JOIN keeps SQLite from probing the index once per document of the organization
+        "management_searchdocument_fts CROSS JOIN management_searchdocument "
+        "ON management_searchdocument.id = management_searchdocument_fts.rowid",
+        f"management_searchdocument_fts MATCH %s AND {where}",
+        [match, *params],
+        "-bm25(management_searchdocument_fts)",
+    )
+
+
+def _matches(kind, terms, organization_id=None):
+    where = "kind = %s"
+    params = [kind]
+    if organization_id is not None:
+        where += " AND organization_id = %s"
+        params.append(organization_id)
+    if connection.vendor == "postgresql":
+        return _postgres_matches(terms, where, params)
+    return _sqlite_matches(terms, where, params)
+
+
+def search_ids(kind, query, organization_id=None, limit=None):
+    """
+    Returns the ids of the objects of a kind matching every word of the query
+    (as a prefix), best match first.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+    tables, where, params, score = _matches(kind, terms, organization_id)
+    sql = f"SELECT object_id FROM {tables} WHERE {where} ORDER BY {score} DESC, object_id"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_queryset(queryset, query, organization_id=None):
+    """
+    Narrows a queryset to its full-text matches, annotated with search_rank
+    (higher is better) and ordered by it. Every match is kept: the queryset's
+    own filters apply in the same query, and paginating is left to the caller.
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.none()
+    kind = INDEXED_MODELS[queryset.model][0]
+    tables, where, params, score = _matches(kind, terms, organization_id)
+    meta = queryset.model._meta
+    outer = f"{connection.ops.quote_name(meta.db_table)}.{connection.ops.quote_name(meta.pk.column)}"
+    ids = RawSQL(f"SELECT object_id FROM {tables} WHERE {where}", params)
+    if connection.vendor == "postgresql":
+        rank_sql = f"SELECT {score} FROM {tables} WHERE {where} AND object_id = {outer}"
+    else:
+        # a MATCH correlated to each row rescans the index per row: score all matches once instead
+        rank_sql = (
+            f"WITH matches AS MATERIALIZED (SELECT object_id, {score} AS score FROM {tables} WHERE {where}) "
+            f"SELECT score FROM matches WHERE object_id = {outer}"
+        )
+    rank = RawSQL(rank_sql, params, output_field=FloatField())
+    return queryset.filter(pk__in=ids).annotate(search_rank=rank).order_by("-search_rank", "pk")
+
+
+class SearchRankOrderingMixin:
+    """Pages searched lists of a CursorPaginationMixin view by relevance."""
+
+    def get_cursor_ordering(self):
+        if "search_rank" in self.object_list.query.annotations:
+            return ("-search_rank", "id")
+        return super().get_cursor_ordering()
@@ -0,0 +1,367 @@
+"""
+Deterministic, production-sized test data.
+
+ScaleSeeder builds organizations with departments, positions, workers, teams,
+projects, tasks, comments, chat rooms and messages. Everything is drawn from
+one random.Random(seed) and dated around a fixed day, and organizations are
+numbered per seed, so the same options always produce the same rows, whatever
+is already in the database and whenever it runs. Rows are written with
+bulk_create() batch_size at a time; the larger tables are generated lazily,
+so memory does not grow with them. A few organizations are much bigger than
+the rest, as in production.
+"""
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from management.bulk import delete_rows
+from management.dashboard import invalidate_dashboard
+from management.models import (
+    ChatRoom, Comment, Department, Message, Organization, Position, Project, SearchDocument, Task, TaskType, Team,
+    Worker,
+)
+from management.search import index_queryset
+
+BATCH_SIZE = 2000
+
+# seeded rows are told apart from real ones by this organization name prefix
+PREFIX = "Seed"
+
+# password of every seeded worker
+PASSWORD = "seed-password"
+
+# the day seeded deadlines, comments and messages are spread around, unless one is given
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+FIRST_NAMES = (
+    "Anna", "Ben", "Chloe", "Daniel", "Elena", "Felix", "Grace", "Hugo", "Iris", "Jonas", "Kira", "Liam",
+    "Maya", "Noah", "Olga", "Pavel", "Quinn", "Rosa", "Sam", "Tara", "Umar", "Vera", "Will", "Yara", "Zoe",
+)
+LAST_NAMES = (
+    "Adams", "Bondar", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Hansen", "Ivanova", "Jensen", "Kowalski",
+    "Lopez", "Moreau", "Novak", "Olsen", "Petrenko", "Rossi", "Schmidt", "Tanaka", "Weber",
+)
+DEPARTMENTS = ("Engineering", "Design", "Marketing", "Sales", "Support", "Operations")
+POSITIONS = ("Junior", "Middle", "Senior", "Lead")
+TEAMS = ("Platform", "Mobile", "Web", "Data", "Growth", "Payments", "Infrastructure", "Security", "QA", "Content")
+TASK_TYPES = ("Bug", "Feature", "Chore", "Docs", "Research", "Refactoring")
+VERBS = ("Fix", "Add", "Update", "Remove", "Review", "Refactor", "Test", "Document", "Migrate", "Design")
+WORDS = (
+    "login", "signup", "dashboard", "calendar", "search", "export", "import", "billing", "invoice", "report",
+    "profile", "settings", "permissions", "notifications", "chat", "comments", "board", "deadline", "upload",
+    "cache", "database", "index", "query", "api", "endpoint", "page", "form", "button", "layout", "email",
+    "password", "session", "token", "webhook", "timeout", "error", "crash", "performance", "memory", "release",
+)
+
+# status -> weight, most tasks of a live organization are open
+STATUS_WEIGHTS = {Task.Status.todo: 5, Task.Status.in_progress: 3, Task.Status.done: 4}
+PRIORITY_WEIGHTS = {Task.Priority.low: 3, Task.Priority.medium: 4, Task.Priority.urgent: 2}
+
+
+def split(total, parts, skew=0.8):
+    """Splits total into parts shares that shrink with the part's index, like organization sizes do."""
+    weights = [1 / (index + 1) ** skew for index in range(parts)]
+    scale = total / sum(weights)
+    shares = [int(weight * scale) for weight in weights]
+    shares[0] += total - sum(shares)
+    return shares
+
+
+def create_dated(model, objects, field_name, batch_size=None):
+    """
+    bulk_create()s the objects, then writes back the values of their auto_now_add
+    field, which bulk_create() stamps with now(), in a bulk_update(); returns them.
+    """
+    objects = list(objects)
+    moments = [getattr(obj, field_name) for obj in objects]
+    objects = model.objects.bulk_create(objects, batch_size=batch_size)
+    for obj, moment in zip(objects, moments):
+        setattr(obj, field_name, moment)
+    model.objects.bulk_update(objects, [field_name], batch_size=batch_size)
+    return objects
+
+
+def seeded_organizations(prefix=PREFIX):
+    return Organization.objects.filter(name__startswith=f"{prefix} ")
+
+
+def flush(prefix=PREFIX):
+    """Deletes every seeded organization and all of its rows."""
+    organizations = seeded_organizations(prefix)
+    ids = list(organizations.values_list("id", flat=True))
+    with transaction.atomic():
+        # the big tables first, each in one DELETE: messages, assignments and search documents
+        # have no signals, so the collector does not load them; comments and tasks do
+        Message.objects.filter(room__organization_id__in=ids).delete()
+        delete_rows(Comment, "organization", ids)
+        Task.workers.through.objects.filter(task__organization_id__in=ids).delete()
+        delete_rows(Task, "organization", ids)
+        SearchDocument.objects.filter(organization_id__in=ids).delete()
+        # before their positions, which protect them
+        Worker.objects.filter(organization_id__in=ids).delete()
+        organizations.delete()
+    return len(ids)
+
+
+class ScaleSeeder:
+    def __init__(self, seed=0, batch_size=BATCH_SIZE, prefix=PREFIX, start=None, log=None):
+        self.random = random.Random(seed)
+        self.seed = seed
+        self.batch_size = batch_size
+        self.prefix = prefix
+        # deadlines and messages are spread around this day
+        self.start = start or EPOCH
+        self.log = log or (lambda message: None)
+        self.counts = {}
+        self.codes = {}
+
+    def _insert(self, model, objects, quiet=False, dated=None):
+        """
+        bulk_create()s the objects batch_size at a time; returns them, unless they come from a generator.
+        `dated` names an auto_now_add field whose given values are kept, see create_dated().
+        """
+        keep = isinstance(objects, list)
+        created = []
+        objects = iter(objects)
+        count = 0
+        while batch := list(islice(objects, self.batch_size)):
+            if dated:
+                batch = create_dated(model, batch, dated)
+            else:
+                batch = model.objects.bulk_create(batch)
+            count += len(batch)
+            if keep:
+                created.extend(batch)
+        name = str(model._meta.verbose_name_plural)
+        self.counts[name] = self.counts.get(name, 0) + count
+        if not quiet:
+            self.log(f"{count} {name}")
+        return created
+
+    def _log_count(self, model):
+        name = str(model._meta.verbose_name_plural)
+        self.log(f"{self.counts.get(name, 0)} {name}")
+
+    def _sentence(self, low, high):
+        return " ".join(self.random.choices(WORDS, k=self.random.randint(low, high))).capitalize() + "."
+
+    def _weighted(self, weights):
+        return self.random.choices(list(weights), weights=list(weights.values()))[0]
+
+    def _moment(self, days_before, days_after=0):
+        return self.start + timedelta(seconds=self.random.randint(-days_before * 86400, days_after * 86400))
+
+    def run(self, organizations=5, workers=200, teams=20, projects=50, tasks=2000, comments=4000, rooms=50,
+            messages=20000):
+        """Creates the given number of each, in total over all organizations; returns the counts per table."""
+        with transaction.atomic():
+            org_ids = self._organizations(organizations)
+            worker_ids = self._workers(org_ids, split(workers, organizations))
+            team_ids = self._teams(org_ids, split(teams, organizations), worker_ids)
+            project_ids = self._projects(org_ids, split(projects, organizations), team_ids)
+            task_ids = self._tasks(org_ids, split(tasks, organizations), project_ids, worker_ids)
+            self._comments(org_ids, split(comments, organizations), task_ids, worker_ids)
+            self._rooms_and_messages(
+                org_ids, split(rooms, organizations), split(messages, organizations), worker_ids,
+            )
+            self._index(org_ids)
+        for org_id in org_ids:
+            invalidate_dashboard(org_id)
+        return self.counts
+
+    def organizations(self):
+        """The organizations this seed creates, if it was run already."""
+        return seeded_organizations(self.prefix).filter(name__startswith=f"{self.prefix} {self.seed}.")
+
+    def _organizations(self, count):
+        organizations = self._insert(Organization, [
+            Organization(
+                name=f"{self.prefix} {self.seed}.{index:03d}", code=f"{self.prefix.lower()}-{self.seed}-{index:03d}",
+            )
+            for index in range(count)
+        ])
+        self.codes = {organization.id: organization.code for organization in organizations}
+        return [organization.id for organization in organizations]
+
+    def _workers(self, org_ids, counts):
+        """Departments, positions and workers; returns the worker ids of every organization."""
+        departments = self._insert(Department, [
+            Department(name=name, organization_id=org_id) for org_id in org_ids for name in DEPARTMENTS
+        ])
+        positions = self._insert(Position, [
+            Position(name=f"{level} {department.name}", department=department, organization_id=department.organization_id)
+            for department in departments
+            for level in POSITIONS
+        ])
+        positions_by_org = {}
+        for position in positions:
+            positions_by_org.setdefault(position.organization_id, []).append(position.id)
+
+        # hashing is slow on purpose; every seeded worker shares the one hash
+        password = make_password(PASSWORD)
+        workers = []
+        for org_id, count in zip(org_ids, counts):
+            code = self.codes[org_id]
+            for index in range(count):
+                first_name, last_name = self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+                username = f"{code}-{index:05d}"
+                workers.append(Worker(
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=f"{username}@example.com",
+                    password=password,
+                    position_id=self.random.choice(positions_by_org[org_id]),
+                    organization_id=org_id,
+                    role="admin" if index == 0 else "member",
+                ))
+        worker_ids = {org_id: [] for org_id in org_ids}
+        for worker in self._insert(Worker, workers):
+            worker_ids[worker.organization_id].append(worker.id)
+        return worker_ids
+
+    def _teams(self, org_ids, counts, worker_ids):
+        teams = self._insert(Team, [
+            Team(name=f"{TEAMS[index % len(TEAMS)]} {index // len(TEAMS) + 1}", organization_id=org_id)
+            for org_id, count in zip(org_ids, counts)
+            for index in range(count)
+        ])
+        team_ids = {org_id: [] for org_id in org_ids}
+        for team in teams:
+            team_ids[team.organization_id].append(team.id)
+        # every worker is in one or two teams of their organization
+        self._insert(Team.workers.through, (
+            Team.workers.through(team_id=team_id, worker_id=worker_id)
+            for org_id in org_ids if team_ids[org_id]
+            for worker_id in worker_ids[org_id]
+            for team_id in self.random.sample(team_ids[org_id], min(len(team_ids[org_id]), self.random.randint(1, 2)))
+        ))
+        return team_ids
+
+    def _projects(self, org_ids, counts, team_ids):
+        projects = self._insert(Project, [
+            Project(
+                name=f"{self.random.choice(WORDS).capitalize()} {self.random.choice(WORDS)} {index + 1}",
+                description=self._sentence(8, 30),
+                deadline=self._moment(30, 180),
+                organization_id=org_id,
+            )
+            for org_id, count in zip(org_ids, counts)
+            for index in range(count)
+        ])
+        project_ids = {org_id: [] for org_id in org_ids}
+        for project in projects:
+            project_ids[project.organization_id].append(project.id)
+        self._insert(Project.teams.through, (
+            Project.teams.through(project_id=project.id, team_id=team_id)
+            for project in projects if team_ids[project.organization_id]
+            for team_id in self.random.sample(
+                team_ids[project.organization_id], min(len(team_ids[project.organization_id]), self.random.randint(1, 3)),
+            )
+        ))
+        return project_ids
+
+    def _tasks(self, org_ids, counts, project_ids, worker_ids):
+        types = {task_type.name: task_type.id for task_type in TaskType.objects.filter(name__in=TASK_TYPES)}
+        for task_type in self._insert(TaskType, [TaskType(name=name) for name in TASK_TYPES if name not in types]):
+            types[task_type.name] = task_type.id
+        type_ids = [types[name] for name in TASK_TYPES]
+
+        task_ids = {org_id: [] for org_id in org_ids}
+        for org_id, count in zip(org_ids, counts):
+            if not project_ids[org_id]:
+                continue
+            tasks = self._insert(
+                Task, [self._task(org_id, project_ids[org_id], type_ids) for _ in range(count)], quiet=True,
+            )
+            task_ids[org_id] = [task.id for task in tasks]
+            # most tasks have one or two assignees, a few have none
+            self._insert(Task.workers.through, (
+                Task.workers.through(task_id=task_id, worker_id=worker_id)
+                for task_id in task_ids[org_id]
+                for worker_id in self.random.sample(
+                    worker_ids[org_id], min(len(worker_ids[org_id]), self.random.choice((0, 1, 1, 1, 2, 2, 3))),
+                )
+            ), quiet=True)
+        self._log_count(Task)
+        self._log_count(Task.workers.through)
+        return task_ids
+
+    def _task(self, org_id, project_ids, type_ids):
+        status = self._weighted(STATUS_WEIGHTS)
+        return Task(
+            name=f"{self.random.choice(VERBS)} {self.random.choice(WORDS)} {self.random.choice(WORDS)}",
+            description=self._sentence(5, 40),
+            status=status,
+            priority=self._weighted(PRIORITY_WEIGHTS),
+            is_completed=status == Task.Status.done,
+            deadline=None if self.random.random() < 0.2 else self._moment(60, 90),
+            project_id=self.random.choice(project_ids),
+            type_id=self.random.choice(type_ids),
+            organization_id=org_id,
+        )
+
+    def _comments(self, org_ids, counts, task_ids, worker_ids):
+        self._insert(Comment, (
+            Comment(
+                task_id=self.random.choice(task_ids[org_id]),
+                worker_id=self.random.choice(worker_ids[org_id]),
+                text=self._sentence(3, 25),
+                created_at=self._moment(120),
+                organization_id=org_id,
+            )
+            for org_id, count in zip(org_ids, counts) if task_ids[org_id] and worker_ids[org_id]
+            for _ in range(count)
+        ), dated="created_at")
+
+    def _rooms_and_messages(self, org_ids, room_counts, message_counts, worker_ids):
+        members = {}
+        for org_id, count in zip(org_ids, room_counts):
+            if not worker_ids[org_id]:
+                continue
+            rooms = self._insert(ChatRoom, [
+                ChatRoom(name=f"{self.random.choice(TEAMS)} chat {index + 1}", organization_id=org_id)
+                for index in range(count)
+            ], quiet=True)
+            for room in rooms:
+                size = min(len(worker_ids[org_id]), self.random.randint(2, 15))
+                members[room.id] = (org_id, self.random.sample(worker_ids[org_id], size))
+        self._log_count(ChatRoom)
+        self._insert(ChatRoom.members.through, (
+            ChatRoom.members.through(chatroom_id=room_id, worker_id=worker_id)
+            for room_id, (_, room_members) in members.items()
+            for worker_id in room_members
+        ))
+
+        rooms_by_org = {}
+        for room_id, (org_id, _) in members.items():
+            rooms_by_org.setdefault(org_id, []).append(room_id)
+        self._insert(Message, self._messages(org_ids, message_counts, rooms_by_org, members), dated="timestamp")
+
+    def _messages(self, org_ids, counts, rooms_by_org, members):
+        for org_id, count in zip(org_ids, counts):
+            room_ids = rooms_by_org.get(org_id)
+            if not room_ids:
+                continue
+            # a few busy rooms carry most of the history
+            for room_id, room_count in zip(room_ids, split(count, len(room_ids), skew=1.2)):
+                room_members = members[room_id][1]
+                moment = self.start - timedelta(days=180)
+                step = 180 * 86400 / max(room_count, 1)
+                for _ in range(room_count):
+                    moment += timedelta(seconds=self.random.uniform(0, 2 * step))
+                    yield Message(
+                        room_id=room_id,
+                        sender_id=self.random.choice(room_members),
+                        content=self._sentence(1, 20),
+                        timestamp=moment,
+                        organization_id=org_id,
+                    )
+
+    def _index(self, org_ids):
+        for model in (Task, Project, Team, Comment):
+            count = index_queryset(model.objects.filter(organization_id__in=org_ids))
+            self.log(f"indexed {count} {model._meta.verbose_name_plural}")
@@ -0,0 +1,126 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from management.board import bump_board_revision
+from management.caching import invalidate_org
+from management.calendar_data import invalidate_calendar
+from management.dashboard import invalidate_dashboard
+from management.models import Comment, Organization, Project, Task, TaskType, Team, Worker
+from management.search import index_object, index_queryset, remove_object
+from management.tenancy import organization_cache
+
+CALENDAR_FIELDS = ("name", "deadline", "status", "is_completed", "type_id", "project_id")
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    if instance.organization_id:
+        invalidate_dashboard(instance.organization_id)
+        bump_board_revision(instance.organization_id)
+
+
+@receiver(post_save, sender=Task)
+def task_saved_calendar(sender, instance, created, **kwargs):
+    # a new task has no assignees yet, m2m_changed takes care of it
+    if created or not instance.changed_fields(CALENDAR_FIELDS):
+        return
+    invalidate_calendar(*instance.workers.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleted_calendar(sender, instance, **kwargs):
+    invalidate_calendar(*instance.workers.values_list("id", flat=True))
+
+
+@receiver(post_save, sender=TaskType)
+def task_type_saved_calendar(sender, instance, created, **kwargs):
+    # calendar rows carry the type's color; types in use cannot be deleted
+    if created:
+        return
+    invalidate_calendar(*Task.workers.through.objects.filter(task__type=instance).values_list("worker_id", flat=True))
+
+
+@receiver(m2m_changed, sender=Task.workers.through)
+def task_workers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            instance._cleared_worker_ids = [instance.id]
+        else:
+            instance._cleared_worker_ids = list(instance.workers.values_list("id", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    if instance.organization_id:
+        invalidate_dashboard(instance.organization_id)
+        bump_board_revision(instance.organization_id)
+
+    if action == "post_clear":
+        invalidate_calendar(*getattr(instance, "_cleared_worker_ids", []))
+    elif reverse:
+        invalidate_calendar(instance.id)
+    else:
+        invalidate_calendar(*pk_set)
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def worker_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    if instance.organization_id:
+        invalidate_dashboard(instance.organization_id)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    if instance.organization_id:
+        invalidate_org("projects", instance.organization_id)
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def team_changed(sender, instance, **kwargs):
+    if instance.organization_id:
+        invalidate_org("teams", instance.organization_id)
+
+
+@receiver(m2m_changed, sender=Project.teams.through)
+@receiver(m2m_changed, sender=Team.workers.through)
+def team_membership_changed(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and instance.organization_id:
+        invalidate_org("teams", instance.organization_id)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Comment)
+def searchable_saved(sender, instance, created, **kwargs):
+    index_object(instance)
+    if sender is Task and not created and instance.changed_fields(["name"]):
+        index_queryset(Comment.objects.filter(task=instance))
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Team)
+@receiver(post_delete, sender=Comment)
+def searchable_deleted(sender, instance, **kwargs):
+    remove_object(instance)
+
+
+@receiver(post_save, sender=Worker)
+def worker_saved_search(sender, instance, created, update_fields=None, **kwargs):
+    # comments are found by their author's names
+    if created or (update_fields and set(update_fields) == {"last_login"}):
+        return
+    index_queryset(Comment.objects.filter(worker=instance))
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def organization_changed(sender, instance, **kwargs):
+    organization_cache.invalidate(instance.pk)
@@ -0,0 +1,107 @@
+document.addEventListener("DOMContentLoaded", function () {
+
+    const DEBOUNCE = 250;
+
+    function setup(select) {
+        const multiple = select.multiple;
+        const url = select.dataset.autocompleteUrl;
+
+        const box = document.createElement("div");
+        box.className = "autocomplete";
+        const chips = document.createElement("div");
+        chips.className = "autocomplete-chips";
+        const input = document.createElement("input");
+        input.type = "text";
+        input.className = "form-control";
+        input.placeholder = "Type a name...";
+        input.autocomplete = "off";
+        const results = document.createElement("ul");
+        results.className = "autocomplete-results";
+
+        box.append(chips, input, results);
+        select.style.display = "none";
+        select.after(box);
+
+        function renderChips() {
+            chips.innerHTML = "";
+            Array.from(select.selectedOptions).forEach(option => {
+                const chip = document.createElement("span");
+                chip.className = "autocomplete-chip";
+                chip.innerText = option.text + " ×";
+                chip.onclick = function () {
+                    option.remove();
+                    renderChips();
+                };
+                chips.appendChild(chip);
+            });
+        }
+
+        function choose(result) {
+            if (!multiple) {
+                select.innerHTML = "";
+            }
+            let option = select.querySelector(`option[value="${result.id}"]`);
+            if (!option) {
+                option = new Option(result.label, result.id);
+                select.appendChild(option);
+            }
+            option.selected = true;
+            renderChips();
+            input.value = "";
+            results.innerHTML = "";
+        }
+
+        function load(cursor) {
+            const params = new URLSearchParams({q: input.value});
+            if (cursor) {
+                params.set("cursor", cursor);
+            }
+            if (select.dataset.excludeSelf) {
+                params.set("exclude_self", "1");
+            }
+            return fetch(`${url}?${params}`, {credentials: "same-origin"})
+                .then(response => response.ok ? response.json() : {results: [], next: null});
+        }
+
+        function show(data, append) {
+            if (!append) {
+                results.innerHTML = "";
+            }
+            data.results.forEach(result => {
+                const item = document.createElement("li");
+                item.innerText = result.label;
+                item.onclick = () => choose(result);
+                results.appendChild(item);
+            });
+            if (data.next) {
+                const more = document.createElement("li");
+                more.className = "autocomplete-more";
+                more.innerText = "More...";
+                more.onclick = function () {
+                    more.remove();
+                    load(data.next).then(next => show(next, true));
+                };
+                results.appendChild(more);
+            }
+        }
+
+        let timer = null;
+        let latest = 0;
+        input.addEventListener("input", function () {
+            clearTimeout(timer);
+            timer = setTimeout(function () {
+                // drop answers to queries the user has already typed past
+                const request = ++latest;
+                load(null).then(data => {
+                    if (request === latest) {
+                        show(data, false);
+                    }
+                });
+            }, DEBOUNCE);
+        });
+
+        renderChips();
+    }
+
+    document.querySelectorAll("select[data-autocomplete-url]").forEach(setup);
+});
@@ -7,11 +7,25 @@ function openPrivateChat(user1, user2) {
         protocol + window.location.host + `/ws/private/${user1}/${user2}/`
     );
 
+    const log = document.getElementById("chat-log");
+    // cursor of the next older history page, null once the start is reached
+    let before = null;
+    let loadingOlder = false;
+
     socket.onmessage = function(e) {
         const data = JSON.parse(e.data);
 
         if (data.type === "history") {
             data.messages.forEach(m => addMessage(m.sender_id, m.content, m.sender));
+            before = data.before;
+            fillLog();
+        }
+
+        if (data.type === "older") {
+            prependMessages(data.messages);
+            before = data.before;
+            loadingOlder = false;
+            fillLog();
         }
 
         if (data.type === "message") {
@@ -19,20 +33,57 @@ function openPrivateChat(user1, user2) {
         }
     };
 
-    function addMessage(senderId, content, senderName) {
-        const log = document.getElementById("chat-log");
+    function loadOlder() {
+        if (before && !loadingOlder && socket.readyState === WebSocket.OPEN) {
+            loadingOlder = true;
+            socket.send(JSON.stringify({
+                "type": "load_older",
+                "before": before
+            }));
+        }
+    }
 
+    // a log that does not overflow never scrolls, so keep loading until it does
+    function fillLog() {
+        if (log.scrollHeight <= log.clientHeight) {
+            loadOlder();
+        }
+    }
+
+    log.onscroll = function() {
+        if (log.scrollTop < 50) {
+            loadOlder();
+        }
+    };
+
+    function renderMessage(senderId, content, senderName) {
         const sideClass = senderId === currentUserId ? "message-right" : "message-left";
 
-        log.innerHTML += `
+        return `
             <div class="message ${sideClass}">
                 <b>${senderId === currentUserId ? "You" : senderName}:</b> ${content}
             </div>
         `;
+    }
+
+    function addMessage(senderId, content, senderName) {
+        log.innerHTML += renderMessage(senderId, content, senderName);
 
         log.scrollTop = log.scrollHeight;
     }
 
+    function prependMessages(messages) {
+        const previousHeight = log.scrollHeight;
+
+        log.insertAdjacentHTML(
+            "afterbegin",
+            messages.map(m => renderMessage(m.sender_id, m.content, m.sender)).join("")
+        );
+
+        // keep the message the user was looking at in place
+        log.scrollTop += log.scrollHeight - previousHeight;
+    }
+
     document.getElementById("chat-message-submit").onclick = () => {
         socket.send(JSON.stringify({
             "message": document.getElementById("chat-message-input").value
@@ -0,0 +1,52 @@
+document.addEventListener("DOMContentLoaded", function () {
+
+    const board = document.querySelector(".task-status-container[data-board-url]");
+    if (!board) {
+        return;
+    }
+
+    const POLL_INTERVAL = 15000;
+    let revision = null;
+
+    function renderColumn(column) {
+        const block = document.createElement("div");
+        block.className = "task-block";
+        block.style.background = column.color;
+
+        const title = document.createElement("h3");
+        title.innerText = column.label;
+        block.appendChild(title);
+
+        const list = document.createElement("ul");
+        list.className = "task-list";
+        if (column.tasks.length === 0) {
+            list.innerHTML = "<i>No tasks</i>";
+        }
+        column.tasks.forEach(task => {
+            const item = document.createElement("li");
+            item.innerText = task.name;
+            list.appendChild(item);
+        });
+        block.appendChild(list);
+        return block;
+    }
+
+    function refresh() {
+        // the browser revalidates with If-None-Match and gets 304 while nothing changed
+        fetch(board.dataset.boardUrl, {cache: "no-cache", credentials: "same-origin"})
+            .then(response => response.ok ? response.json() : null)
+            .then(data => {
+                if (!data || data.revision === revision) {
+                    return;
+                }
+                if (revision !== null) {
+                    board.replaceChildren(...data.columns.map(renderColumn));
+                }
+                revision = data.revision;
+            })
+            .catch(() => {});
+    }
+
+    refresh();
+    setInterval(refresh, POLL_INTERVAL);
+});
@@ -0,0 +1,16 @@
+from django import template
+
+from management.caching import org_version
+from management.tenancy import request_org_id
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def org_cache_version(context, *names):
+    """
+    Current versions of the named caches of the request's organization, for use
+    as a {% cache %} vary_on argument so the fragment goes stale on invalidate_org().
+    """
+    org_id = request_org_id(context["request"])
+    return ".".join(str(org_version(name, org_id)) for name in names)
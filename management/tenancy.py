@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from management.models import Organization
+
+
+class OrganizationCache:
+    """
+    Process-local LRU of Organization rows keyed by id. Entries are dropped on
+    save/delete of the organization (see signals) and after `ttl` seconds, which
+    bounds how stale another process's copy can get.
+    """
+
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, org_id):
+        if org_id is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._rows.get(org_id)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._rows.move_to_end(org_id)
+                return entry[0]
+        organization = Organization.objects.filter(pk=org_id).first()
+        if organization is not None:
+            with self._lock:
+                self._rows[org_id] = (organization, now)
+                self._rows.move_to_end(org_id)
+                while len(self._rows) > self.maxsize:
+                    self._rows.popitem(last=False)
+        return organization
+
+    def invalidate(self, org_id):
+        with self._lock:
+            self._rows.pop(org_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+
+    def __len__(self):
+        return len(self._rows)
+
+
+organization_cache = OrganizationCache(
+    maxsize=settings.ORGANIZATION_CACHE_SIZE,
+    ttl=settings.ORGANIZATION_CACHE_TTL,
+)
+
+
+def get_organization(org_id):
+    return organization_cache.get(org_id)
+
+
+def request_org_id(request):
+    """
+    The organization id of the request's user. Set by the organization middleware;
+    requests built without it (RequestFactory, tests) fall back to the user.
+    """
+    if not hasattr(request, "org_id"):
+        user = getattr(request, "user", None)
+        request.org_id = getattr(user, "organization_id", None)
+    return request.org_id
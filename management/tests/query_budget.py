@@ -0,0 +1,22 @@
+from management.middleware.instrumentation import request_measured
+
+
+class QueryBudgetMixin:
+    """
+    Fails a test when a request to a view runs more queries than its budget.
+    Budgets are declared per URL name, e.g. {"management:task-list": 10}.
+    """
+    query_budgets = {}
+
+    def setUp(self):
+        super().setUp()
+        request_measured.connect(self._check_query_budget)
+        self.addCleanup(request_measured.disconnect, self._check_query_budget)
+
+    def _check_query_budget(self, sender, view_name, stats, **kwargs):
+        budget = self.query_budgets.get(view_name)
+        if budget is not None and stats.queries > budget:
+            raise AssertionError(
+                f"{view_name} ran {stats.queries} queries, over its budget of {budget}; "
+                f"slowest: {stats.slowest_sql}"
+            )
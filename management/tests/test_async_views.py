@@ -0,0 +1,160 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from management import async_views
+from management.models import Comment, Organization, Project, Task, TaskType, Team
+from management.search import index_queryset
+from management.views import TaskListView
+from management.visits import visit_counter
+
+User = get_user_model()
+
+INDEX = reverse("management:index")
+
+
+# ---------------------------------------------------------------------
+# Async views render what the sync ones do
+# ---------------------------------------------------------------------
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        visit_counter.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.other = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        self.project = Project.objects.create(name="Website", organization=self.org)
+        team = Team.objects.create(name="Platform", organization=self.org)
+        team.workers.add(self.user)
+        self.project.teams.add(team)
+        task_type = TaskType.objects.create(name="Bug")
+        self.tasks = []
+        for i in range(25):
+            task = Task.objects.create(
+                name=f"Task {i}", description="d", type=task_type, organization=self.org, project=self.project,
+            )
+            task.workers.add(self.user)
+            self.tasks.append(task)
+        Comment.objects.create(text="Looks good", worker=self.other, task=self.tasks[0], organization=self.org)
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        visit_counter.clear()
+
+    def call(self, view, path, data=None, user=None, **kwargs):
+        request = RequestFactory().get(path, data)
+        request.user = user or self.user
+        request.org_id = request.user.organization_id
+        return async_to_sync(view)(request, **kwargs)
+
+    def test_pages_match_the_sync_views(self):
+        cases = [
+            ("index", INDEX, {}, "Website"),
+            ("task-list", reverse("management:task-list"), {}, "Task 19"),
+            ("task-detail", reverse("management:task-detail", args=[self.tasks[0].pk]), {"pk": self.tasks[0].pk}, "Task 0"),
+            ("project-list", reverse("management:project-list"), {}, "Website"),
+            ("project-detail", reverse("management:project-detail", args=[self.project.pk]), {"pk": self.project.pk}, "Looks good"),
+            ("comment-list", reverse("management:comment-list"), {}, "Looks good"),
+        ]
+        for name, path, kwargs, text in cases:
+            with self.subTest(name=name):
+                self.assertContains(self.client.get(path), text)
+                self.assertContains(self.call(async_views.VIEWS[name], path, **kwargs), text)
+
+    def test_task_list_pages_with_the_same_cursors(self):
+        path = reverse("management:task-list")
+        first = self.client.get(path).context["page_obj"]
+        second = self.client.get(path, {"cursor": first.next_cursor}).context["page_obj"]
+
+        self.assertContains(self.call(async_views.task_list, path), first.next_cursor)
+        self.assertContains(
+            self.call(async_views.task_list, path, {"cursor": first.next_cursor}), second.previous_cursor,
+        )
+
+    def test_search(self):
+        index_queryset(Task.objects.all())
+
+        response = self.call(async_views.task_list, reverse("management:task-list"), {"query": "Task"})
+
+        self.assertContains(response, "Task 3")
+
+    def test_invalid_cursor_and_page_are_not_found(self):
+        with self.assertRaises(Http404):
+            self.call(async_views.task_list, reverse("management:task-list"), {"cursor": "bogus"})
+        with self.assertRaises(Http404):
+            self.call(async_views.project_list, reverse("management:project-list"), {"page": 9})
+
+    def test_objects_of_other_organizations_are_not_found(self):
+        other_org = Organization.objects.create(name="Other")
+        outsider = User.objects.create_user("u3", "u3@test.com", "12345", organization=other_org)
+
+        with self.assertRaises(Http404):
+            self.call(async_views.task_detail, "/", user=outsider, pk=self.tasks[0].pk)
+
+    def test_anonymous_users_are_sent_to_login(self):
+        request = RequestFactory().get(INDEX)
+        request.user = AnonymousUser()
+
+        response = async_to_sync(async_views.index)(request)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("login", response["Location"])
+
+    def test_index_counts_the_visit(self):
+        self.call(async_views.index, INDEX)
+
+        self.assertEqual(visit_counter.pending(self.user.id), 1)
+
+
+# ---------------------------------------------------------------------
+# Selection per URL and the async middleware chain
+# ---------------------------------------------------------------------
+class AsyncSelectionTests(TestCase):
+    def test_views_are_selected_by_url_name(self):
+        sync_view = TaskListView.as_view()
+
+        with override_settings(ASYNC_VIEWS=[]):
+            self.assertIs(async_views.select_view("task-list", sync_view), sync_view)
+        with override_settings(ASYNC_VIEWS=["task-list"]):
+            self.assertIs(async_views.select_view("task-list", sync_view), async_views.task_list)
+        with override_settings(ASYNC_VIEWS=["all"]):
+            self.assertIs(async_views.select_view("index", sync_view), async_views.index)
+            self.assertIs(async_views.select_view("team-list", sync_view), sync_view)
+
+
+class AsyncMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org, is_staff=True)
+
+    def login(self, user):
+        self.client.force_login(user)
+        self.async_client.cookies = self.client.cookies
+
+    async def test_requests_pass_the_async_chain(self):
+        await self.async_client.get("/")
+
+        response = await self.async_client.get(INDEX)
+
+        self.assertEqual(response.status_code, 302)
+
+    async def test_staff_get_server_timing(self):
+        await sync_to_async(self.login)(self.user)
+
+        response = await self.async_client.get(INDEX)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    async def test_user_without_organization_is_sent_to_assign(self):
+        user = await sync_to_async(User.objects.create_user)("u2", "u2@test.com", "12345")
+        await sync_to_async(self.login)(user)
+
+        response = await self.async_client.get(INDEX)
+
+        self.assertRedirects(response, reverse("management:assign-organization"), fetch_redirect_response=False)
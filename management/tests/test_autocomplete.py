@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from management.lookups import PAGE_SIZE
+from management.models import ChatRoom, Organization
+
+User = get_user_model()
+
+AUTOCOMPLETE = reverse("management:worker-autocomplete")
+CHAT_CREATE = reverse("management:chat-create")
+
+
+# ---------------------------------------------------------------------
+# Worker autocomplete endpoint
+# ---------------------------------------------------------------------
+class WorkerAutocompleteTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.other_org = Organization.objects.create(name="Other")
+        self.user = User.objects.create_user("me", "me@test.com", "12345", organization=self.org)
+        self.alice = User.objects.create(
+            username="asmith", first_name="Alice", last_name="Smith", organization=self.org,
+        )
+        self.bob = User.objects.create(
+            username="bob", first_name="Robert", last_name="Alison", organization=self.org,
+        )
+        User.objects.create(username="alien", first_name="Alice", organization=self.other_org)
+        self.client.force_login(self.user)
+
+    def lookup(self, **params):
+        response = self.client.get(AUTOCOMPLETE, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(AUTOCOMPLETE).status_code, 302)
+
+    def test_prefix_matches_any_name_case_insensitively(self):
+        ids = [result["id"] for result in self.lookup(q="ALI")["results"]]
+
+        # "asmith" by first name, "bob" by last name; never the other organization
+        self.assertEqual(ids, [self.alice.id, self.bob.id])
+
+    def test_non_ascii_prefix_matches_usual_spellings(self):
+        olga = User.objects.create(username="opetrenko", first_name="Ölga", last_name="łukasz", organization=self.org)
+
+        for query in ("Öl", "öl", "ÖL", "Łuk", "łuk"):
+            ids = [result["id"] for result in self.lookup(q=query)["results"]]
+            self.assertEqual(ids, [olga.id], query)
+
+    def test_every_term_must_match(self):
+        data = self.lookup(q="alice sm")
+
+        self.assertEqual(data["results"], [{"id": self.alice.id, "label": "Alice Smith (asmith)"}])
+
+    def test_exclude_self(self):
+        ids = [result["id"] for result in self.lookup(exclude_self="1")["results"]]
+
+        self.assertNotIn(self.user.id, ids)
+        self.assertEqual(len(ids), 2)
+
+    def test_pages_with_cursor(self):
+        User.objects.bulk_create(
+            User(username=f"worker{i:02}", organization=self.org) for i in range(PAGE_SIZE + 5)
+        )
+
+        first = self.lookup(q="worker")
+        second = self.lookup(q="worker", cursor=first["next"])
+
+        self.assertEqual(len(first["results"]), PAGE_SIZE)
+        self.assertIsNone(second["next"])
+        labels = [r["label"] for r in first["results"] + second["results"]]
+        self.assertEqual(labels, [f"worker{i:02}" for i in range(PAGE_SIZE + 5)])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get(AUTOCOMPLETE, {"cursor": "nope"}).status_code, 404)
+
+
+# ---------------------------------------------------------------------
+# Chat creation with the autocomplete
+# ---------------------------------------------------------------------
+class ChatCreateViewTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("me", "me@test.com", "12345", organization=self.org)
+        self.client.force_login(self.user)
+
+    def test_page_does_not_list_workers(self):
+        User.objects.bulk_create(User(username=f"worker{i}", organization=self.org) for i in range(30))
+
+        response = self.client.get(CHAT_CREATE)
+
+        self.assertNotContains(response, "worker1")
+        self.assertContains(response, AUTOCOMPLETE)
+
+    def test_private_chat_with_worker_of_organization(self):
+        other = User.objects.create(username="other", organization=self.org)
+
+        self.client.post(CHAT_CREATE, {"start_private": "", "worker_id": other.id})
+
+        room = ChatRoom.objects.get()
+        self.assertEqual(set(room.members.all()), {self.user, other})
+
+    def test_private_chat_rejects_other_organization(self):
+        stranger = User.objects.create(
+            username="stranger", organization=Organization.objects.create(name="Other"),
+        )
+
+        response = self.client.post(CHAT_CREATE, {"start_private": "", "worker_id": stranger.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ChatRoom.objects.exists())
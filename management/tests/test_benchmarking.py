@@ -0,0 +1,118 @@
+import io
+import json
+import os
+import random
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from management import benchmarking
+from management.models import Comment, Organization, Project, Task, TaskType, Team
+
+User = get_user_model()
+
+
+def result(p95, queries=3.0):
+    return {"view": "management:index", "requests": 10, "errors": 0, "p50_ms": p95 / 2, "p95_ms": p95,
+            "p99_ms": p95, "rps": 5.0, "queries": queries}
+
+
+# ---------------------------------------------------------------------
+# Mix, results and baselines
+# ---------------------------------------------------------------------
+class BenchmarkingTests(SimpleTestCase):
+    def test_plan_follows_weights_and_seed(self):
+        mix = [benchmarking.Entry("a", 9, ["/a"]), benchmarking.Entry("b", 1, ["/b1", "/b2"])]
+
+        requests = benchmarking.plan(mix, 1000, random.Random(1))
+
+        self.assertEqual(requests, benchmarking.plan(mix, 1000, random.Random(1)))
+        self.assertGreater(sum(label == "a" for label, _ in requests), 800)
+        self.assertEqual({path for label, path in requests if label == "b"}, {"/b1", "/b2"})
+
+    def test_summary(self):
+        results = benchmarking.Results()
+        for n in range(100):
+            results.add("index", 200 if n else 302, (n + 1) / 1000, {"view": "management:index", "queries": 4})
+        results.elapsed = 2.0
+
+        summary = results.summary()["index"]
+
+        self.assertEqual((summary["requests"], summary["errors"], summary["queries"]), (100, 1, 4))
+        self.assertEqual((summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]), (50.0, 95.0, 99.0))
+        self.assertEqual(results.throughput(), 50.0)
+
+    def test_compare_flags_slower_p95_more_queries_and_lower_throughput(self):
+        baseline = {"throughput": 100.0, "results": {"index": result(50), "task-list": result(50), "gone": result(5)}}
+        summary = {"index": result(70), "task-list": result(55, queries=4.0), "new": result(500)}
+
+        regressions = benchmarking.compare(baseline, summary, 70.0)
+
+        self.assertEqual(regressions, [
+            "index: p95 50.0 -> 70.0 ms",
+            "task-list: queries 3.0 -> 4.0",
+            "throughput 100.0 -> 70.0 req/s",
+        ])
+
+    def test_small_differences_are_noise(self):
+        baseline = {"throughput": 100.0, "results": {"index": result(1.0)}}
+
+        self.assertEqual(benchmarking.compare(baseline, {"index": result(2.5)}, 95.0), [])
+
+
+# ---------------------------------------------------------------------
+# Command, against both applications
+# ---------------------------------------------------------------------
+class BenchmarkCommandTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        org = Organization.objects.create(name="Org")
+        user = User.objects.create_user("u1", "u1@test.com", "12345", organization=org)
+        team = Team.objects.create(name="Platform", organization=org)
+        team.workers.add(user)
+        project = Project.objects.create(name="Website", organization=org)
+        project.teams.add(team)
+        task_type = TaskType.objects.create(name="Bug")
+        tasks = Task.objects.bulk_create(
+            Task(name=f"Fix login {i}", description="d", type=task_type, project=project, organization=org)
+            for i in range(30)
+        )
+        Comment.objects.create(worker=user, task=tasks[0], text="Looks good", organization=org)
+
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command("benchmark_http", "--requests", "40", "--clients", "2", "--host", "testserver", *args, stdout=out)
+        return out.getvalue()
+
+    def test_save_and_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+
+            output = self.run_command("--save", path)
+            with open(path) as f:
+                baseline = json.load(f)
+
+            self.assertIn("management:task-list", output)
+            self.assertEqual(baseline["meta"]["mode"], "wsgi")
+            for label, summary in baseline["results"].items():
+                with self.subTest(label=label):
+                    self.assertEqual(summary["errors"], 0)
+                    self.assertIsNotNone(summary["queries"])
+
+            # nothing can be that much faster
+            for summary in baseline["results"].values():
+                summary["p95_ms"] = 0
+                summary["queries"] = 0
+            with open(path, "w") as f:
+                json.dump(baseline, f)
+            with self.assertRaisesMessage(CommandError, "regressions"):
+                self.run_command("--compare", path)
+
+    def test_asgi(self):
+        output = self.run_command("--mode", "asgi")
+
+        self.assertIn("management:index", output)
+        self.assertIn("requests/s in total", output)
@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from management.caching import org_version
+from management.models import Organization, Project, Task, TaskType
+
+User = get_user_model()
+
+BOARD = reverse("management:task-board")
+
+
+# ---------------------------------------------------------------------
+# JSON board with conditional GET
+# ---------------------------------------------------------------------
+class TaskBoardTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.other = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        self.project = Project.objects.create(name="P1", organization=self.org)
+        self.type = TaskType.objects.create(name="Bug")
+        # the board changes on commit, which TestCase never reaches
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task = self.create_task("Write tests", Task.Status.in_progress)
+        self.client.force_login(self.user)
+
+    def create_task(self, name, status=Task.Status.todo, worker=None):
+        task = Task.objects.create(
+            name=name, description="d", project=self.project, type=self.type,
+            organization=self.org, status=status,
+        )
+        task.workers.add(worker or self.user)
+        return task
+
+    def test_board_columns(self):
+        self.create_task("Not mine", worker=self.other)
+
+        response = self.client.get(BOARD)
+
+        self.assertEqual(response.status_code, 200)
+        columns = {column["status"]: column["tasks"] for column in response.json()["columns"]}
+        self.assertEqual(list(columns), [value for value, _ in Task.Status.choices])
+        self.assertEqual([t["name"] for t in columns["in_progress"]], ["Write tests"])
+        self.assertEqual(columns["todo"], [])
+
+    def test_strong_validators(self):
+        response = self.client.get(BOARD)
+
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_not_modified_until_a_task_changes(self):
+        etag = self.client.get(BOARD)["ETag"]
+
+        with self.assertNumQueries(2):
+            # session and user; the revision is in the cache
+            unchanged = self.client.get(BOARD, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.status = Task.Status.done
+            self.task.save()
+        changed = self.client.get(BOARD, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+
+    def test_assignment_changes_revision(self):
+        revision = self.client.get(BOARD).json()["revision"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_task("Another", worker=self.other).workers.add(self.user)
+
+        self.assertGreater(self.client.get(BOARD).json()["revision"], revision)
+
+    def test_one_bump_per_transaction_without_touching_the_organization(self):
+        revision = org_version("board", self.org.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, \
+                CaptureQueriesContext(connection) as queries:
+            task = self.create_task("Another")
+            task.status = Task.Status.done
+            task.save()
+            self.assertEqual(org_version("board", self.org.id), revision)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(org_version("board", self.org.id), revision + 1)
+        self.assertFalse([q for q in queries if q["sql"].startswith('UPDATE "management_organization"')])
+
+    def test_changes_after_a_rolled_back_savepoint_are_bumped(self):
+        revision = org_version("board", self.org.id)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.create_task("Rolled back")
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+            self.create_task("Kept")
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(org_version("board", self.org.id), revision + 1)
+
+    def test_etag_is_per_worker(self):
+        mine = self.client.get(BOARD)["ETag"]
+        self.client.force_login(self.other)
+
+        response = self.client.get(BOARD, HTTP_IF_NONE_MATCH=mine)
+
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,193 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import ProtectedError
+from django.db.models.signals import pre_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from management import bulk
+from management.caching import org_version
+from management.models import Comment, Organization, Project, SearchDocument, Task, TaskType
+from management.search import index_queryset
+
+User = get_user_model()
+
+BULK = reverse("management:task-bulk")
+
+
+def writes(queries, table):
+    """INSERT, UPDATE and DELETE statements on a table."""
+    return [
+        query["sql"] for query in queries
+        if query["sql"].startswith(("INSERT", "UPDATE", "DELETE")) and f'"{table}"' in query["sql"]
+    ]
+
+
+class BulkTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.worker = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        self.project = Project.objects.create(name="P1", organization=self.org)
+        self.type = TaskType.objects.create(name="Bug")
+        self.tasks = Task.objects.bulk_create(
+            Task(name=f"Task {i}", description="d", type=self.type, project=self.project, organization=self.org)
+            for i in range(12)
+        )
+        self.ids = [task.id for task in self.tasks]
+        Task.workers.through.objects.bulk_create(
+            Task.workers.through(task_id=task_id, worker_id=self.user.id) for task_id in self.ids
+        )
+
+    def board_revision(self):
+        return org_version("board", self.org.id)
+
+
+# ---------------------------------------------------------------------
+# Bulk operations
+# ---------------------------------------------------------------------
+class BulkOperationTests(BulkTestCase):
+    def test_update_is_one_statement(self):
+        deadline = timezone.now() + timedelta(days=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = bulk.update_tasks(self.org.id, self.ids, status=Task.Status.done, deadline=deadline)
+
+        self.assertEqual(updated, 12)
+        self.assertEqual(len(writes(queries, "management_task")), 1)
+        self.assertEqual(Task.objects.filter(status=Task.Status.done, deadline=deadline).count(), 12)
+
+    def test_update_invalidates_dashboard_board_and_calendar(self):
+        revision = self.board_revision()
+        dashboard = org_version("dashboard", self.org.id)
+        with mock.patch("management.bulk.invalidate_calendar") as invalidate_calendar, \
+                self.captureOnCommitCallbacks(execute=True):
+            bulk.update_tasks(self.org.id, self.ids[:2], status=Task.Status.done)
+
+        self.assertEqual(self.board_revision(), revision + 1)
+        self.assertNotEqual(org_version("dashboard", self.org.id), dashboard)
+        invalidate_calendar.assert_called_once_with(self.user.id)
+
+    def test_other_organizations_are_untouched(self):
+        other_org = Organization.objects.create(name="Other")
+        outsider = Task.objects.create(
+            name="Theirs", description="d", type=self.type, project=self.project, organization=other_org,
+        )
+
+        self.assertEqual(bulk.update_tasks(self.org.id, [outsider.id], priority=Task.Priority.low), 0)
+        self.assertEqual(bulk.assign_workers(self.org.id, [outsider.id], [self.worker.id]), 0)
+        self.assertEqual(bulk.delete_tasks(self.org.id, [outsider.id]), 0)
+        self.assertTrue(Task.objects.filter(pk=outsider.pk, priority=Task.Priority.urgent).exists())
+
+    def test_assign_creates_missing_rows_in_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            created = bulk.assign_workers(self.org.id, self.ids, [self.user.id, self.worker.id])
+
+        self.assertEqual(created, 12)
+        self.assertEqual(len(writes(queries, "management_task_workers")), 1)
+        self.assertEqual(self.worker.tasks.count(), 12)
+        self.assertEqual(bulk.assign_workers(self.org.id, self.ids, [self.worker.id]), 0)
+
+    def test_unassign(self):
+        removed = bulk.unassign_workers(self.org.id, self.ids[:5], [self.user.id])
+
+        self.assertEqual(removed, 5)
+        self.assertEqual(self.user.tasks.count(), 7)
+
+    def test_delete_in_batches(self):
+        index_queryset(Task.objects.all())
+
+        with mock.patch.object(bulk, "DELETE_BATCH_SIZE", 5):
+            deleted = bulk.delete_tasks(self.org.id, self.ids[:11])
+
+        self.assertEqual(deleted, 11)
+        self.assertEqual(list(Task.objects.values_list("id", flat=True)), self.ids[11:])
+        self.assertEqual(Task.workers.through.objects.count(), 1)
+        self.assertEqual(SearchDocument.objects.filter(kind=SearchDocument.Kind.task).count(), 1)
+
+    def test_delete_is_one_statement_per_batch_without_signals(self):
+        deleted = []
+
+        def receiver(instance, **kwargs):
+            deleted.append(instance)
+
+        pre_delete.connect(receiver, sender=Task)
+        self.addCleanup(pre_delete.disconnect, receiver, sender=Task)
+        with mock.patch.object(bulk, "DELETE_BATCH_SIZE", 5), CaptureQueriesContext(connection) as queries:
+            bulk.delete_tasks(self.org.id, self.ids)
+
+        self.assertEqual(len(writes(queries, "management_task")), 3)
+        self.assertEqual(deleted, [])
+
+    def test_delete_refuses_tasks_with_comments(self):
+        Comment.objects.create(worker=self.user, task=self.tasks[3], text="keep", organization=self.org)
+
+        with self.assertRaises(ProtectedError):
+            bulk.delete_tasks(self.org.id, self.ids)
+
+        self.assertEqual(Task.objects.count(), 12)
+
+    def test_failed_batch_rolls_everything_back(self):
+        with mock.patch.object(bulk, "DELETE_BATCH_SIZE", 5), \
+                mock.patch.object(bulk, "remove_ids", side_effect=[None, DatabaseError]):
+            with self.assertRaises(DatabaseError):
+                bulk.delete_tasks(self.org.id, self.ids)
+
+        self.assertEqual(Task.objects.count(), 12)
+        self.assertEqual(Task.workers.through.objects.count(), 12)
+
+
+# ---------------------------------------------------------------------
+# Bulk endpoint
+# ---------------------------------------------------------------------
+class BulkViewTests(BulkTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_update(self):
+        response = self.client.post(BULK, {"action": "update", "tasks": self.ids, "priority": "low"})
+
+        self.assertEqual(response.json(), {"action": "update", "count": 12})
+        self.assertEqual(Task.objects.filter(priority=Task.Priority.low).count(), 12)
+
+    def test_comma_separated_ids_and_assign(self):
+        ids = ",".join(map(str, self.ids[:3]))
+
+        response = self.client.post(BULK, {"action": "assign", "tasks": ids, "workers": [self.worker.id]})
+
+        self.assertEqual(response.json()["count"], 3)
+
+    def test_unknown_tasks_are_rejected(self):
+        other_org = Organization.objects.create(name="Other")
+        outsider = Task.objects.create(
+            name="Theirs", description="d", type=self.type, project=self.project, organization=other_org,
+        )
+
+        response = self.client.post(BULK, {"action": "delete", "tasks": [self.ids[0], outsider.id]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("tasks", response.json()["errors"])
+        self.assertTrue(Task.objects.filter(pk=self.ids[0]).exists())
+
+    def test_invalid_requests(self):
+        Comment.objects.create(worker=self.user, task=self.tasks[0], text="keep", organization=self.org)
+        cases = [
+            {"action": "update", "tasks": self.ids},
+            {"action": "assign", "tasks": self.ids},
+            {"action": "delete", "tasks": self.ids},
+            {"action": "delete", "tasks": "1,x"},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                self.assertEqual(self.client.post(BULK, data).status_code, 400)
+
+    def test_get_is_not_allowed(self):
+        self.assertEqual(self.client.get(BULK).status_code, 405)
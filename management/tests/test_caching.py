@@ -0,0 +1,160 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from management.caching import invalidate_org, org_key, org_version
+from management.models import Organization, Project, Task, TaskType, Team
+
+User = get_user_model()
+
+INDEX = reverse("management:index")
+
+
+# ---------------------------------------------------------------------
+# Local tier in front of the shared tier
+# ---------------------------------------------------------------------
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.local = caches["local"]
+        self.shared = caches["shared"]
+
+    def test_writes_reach_both_tiers(self):
+        cache.set("key", "value")
+
+        self.assertEqual(self.local.get("key"), "value")
+        self.assertEqual(self.shared.get("key"), "value")
+
+    def test_local_misses_are_filled_from_shared(self):
+        self.shared.set("key", "value")
+
+        self.assertEqual(cache.get("key"), "value")
+        self.assertEqual(self.local.get("key"), "value")
+        with self.assertNumQueries(0):
+            cache.get("key")
+
+    def test_delete_and_incr_drop_the_local_copy(self):
+        cache.set("counter", 1)
+        cache.incr("counter")
+        self.assertEqual(cache.get("counter"), 2)
+
+        cache.delete("counter")
+        self.assertIsNone(cache.get("counter"))
+
+    def test_lost_add_does_not_shadow_the_shared_value(self):
+        self.shared.set("key", "theirs")
+        self.local.set("key", "stale")
+
+        self.assertFalse(cache.add("key", "mine"))
+        self.assertEqual(cache.get("key"), "theirs")
+
+    def test_get_many(self):
+        cache.set("a", 1)
+        self.shared.set("b", 2)
+
+        self.assertEqual(cache.get_many(["a", "b", "c"]), {"a": 1, "b": 2})
+
+    def test_shared_tier_keeps_more_than_a_few_hundred_keys(self):
+        self.shared.set_many({f"key-{n}": n for n in range(400)})
+
+        self.assertEqual(len(self.shared.get_many([f"key-{n}" for n in range(400)])), 400)
+
+
+# ---------------------------------------------------------------------
+# Organization keys and their invalidation
+# ---------------------------------------------------------------------
+class OrganizationKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.other_org = Organization.objects.create(name="Other")
+
+    def test_invalidation_is_per_organization(self):
+        key, other_key = org_key("projects", self.org.id, "x"), org_key("projects", self.other_org.id, "x")
+
+        invalidate_org("projects", self.org.id)
+
+        self.assertNotEqual(org_key("projects", self.org.id, "x"), key)
+        self.assertEqual(org_key("projects", self.other_org.id, "x"), other_key)
+
+    def test_models_invalidate_their_namespace(self):
+        worker = User.objects.create(username="w1", organization=self.org)
+        task_type = TaskType.objects.create(name="Bug")
+        cases = [
+            ("projects", lambda: Project.objects.create(name="P1", organization=self.org)),
+            ("teams", lambda: Team.objects.create(name="T1", organization=self.org)),
+            ("teams", lambda: Team.objects.get(name="T1").workers.add(worker)),
+            ("dashboard", lambda: Task.objects.create(
+                name="T", description="d", type=task_type, organization=self.org,
+                project=Project.objects.get(name="P1"),
+            )),
+            ("projects", lambda: Project.objects.create(name="P2", organization=self.org).delete()),
+        ]
+        for name, change in cases:
+            with self.subTest(name=name):
+                version = org_version(name, self.org.id)
+                change()
+                self.assertNotEqual(org_version(name, self.org.id), version)
+
+
+# ---------------------------------------------------------------------
+# Template fragments
+# ---------------------------------------------------------------------
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.project = Project.objects.create(name="Website", organization=self.org)
+        self.type = TaskType.objects.create(name="Bug")
+        self.client.force_login(self.user)
+
+    def test_project_dropdown_follows_renames(self):
+        self.assertContains(self.client.get(INDEX), "Website")
+
+        self.project.name = "Shop"
+        self.project.save()
+
+        self.assertContains(self.client.get(INDEX), "Shop")
+
+    def test_dashboard_charts_follow_tasks(self):
+        self.assertNotContains(self.client.get(INDEX), "0/1")
+
+        task = Task.objects.create(
+            name="T", description="d", type=self.type, organization=self.org, project=self.project,
+        )
+        task.workers.add(self.user)
+
+        # done/assigned of the worker table
+        self.assertContains(self.client.get(INDEX), "0/1")
+
+    def test_cached_fragments_skip_the_project_query(self):
+        self.assertIsNotNone(self.client.get(INDEX).context["project_list"]._result_cache)
+
+        # the dropdown comes from the cache, so the project list is never evaluated
+        self.assertIsNone(self.client.get(INDEX).context["project_list"]._result_cache)
+
+    def test_sidebar_follows_username(self):
+        self.client.get(INDEX)
+
+        self.user.username = "renamed"
+        self.user.save()
+
+        self.assertContains(self.client.get(INDEX), "renamed")
+
+    def test_team_fragments_follow_team_changes(self):
+        template = Template(
+            "{% load cache org_cache %}{% org_cache_version 'teams' as v %}"
+            "{% cache 600 teams request.org_id v %}{{ names }}{% endcache %}"
+        )
+        request = RequestFactory().get("/")
+        request.org_id = self.org.id
+        render = lambda names: template.render(Context({"request": request, "names": names}))
+        self.assertEqual(render("before"), "before")
+        self.assertEqual(render("cached"), "before")
+
+        Team.objects.create(name="Platform", organization=self.org)
+
+        self.assertEqual(render("after"), "after")
@@ -0,0 +1,115 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from management.calendar_data import CalendarTask, get_month_tasks, month_range
+from management.models import Organization, Project, Task, TaskType
+
+User = get_user_model()
+
+
+def aware(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+# ---------------------------------------------------------------------
+# Calendar data layer
+# ---------------------------------------------------------------------
+class MonthRangeTests(TestCase):
+    def test_month_range_is_half_open(self):
+        start, end = month_range(2025, 3, dt_timezone.utc)
+        self.assertEqual(start, aware(2025, 3, 1))
+        self.assertEqual(end, aware(2025, 4, 1))
+
+    def test_december_rolls_over_year(self):
+        start, end = month_range(2025, 12, dt_timezone.utc)
+        self.assertEqual(end, aware(2026, 1, 1))
+
+
+class MonthTasksTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.other = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        self.type = TaskType.objects.create(name="Bug", color="#ffffff")
+        self.project = Project.objects.create(name="P1", organization=self.org)
+        self.task = self.create_task("In month", aware(2025, 3, 31, 23, 59))
+        self.create_task("Next month", aware(2025, 4, 1))
+        self.create_task("Previous month", aware(2025, 2, 28, 23, 59))
+
+    def create_task(self, name, deadline, worker=None):
+        task = Task.objects.create(
+            name=name, description="d", project=self.project, type=self.type,
+            organization=self.org, deadline=deadline,
+        )
+        task.workers.add(worker or self.user)
+        return task
+
+    def test_returns_lightweight_rows_within_month(self):
+        tasks = get_month_tasks(self.user.id, 2025, 3)
+
+        self.assertEqual(len(tasks), 1)
+        self.assertIsInstance(tasks[0], CalendarTask)
+        self.assertEqual(tasks[0].name, "In month")
+        self.assertEqual(tasks[0].color, "#ffffff")
+
+    def test_second_lookup_hits_cache(self):
+        get_month_tasks(self.user.id, 2025, 3)
+        with self.assertNumQueries(0):
+            get_month_tasks(self.user.id, 2025, 3)
+
+    def test_deadline_change_invalidates_cache(self):
+        get_month_tasks(self.user.id, 2025, 3)
+        task = Task.objects.get(pk=self.task.pk)
+        task.deadline = aware(2025, 4, 2)
+        task.save()
+
+        self.assertEqual(get_month_tasks(self.user.id, 2025, 3), [])
+        self.assertEqual(len(get_month_tasks(self.user.id, 2025, 4)), 2)
+
+    def test_unrelated_field_change_keeps_cache(self):
+        get_month_tasks(self.user.id, 2025, 3)
+        task = Task.objects.get(pk=self.task.pk)
+        task.description = "changed"
+        task.save()
+
+        with self.assertNumQueries(0):
+            get_month_tasks(self.user.id, 2025, 3)
+
+    def test_assignee_change_invalidates_cache(self):
+        self.assertEqual(get_month_tasks(self.other.id, 2025, 3), [])
+        self.task.workers.add(self.other)
+        self.assertEqual(len(get_month_tasks(self.other.id, 2025, 3)), 1)
+
+        self.task.workers.clear()
+        self.assertEqual(get_month_tasks(self.other.id, 2025, 3), [])
+        self.assertEqual(get_month_tasks(self.user.id, 2025, 3), [])
+
+    def test_type_change_invalidates_cache(self):
+        get_month_tasks(self.user.id, 2025, 3)
+        self.type.color = "#000000"
+        self.type.save()
+
+        self.assertEqual(get_month_tasks(self.user.id, 2025, 3)[0].color, "#000000")
+
+    @override_settings(TIME_ZONE="Europe/Kyiv")
+    def test_month_follows_current_timezone(self):
+        # 2025-02-28 23:59 UTC is already March, 2025-03-31 23:59 UTC is April in Kyiv
+        tasks = get_month_tasks(self.user.id, 2025, 3)
+        self.assertEqual([task.name for task in tasks], ["Previous month"])
+
+    def test_index_groups_tasks_by_day(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("management:index"), {"month": 3, "year": 2025})
+
+        tasks_by_day = response.context["tasks_by_day"]
+        self.assertEqual(len(tasks_by_day), 31)
+        self.assertEqual(
+            [task.name for task in tasks_by_day[timezone.localdate(self.task.deadline)]],
+            ["In month"],
+        )
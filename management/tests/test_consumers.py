@@ -0,0 +1,243 @@
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from management.chat_buffer import MessageWriteBuffer, message_buffer
+from management.consumers import HISTORY_PAGE_SIZE, MAX_MESSAGE_LENGTH, load_history_page
+from management.layers import BrokerChannelLayer, PostgresBroker
+from management.models import ChatRoom, Message, Organization
+from management.pagination import PREVIOUS, decode_cursor, encode_cursor
+from management.routing import websocket_urlpatterns
+
+User = get_user_model()
+application = URLRouter(websocket_urlpatterns)
+
+
+def create_messages(room, sender, count):
+    messages = Message.objects.bulk_create(
+        Message(room=room, sender=sender, content=f"message {i}") for i in range(count)
+    )
+    base = timezone.now() - timedelta(days=1)
+    for i, message in enumerate(messages):
+        message.timestamp = base + timedelta(seconds=i)
+    Message.objects.bulk_update(messages, ["timestamp"])
+
+
+# ---------------------------------------------------------------------
+# History pages
+# ---------------------------------------------------------------------
+class HistoryPageTests(TransactionTestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.room = ChatRoom.objects.create(name="Room", organization=self.org)
+        create_messages(self.room, self.user, 120)
+
+    def test_latest_page_oldest_first(self):
+        messages, cursor = load_history_page(self.room.id)
+
+        self.assertEqual(len(messages), HISTORY_PAGE_SIZE)
+        self.assertEqual(messages[0]["content"], f"message {120 - HISTORY_PAGE_SIZE}")
+        self.assertEqual(messages[-1]["content"], "message 119")
+        self.assertEqual(messages[-1]["sender"], "u1")
+        self.assertIsNotNone(cursor)
+
+    def test_older_pages_until_start(self):
+        seen, cursor = load_history_page(self.room.id)
+        while cursor:
+            messages, cursor = load_history_page(self.room.id, cursor)
+            seen = messages + seen
+
+        self.assertEqual([m["content"] for m in seen], [f"message {i}" for i in range(120)])
+
+    def test_cursor_towards_newer_messages_is_rejected(self):
+        _, cursor = load_history_page(self.room.id)
+        newer = encode_cursor(PREVIOUS, decode_cursor(cursor)[1])
+
+        with self.assertRaises(ValueError):
+            load_history_page(self.room.id, newer)
+
+    def test_page_is_single_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            load_history_page(self.room.id)
+        self.assertEqual(len(queries), 1)
+
+
+# ---------------------------------------------------------------------
+# Websocket protocol
+# ---------------------------------------------------------------------
+class GroupChatConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.room = ChatRoom.objects.create(name="Room", organization=self.org)
+        self.room.members.add(self.user)
+        create_messages(self.room, self.user, HISTORY_PAGE_SIZE + 5)
+
+    def communicator(self):
+        communicator = WebsocketCommunicator(application, f"/ws/group/{self.room.id}/")
+        communicator.scope["user"] = self.user
+        return communicator
+
+    async def test_connect_sends_latest_page_and_loads_older(self):
+        communicator = self.communicator()
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        history = await communicator.receive_json_from()
+        self.assertEqual(history["type"], "history")
+        self.assertEqual(len(history["messages"]), HISTORY_PAGE_SIZE)
+
+        await communicator.send_json_to({"type": "load_older", "before": history["before"]})
+        older = await communicator.receive_json_from()
+        self.assertEqual(older["type"], "older")
+        self.assertEqual(
+            [m["content"] for m in older["messages"]],
+            [f"message {i}" for i in range(5)],
+        )
+        self.assertIsNone(older["before"])
+        await communicator.disconnect()
+
+    async def test_invalid_cursor_reports_error(self):
+        communicator = self.communicator()
+        await communicator.connect()
+        history = await communicator.receive_json_from()
+        newer = encode_cursor(PREVIOUS, decode_cursor(history["before"])[1])
+
+        for before in ("bogus", newer):
+            await communicator.send_json_to({"type": "load_older", "before": before})
+            response = await communicator.receive_json_from()
+            self.assertEqual(response["type"], "error")
+        await communicator.disconnect()
+
+    async def test_message_is_broadcast(self):
+        communicator = self.communicator()
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        await communicator.send_json_to({"message": "hello"})
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["type"], "message")
+        self.assertEqual(response["message"], "hello")
+        self.assertEqual(response["sender_id"], self.user.id)
+        await communicator.disconnect()
+
+    async def test_long_messages(self):
+        communicator = self.communicator()
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        longest = "ї" * MAX_MESSAGE_LENGTH
+        await communicator.send_json_to({"message": longest})
+        self.assertEqual((await communicator.receive_json_from())["message"], longest)
+        await communicator.send_json_to({"message": longest + "ї"})
+        self.assertEqual(await communicator.receive_json_from(), {"type": "error", "error": "message too long"})
+        await communicator.disconnect()
+
+        self.assertTrue(await Message.objects.filter(content=longest).aexists())
+        self.assertFalse(await Message.objects.filter(content=longest + "ї").aexists())
+
+    def test_longest_message_fits_in_a_notify_payload(self):
+        layer = BrokerChannelLayer(broker=PostgresBroker)
+        # control characters are escaped as \uXXXX even with ensure_ascii=False
+        message = {
+            "type": "chat_message", "message": "\x01" * MAX_MESSAGE_LENGTH, "sender": "u" * 150, "sender_id": 2 ** 63,
+        }
+
+        layer._encode({"group": f"private_{2 ** 63}_{2 ** 63}", "message": message})
+
+    @override_settings(CHAT_WRITE_BEHIND=True)
+    async def test_write_behind_saves_on_disconnect(self):
+        communicator = self.communicator()
+        await communicator.connect()
+        await communicator.receive_json_from()
+
+        for i in range(3):
+            await communicator.send_json_to({"message": f"buffered {i}"})
+            response = await communicator.receive_json_from()
+            self.assertEqual(response["message"], f"buffered {i}")
+        await communicator.disconnect()
+
+        self.assertEqual(len(message_buffer), 0)
+        saved = [m async for m in Message.objects.filter(content__startswith="buffered").order_by("id")]
+        self.assertEqual([m.content for m in saved], [f"buffered {i}" for i in range(3)])
+
+
+# ---------------------------------------------------------------------
+# Write-behind buffer
+# ---------------------------------------------------------------------
+class MessageWriteBufferTests(TransactionTestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.room = ChatRoom.objects.create(name="Room", organization=self.org)
+
+    def message(self, content):
+        return Message(sender_id=self.user.id, room_id=self.room.id, content=content)
+
+    def test_full_batch_is_one_insert(self):
+        buffer = MessageWriteBuffer(batch_size=10, interval=60)
+
+        async def send():
+            for i in range(10):
+                buffer.add(self.message(f"m{i}"))
+            await buffer.flush()
+
+        with CaptureQueriesContext(connection) as queries:
+            async_to_sync(send)()
+
+        inserts = [q for q in queries if q["sql"].startswith("INSERT")]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(Message.objects.count(), 10)
+
+    async def test_interval_flushes_partial_batch(self):
+        buffer = MessageWriteBuffer(batch_size=100, interval=0.01)
+        buffer.add(self.message("late"))
+        for _ in range(100):
+            if await Message.objects.filter(content="late").aexists():
+                break
+            await asyncio.sleep(0.01)
+
+        self.assertEqual(len(buffer), 0)
+        self.assertTrue(await Message.objects.filter(content="late").aexists())
+
+    def test_flush_sync_saves_pending(self):
+        buffer = MessageWriteBuffer()
+        buffer._pending.append(self.message("at exit"))
+        buffer.flush_sync()
+
+        self.assertTrue(Message.objects.filter(content="at exit").exists())
+
+    def test_failed_flush_is_saved_by_the_next(self):
+        buffer = MessageWriteBuffer(batch_size=10, interval=60)
+        buffer._pending.append(self.message("retried"))
+
+        with mock.patch.object(Message.objects, "bulk_create", side_effect=DatabaseError), \
+                self.assertLogs("management.chat_buffer", "WARNING"):
+            buffer.flush_sync()
+        self.assertEqual(len(buffer), 1)
+        buffer.flush_sync()
+
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(list(Message.objects.values_list("content", flat=True)), ["retried"])
+
+    def test_retries_are_bounded(self):
+        buffer = MessageWriteBuffer(max_attempts=2)
+        buffer._pending.append(self.message("lost"))
+
+        with mock.patch.object(Message.objects, "bulk_create", side_effect=DatabaseError), \
+                self.assertLogs("management.chat_buffer", "WARNING") as logs:
+            buffer.flush_sync()
+            buffer.flush_sync()
+
+        self.assertEqual(len(buffer), 0)
+        self.assertIn("dropping", logs.output[-1])
@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from management.dashboard import build_dashboard_stats, get_dashboard_stats
+from management.models import Organization, Project, Task, TaskType
+
+User = get_user_model()
+
+
+# ---------------------------------------------------------------------
+# Dashboard statistics service
+# ---------------------------------------------------------------------
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.other_org = Organization.objects.create(name="Other Org")
+        self.user = User.objects.create_user(
+            "u1", "u1@test.com", "12345",
+            first_name="John", last_name="Doe", organization=self.org,
+        )
+        self.other = User.objects.create_user(
+            "u2", "u2@test.com", "12345", organization=self.other_org,
+        )
+        self.type = TaskType.objects.create(name="Bug")
+        self.project = Project.objects.create(name="P1", organization=self.org)
+        self.second_project = Project.objects.create(name="P2", organization=self.org)
+
+        self.create_task("T1", self.project, status="done", priority="urgent")
+        self.create_task("T2", self.project, status="todo", priority="low")
+        self.create_task("T3", self.second_project, status="in_progress", priority="urgent")
+        other_project = Project.objects.create(name="P3", organization=self.other_org)
+        other_task = Task.objects.create(
+            name="Foreign", description="d", project=other_project,
+            type=self.type, organization=self.other_org,
+        )
+        other_task.workers.add(self.other)
+
+    def create_task(self, name, project, **kwargs):
+        task = Task.objects.create(
+            name=name, description="d", project=project,
+            type=self.type, organization=self.org, **kwargs
+        )
+        task.workers.add(self.user)
+        return task
+
+    def test_stats_are_scoped_to_organization(self):
+        stats = build_dashboard_stats(self.org.id)
+
+        self.assertEqual(stats["num_workers"], 1)
+        self.assertEqual(stats["num_tasks"], 3)
+        self.assertEqual(stats["num_tasks_done"], 1)
+        self.assertEqual(stats["num_tasks_todo"], 2)
+        self.assertEqual(
+            [point["y"] for point in stats["priority_counts"]], [2, 0, 1]
+        )
+        self.assertEqual(stats["workers"][0]["tasks_count"], 3)
+        self.assertEqual(stats["workers"][0]["done_tasks_count"], 1)
+
+    def test_stats_filtered_by_project(self):
+        stats = build_dashboard_stats(self.org.id, self.second_project.id)
+
+        self.assertEqual(stats["num_tasks"], 1)
+        self.assertEqual(stats["num_tasks_done"], 0)
+        self.assertEqual(stats["datapoints"], [{"label": "John Doe", "y": "1"}])
+
+    def test_stats_built_with_two_queries(self):
+        with self.assertNumQueries(2):
+            build_dashboard_stats(self.org.id)
+
+    def test_cached_stats_skip_database(self):
+        get_dashboard_stats(self.org.id)
+        with self.assertNumQueries(0):
+            get_dashboard_stats(self.org.id)
+
+    def test_task_change_invalidates_cache(self):
+        self.assertEqual(get_dashboard_stats(self.org.id)["num_tasks"], 3)
+        task = self.create_task("T4", self.project)
+        self.assertEqual(get_dashboard_stats(self.org.id)["num_tasks"], 4)
+
+        task.status = "done"
+        task.save()
+        self.assertEqual(get_dashboard_stats(self.org.id)["num_tasks_done"], 2)
+
+        task.workers.remove(self.user)
+        self.assertEqual(get_dashboard_stats(self.org.id)["workers"][0]["tasks_count"], 3)
+
+    def test_other_organization_cache_untouched(self):
+        get_dashboard_stats(self.other_org.id)
+        self.create_task("T4", self.project)
+        with self.assertNumQueries(0):
+            get_dashboard_stats(self.other_org.id)
+
+    def test_index_uses_organization_stats(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("management:index"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["num_workers"], 1)
+        self.assertEqual(response.context["num_tasks"], 3)
+        self.assertEqual(
+            list(response.context["project_list"]),
+            [self.project, self.second_project],
+        )
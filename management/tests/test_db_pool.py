@@ -0,0 +1,201 @@
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from management.db.pool import ConnectionPool, PoolTimeout
+from management.db.postgresql.base import DatabaseWrapper
+from management.models import ChatRoom, Organization
+
+User = get_user_model()
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+# ---------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------
+class ConnectionPoolTests(SimpleTestCase):
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(FakeConnection, max_size=2)
+
+        first = pool.getconn()
+        pool.putconn(first)
+
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(pool.stats()["connections_created"], 1)
+
+    def test_concurrent_borrowers_never_exceed_max_size(self):
+        pool = ConnectionPool(FakeConnection, max_size=3, timeout=5)
+        errors = []
+
+        def borrow():
+            try:
+                for _ in range(20):
+                    conn = pool.getconn()
+                    time.sleep(0.001)
+                    pool.putconn(conn)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=borrow) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = pool.stats()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(stats["connections_created"], 3)
+        self.assertLessEqual(stats["max_checked_out"], 3)
+        self.assertEqual(stats["checkouts"], 200)
+        self.assertEqual(stats["checked_out"], 0)
+
+    def test_borrowers_wait_for_a_returned_connection(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=5)
+        conn = pool.getconn()
+        borrowed = []
+        thread = threading.Thread(target=lambda: borrowed.append(pool.getconn()))
+        thread.start()
+
+        while not pool.stats()["waits"]:
+            time.sleep(0.001)
+        pool.putconn(conn)
+        thread.join()
+
+        self.assertEqual(borrowed, [conn])
+        self.assertGreater(pool.stats()["wait_time"], 0)
+
+    def test_timeout_when_exhausted(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=0.05)
+        pool.getconn()
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_failed_check_replaces_the_connection(self):
+        pool = ConnectionPool(FakeConnection, check_after=0, check=lambda conn: False)
+        first = pool.getconn()
+        pool.putconn(first)
+
+        second = pool.getconn()
+
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()["failed_checks"], 1)
+
+    def test_recently_used_connections_are_not_checked(self):
+        check = mock.Mock(return_value=True)
+        pool = ConnectionPool(FakeConnection, check_after=30, check=check)
+        pool.putconn(pool.getconn())
+
+        pool.getconn()
+
+        check.assert_not_called()
+
+    def test_idle_connections_are_reaped_down_to_min_size(self):
+        pool = ConnectionPool(FakeConnection, max_size=3, min_size=1, max_idle=0)
+        conns = [pool.getconn() for _ in range(3)]
+        for conn in conns:
+            pool.putconn(conn)
+
+        pool.reap()
+
+        self.assertEqual(pool.stats()["size"], 1)
+        self.assertEqual(sum(conn.closed for conn in conns), 2)
+
+    def test_old_connections_are_not_returned(self):
+        pool = ConnectionPool(FakeConnection, max_lifetime=0)
+        conn = pool.getconn()
+
+        pool.putconn(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_connections_that_fail_reset_are_discarded(self):
+        pool = ConnectionPool(FakeConnection, reset=lambda conn: False)
+        conn = pool.getconn()
+
+        pool.putconn(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()["connections_closed"], 1)
+
+    def test_failed_connect_frees_its_slot(self):
+        pool = ConnectionPool(mock.Mock(side_effect=OSError), max_size=1, timeout=0.05)
+
+        for _ in range(2):
+            with self.assertRaises(OSError):
+                pool.getconn()
+
+        self.assertEqual(pool.stats()["size"], 0)
+
+
+# ---------------------------------------------------------------------
+# PostgreSQL backend on top of the pool
+# ---------------------------------------------------------------------
+class PooledBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = mock.Mock()
+        patcher = mock.patch.object(DatabaseWrapper, "pool", self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.wrapper = DatabaseWrapper({
+            "NAME": "taskhive", "USER": "", "PASSWORD": "", "HOST": "", "PORT": "",
+            "OPTIONS": {}, "TIME_ZONE": None, "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False,
+            "AUTOCOMMIT": True, "ATOMIC_REQUESTS": False,
+        })
+
+    def test_new_connections_come_from_the_pool(self):
+        self.assertIs(self.wrapper.get_new_connection({}), self.pool.getconn.return_value)
+
+    def test_pool_timeouts_are_operational_errors(self):
+        self.pool.getconn.side_effect = PoolTimeout("busy")
+
+        with self.assertRaises(self.wrapper.Database.OperationalError):
+            self.wrapper.get_new_connection({})
+
+    def test_close_returns_the_connection(self):
+        conn = self.wrapper.connection = mock.Mock()
+
+        self.wrapper._close()
+
+        self.pool.putconn.assert_called_once_with(conn, discard=False)
+        conn.close.assert_not_called()
+
+    def test_connections_with_errors_are_discarded(self):
+        conn = self.wrapper.connection = mock.Mock()
+        self.wrapper.errors_occurred = True
+
+        self.wrapper._close()
+
+        self.pool.putconn.assert_called_once_with(conn, discard=True)
+
+
+# ---------------------------------------------------------------------
+# Load test command
+# ---------------------------------------------------------------------
+class LoadtestCommandTests(TransactionTestCase):
+    def test_runs_without_a_pool(self):
+        org = Organization.objects.create(name="Org")
+        User.objects.create_user("u1", "u1@test.com", "12345", organization=org)
+        out = StringIO()
+
+        call_command("loadtest_db_pool", http_clients=1, ws_clients=2, duration=0.3, stdout=out)
+
+        self.assertIn("websocket messages, 0 errors", out.getvalue())
+        self.assertIn("No connection pool", out.getvalue())
+        self.assertFalse(ChatRoom.objects.exists())
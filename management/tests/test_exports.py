@@ -0,0 +1,180 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from management import exports
+from management.models import ChatRoom, Comment, Message, Organization, Project, Task, TaskType
+
+User = get_user_model()
+
+
+def export_url(kind, **params):
+    url = reverse("management:export", args=[kind])
+    return url + ("?" + "&".join(f"{key}={value}" for key, value in params.items()) if params else "")
+
+
+def selects(queries):
+    """SELECT statements outside of the cache table."""
+    return [
+        query["sql"] for query in queries
+        if query["sql"].startswith("SELECT") and "taskhive_cache" not in query["sql"]
+    ]
+
+
+class ExportTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.worker = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        project = Project.objects.create(name="Website", organization=self.org)
+        task_type = TaskType.objects.create(name="Bug")
+        self.tasks = Task.objects.bulk_create(
+            Task(name=f"Task {i}", description="d", type=task_type, project=project, organization=self.org)
+            for i in range(7)
+        )
+        Task.workers.through.objects.bulk_create(
+            Task.workers.through(task_id=task.id, worker_id=worker.id)
+            for task in self.tasks for worker in (self.user, self.worker)
+        )
+        Comment.objects.create(worker=self.user, task=self.tasks[0], text='Says "hi", twice', organization=self.org)
+        self.room = ChatRoom.objects.create(name="General", organization=self.org)
+        self.room.members.add(self.user)
+        for text in ("first", "second"):
+            Message.objects.create(sender=self.user, content=text, room=self.room)
+        hidden = ChatRoom.objects.create(name="Hidden", organization=self.org)
+        Message.objects.create(sender=self.worker, content="secret", room=hidden)
+
+        other_org = Organization.objects.create(name="Other")
+        Task.objects.create(name="Theirs", description="d", type=task_type, project=project, organization=other_org)
+
+
+# ---------------------------------------------------------------------
+# Row streams
+# ---------------------------------------------------------------------
+class ExportStreamTests(ExportTestCase):
+    def rows(self, kind, **filters):
+        return list(csv.DictReader(io.StringIO(b"".join(exports.export_stream(kind, self.org.id, **filters)).decode())))
+
+    def test_tasks_with_assignees(self):
+        rows = self.rows("tasks")
+
+        self.assertEqual([row["name"] for row in rows], [f"Task {i}" for i in range(7)])
+        self.assertEqual(rows[0]["assignees"], "u1;u2")
+        self.assertEqual(rows[0]["project__name"], "Website")
+
+    def test_assignees_take_one_query_per_chunk(self):
+        with CaptureQueriesContext(connection) as queries:
+            chunks = list(exports.export_chunks("tasks", self.org.id, chunk_size=3))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        # the tasks come from one cursor, plus a query for the workers of each chunk
+        self.assertEqual(len(selects(queries)), 1 + 3)
+
+    def test_comments_are_quoted(self):
+        self.assertEqual(self.rows("comments")[0]["text"], 'Says "hi", twice')
+
+    def test_messages_of_the_members_rooms(self):
+        self.assertEqual(len(self.rows("messages")), 3)
+        rows = self.rows("messages", worker_id=self.user.id)
+        self.assertEqual([row["content"] for row in rows], ["first", "second"])
+
+    def test_header_comes_before_any_query(self):
+        stream = exports.export_stream("tasks", self.org.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            header = next(stream)
+
+        self.assertTrue(header.startswith(b"id,name,"))
+        self.assertEqual(selects(queries), [])
+
+    def test_jsonl(self):
+        lines = b"".join(exports.export_stream("tasks", self.org.id, "jsonl")).decode().splitlines()
+
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[0])["assignees"], ["u1", "u2"])
+
+    def test_gzip_flushes_every_chunk(self):
+        pieces = list(exports.export_stream("tasks", self.org.id, compress=True, chunk_size=3))
+
+        # header, three chunks and the gzip trailer
+        self.assertEqual(len(pieces), 5)
+        decompressed = gzip.decompress(b"".join(pieces)).decode()
+        self.assertEqual(len(decompressed.splitlines()), 8)
+
+
+# ---------------------------------------------------------------------
+# Export endpoint and command
+# ---------------------------------------------------------------------
+class ExportViewTests(ExportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_csv_download(self):
+        response = self.client.get(export_url("tasks"))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn('filename="tasks.csv"', response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("Task 6", content)
+        self.assertNotIn("Theirs", content)
+
+    def test_gzipped_jsonl(self):
+        response = self.client.get(export_url("comments", format="jsonl", gzip=1))
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        line = gzip.decompress(b"".join(response.streaming_content)).decode()
+        self.assertEqual(json.loads(line)["worker__username"], "u1")
+
+    def test_messages_of_one_room(self):
+        response = self.client.get(export_url("messages", room=self.room.id))
+
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("second", content)
+        self.assertNotIn("secret", content)
+
+    def test_unknown_kind_or_format(self):
+        self.assertEqual(self.client.get(export_url("workers")).status_code, 404)
+        self.assertEqual(self.client.get(export_url("tasks", format="xml")).status_code, 404)
+
+    def test_login_required(self):
+        self.client.logout()
+
+        self.assertEqual(self.client.get(export_url("tasks")).status_code, 302)
+
+
+class AsyncExportViewTests(ExportTestCase):
+    async def test_streams_asynchronously_under_asgi(self):
+        await sync_to_async(self.client.force_login)(self.user)
+        self.async_client.cookies = self.client.cookies
+
+        response = await self.async_client.get(export_url("tasks"))
+
+        self.assertTrue(response.is_async)
+        content = b"".join([piece async for piece in response.streaming_content]).decode()
+        self.assertIn("Task 6", content)
+
+
+class ExportCommandTests(ExportTestCase):
+    def test_writes_the_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tasks.jsonl.gz")
+
+            call_command("export_data", "tasks", organization="Org", format="jsonl", gzip=True, output=path)
+
+            with gzip.open(path, "rt") as exported:
+                self.assertEqual(len(exported.readlines()), 7)
@@ -95,6 +95,19 @@ class ProjectFormTests(TestCase):
 
         self.assertTrue(form.is_valid())
 
+    def test_team_labels_render_with_one_query(self):
+        org = Organization.objects.create(name="Test Org")
+        worker = User.objects.create_user("w1", "w1@test.com", "12345", organization=org)
+        for i in range(20):
+            Team.objects.create(name=f"Team {i}", organization=org).workers.add(worker)
+
+        form = ProjectForm()
+        with self.assertNumQueries(1):
+            html = form["teams"].as_widget()
+            len(form.fields["teams"].choices)
+
+        self.assertIn("Team 0: (1 workers)", html)
+
 
 # ---------------------------------------------------------------------
 # ChatGroup Form
@@ -106,6 +119,38 @@ class ChatGroupFormTests(TestCase):
 
         self.assertTrue(form.is_valid())
 
+    def test_members_are_validated_with_one_query(self):
+        org = Organization.objects.create(name="Org")
+        members = [User.objects.create(username=f"w{i}", organization=org) for i in range(5)]
+        form = ChatGroupForm(data={"name": "Group A", "members": [m.id for m in members]}, organization_id=org.id)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+
+        self.assertEqual(set(form.cleaned_data["members"]), set(members))
+
+    def test_members_of_other_organizations_are_rejected(self):
+        org = Organization.objects.create(name="Org")
+        stranger = User.objects.create(username="stranger", organization=Organization.objects.create(name="Other"))
+
+        form = ChatGroupForm(data={"name": "Group A", "members": [stranger.id]}, organization_id=org.id)
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("members", form.errors)
+
+    def test_widget_renders_only_selected_members(self):
+        org = Organization.objects.create(name="Org")
+        chosen = User.objects.create(username="chosen", first_name="Chosen", last_name="One", organization=org)
+        User.objects.bulk_create(User(username=f"w{i}", organization=org) for i in range(30))
+        form = ChatGroupForm(data={"name": "Group A", "members": [chosen.id]}, organization_id=org.id)
+
+        with self.assertNumQueries(1):
+            html = form["members"].as_widget()
+
+        self.assertEqual(html.count("<option"), 1)
+        self.assertIn("Chosen One (chosen)", html)
+        self.assertIn("data-autocomplete-url", html)
+
 
 # ---------------------------------------------------------------------
 # Task Form
@@ -189,6 +234,28 @@ class TaskFormTests(TestCase):
 
         self.assertEqual(task.type, self.type)
 
+    def test_project_labels_render_with_two_queries(self):
+        team = Team.objects.create(name="Backend", organization=self.org)
+        for i in range(20):
+            Project.objects.create(name=f"Project {i}", organization=self.org).teams.add(team)
+
+        form = TaskForm(organization_id=self.org.id)
+        with self.assertNumQueries(2):
+            # projects, then their teams in one prefetch
+            html = form["project"].as_widget()
+            form["project"].as_widget()
+
+        self.assertIn("Project 0 - (Backend)", html)
+
+    def test_projects_of_other_organizations_are_not_offered(self):
+        other = Organization.objects.create(name="Other")
+        Project.objects.create(name="Theirs", organization=other)
+
+        form = TaskForm(organization_id=self.org.id)
+
+        self.assertNotIn("Theirs", form["project"].as_widget())
+        self.assertIn(self.project.name, form["project"].as_widget())
+
 # ---------------------------------------------------------------------
 # Team Form
 # ---------------------------------------------------------------------
@@ -200,6 +267,29 @@ class TeamFormTests(TestCase):
         })
         self.assertTrue(form.is_valid())
 
+    def test_project_labels_render_with_two_queries(self):
+        org = Organization.objects.create(name="Test Org")
+        team = Team.objects.create(name="Backend", organization=org)
+        for i in range(20):
+            Project.objects.create(name=f"Project {i}", organization=org).teams.add(team)
+
+        form = TeamForm()
+        with self.assertNumQueries(2):
+            # projects, then their teams in one prefetch
+            html = form["project"].as_widget()
+            form["project"].as_widget()
+
+        self.assertIn("Project 0 - (Backend)", html)
+
+    def test_forms_do_not_share_choices(self):
+        first = TeamForm()
+        list(first.fields["project"].choices)
+        Project.objects.create(name="Added later")
+
+        second = TeamForm()
+
+        self.assertIn("Added later", second["project"].as_widget())
+
 # ---------------------------------------------------------------------
 # Comment Form
 # ---------------------------------------------------------------------
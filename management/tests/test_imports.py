@@ -0,0 +1,157 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from management import exports, imports
+from management.caching import org_version
+from management.models import Organization, Project, SearchDocument, Task, TaskType
+
+User = get_user_model()
+
+IMPORT = reverse("management:task-import")
+
+CSV = """name,description,status,priority,deadline,is_completed,project,type,workers
+Write docs,Start with the API,in_progress,low,2025-03-01,no,Website,Docs,u1;u2
+Fix login,,todo,,2025-03-02T09:30:00,yes,Website,Bug,
+Ship it,,finished,,,,Website,Bug,
+Plan,,,,,,Nowhere,Bug,
+Review,,,,,,Website,Bug,ghost
+"""
+
+
+def csv_rows(text):
+    return imports.read_rows(io.StringIO(text), "csv")
+
+
+def selects(queries, table):
+    return [query["sql"] for query in queries if query["sql"].startswith("SELECT") and f'"{table}"' in query["sql"]]
+
+
+class ImportTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.worker = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        self.project = Project.objects.create(name="Website", organization=self.org)
+        self.bug = TaskType.objects.create(name="Bug")
+        other_org = Organization.objects.create(name="Other")
+        Project.objects.create(name="Nowhere", organization=other_org)
+        User.objects.create_user("ghost", "ghost@test.com", "12345", organization=other_org)
+
+
+# ---------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------
+class ImportTests(ImportTestCase):
+    def test_valid_rows_are_created_and_the_rest_reported(self):
+        result = imports.import_tasks(self.org.id, csv_rows(CSV))
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([line for line, _ in result.errors], [4, 5, 6])
+        self.assertIn("status", result.errors[0][1])
+        self.assertIn("project", result.errors[1][1])
+        self.assertIn("ghost", result.errors[2][1])
+
+        docs = Task.objects.get(name="Write docs")
+        self.assertEqual(docs.organization_id, self.org.id)
+        self.assertEqual((docs.status, docs.priority, docs.is_completed), ("in_progress", "low", False))
+        self.assertEqual(docs.type.name, "Docs")
+        self.assertEqual(sorted(docs.workers.values_list("username", flat=True)), ["u1", "u2"])
+        login = Task.objects.get(name="Fix login")
+        self.assertEqual((login.type_id, login.is_completed, login.deadline.hour), (self.bug.id, True, 9))
+
+    def test_lookups_are_one_query_each_per_batch(self):
+        rows = "".join(f"Task {i},,,,,,Website,Type {i % 3},u{i % 2 + 1}\n" for i in range(10))
+        text = "name,description,status,priority,deadline,is_completed,project,type,workers\n" + rows
+
+        with CaptureQueriesContext(connection) as queries:
+            result = imports.import_tasks(self.org.id, csv_rows(text), batch_size=4)
+
+        self.assertEqual(result.created, 10)
+        # names already looked up are remembered across the three batches
+        self.assertEqual(len(selects(queries, "management_project")), 1)
+        self.assertEqual(len(selects(queries, "management_worker")), 1)
+        self.assertEqual(len(selects(queries, "management_tasktype")), 1)
+        inserts = [query["sql"] for query in queries if query["sql"].startswith('INSERT INTO "management_task"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(TaskType.objects.filter(name__startswith="Type").count(), 3)
+
+    def test_caches_board_and_search_are_updated(self):
+        dashboard = org_version("dashboard", self.org.id)
+        board = org_version("board", self.org.id)
+        with mock.patch("management.imports.invalidate_calendar") as invalidate_calendar, \
+                self.captureOnCommitCallbacks(execute=True):
+            imports.import_tasks(self.org.id, csv_rows(CSV))
+
+        self.assertNotEqual(org_version("dashboard", self.org.id), dashboard)
+        # once for the whole import
+        self.assertEqual(org_version("board", self.org.id), board + 1)
+        self.assertEqual(sorted(invalidate_calendar.call_args.args), [self.user.id, self.worker.id])
+        self.assertEqual(SearchDocument.objects.filter(kind=SearchDocument.Kind.task).count(), 2)
+
+    def test_json_formats(self):
+        jsonl = '{"name": "One", "project": "Website", "type": "Bug", "workers": ["u1"], "is_completed": true}\nnot json\n'
+        result = imports.import_tasks(self.org.id, imports.read_rows(io.StringIO(jsonl), "jsonl"))
+        self.assertEqual((result.created, result.errors[0][0]), (1, 2))
+
+        array = '[{"name": "Two", "project": "Website", "type": "Bug"}, "three"]'
+        result = imports.import_tasks(self.org.id, imports.read_rows(io.StringIO(array), "json"))
+        self.assertEqual((result.created, [line for line, _ in result.errors]), (1, [2]))
+
+    def test_exports_import_again(self):
+        imports.import_tasks(self.org.id, csv_rows(CSV))
+        exported = b"".join(exports.export_stream("tasks", self.org.id)).decode()
+        Task.objects.all().delete()
+
+        result = imports.import_tasks(self.org.id, csv_rows(exported))
+
+        self.assertEqual((result.created, result.errors), (2, []))
+        self.assertEqual(Task.objects.get(name="Write docs").workers.count(), 2)
+
+
+# ---------------------------------------------------------------------
+# Upload view and command
+# ---------------------------------------------------------------------
+class ImportViewTests(ImportTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_upload(self):
+        upload = SimpleUploadedFile("tasks.csv", ("﻿" + CSV).encode())
+
+        response = self.client.post(IMPORT, {"file": upload})
+
+        self.assertContains(response, "Imported 2 tasks")
+        self.assertContains(response, "Line 6: workers: no workers named ghost.")
+        self.assertEqual(Task.objects.filter(organization=self.org).count(), 2)
+
+    def test_form(self):
+        self.assertContains(self.client.get(IMPORT), 'enctype="multipart/form-data"')
+        self.assertEqual(self.client.post(IMPORT).status_code, 200)
+        self.assertFalse(Task.objects.exists())
+
+
+class ImportCommandTests(ImportTestCase):
+    def test_imports_the_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tasks.csv")
+            with open(path, "w") as file:
+                file.write(CSV)
+            out, err = io.StringIO(), io.StringIO()
+
+            call_command("import_tasks", path, organization=str(self.org.id), stdout=out, stderr=err)
+
+        self.assertIn("Imported 2 tasks, skipped 3 rows", out.getvalue())
+        self.assertIn("line 5: project", err.getvalue())
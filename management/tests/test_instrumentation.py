@@ -0,0 +1,136 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template.backends.django import Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from management.middleware import instrumentation
+from management.middleware.instrumentation import (
+    QueryInstrumentationMiddleware, RequestStats, RollingSummary, _timed_render, summary,
+)
+from management.models import ChatRoom, Comment, Organization, Project, Task, TaskType, Team
+from management.tests.query_budget import QueryBudgetMixin
+
+User = get_user_model()
+
+
+def seed(org, user, count):
+    task_type = TaskType.objects.create(name="Bug")
+    project = Project.objects.create(name="Project", organization=org)
+    team = Team.objects.create(name="Team", organization=org)
+    team.workers.add(user)
+    project.teams.add(team)
+    for i in range(count):
+        author = User.objects.create(username=f"author{i}", email=f"a{i}@test.com", organization=org)
+        task = Task.objects.create(
+            name=f"Task {i}", description="d", project=project, type=task_type, organization=org,
+        )
+        task.workers.add(user, author)
+        Comment.objects.create(worker=author, task=task, text="comment", organization=org)
+        room = ChatRoom.objects.create(name=f"Room {i}", organization=org)
+        room.members.add(user, author)
+    return project
+
+
+# ---------------------------------------------------------------------
+# Server-Timing and the rolling summary
+# ---------------------------------------------------------------------
+class InstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.client.force_login(self.user)
+
+    def test_no_server_timing_for_regular_users(self):
+        response = self.client.get(reverse("management:task-list"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_server_timing_for_staff(self):
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(reverse("management:task-list"))
+
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertRegex(timing, r"tpl;dur=[\d.]+")
+        self.assertRegex(timing, r"total;dur=[\d.]+")
+        self.assertNotIn("\n", timing)
+
+    def test_summary_is_kept_per_view_name(self):
+        self.client.get(reverse("management:team-list"))
+        self.client.get(reverse("management:team-list"))
+
+        stats = summary.summary()["management:team-list"]
+        self.assertGreaterEqual(stats["requests"], 2)
+        self.assertGreater(stats["queries_max"], 0)
+        self.assertTrue(stats["slowest_sql"])
+
+
+class InstrumentationSetupTests(SimpleTestCase):
+    def test_template_timing_is_installed_by_the_middleware(self):
+        # as before any middleware was set up
+        render = instrumentation._original_render or Template.render
+        with mock.patch.object(Template, "render", render):
+            with override_settings(INSTRUMENTATION_TEMPLATE_TIMING=False):
+                QueryInstrumentationMiddleware(lambda request: None)
+            self.assertIs(Template.render, render)
+
+            QueryInstrumentationMiddleware(lambda request: None)
+            QueryInstrumentationMiddleware(lambda request: None)
+            self.assertIs(Template.render, _timed_render)
+
+    def test_summary_is_written_off_the_request_thread(self):
+        rolling = RollingSummary(interval=0)
+        threads = []
+        with mock.patch.object(rolling, "write", side_effect=lambda: threads.append(threading.current_thread())):
+            rolling.add("view", RequestStats())
+            rolling._writer.join()
+
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+
+# ---------------------------------------------------------------------
+# Query budgets of the main views
+# ---------------------------------------------------------------------
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    query_budgets = {
+        "management:index": 12,
+        "management:task-list": 10,
+        "management:project-list": 10,
+        "management:project-detail": 12,
+        "management:team-list": 10,
+        "management:comment-list": 10,
+        "management:chat-list": 10,
+    }
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.project = seed(self.org, self.user, 15)
+        self.client.force_login(self.user)
+
+    def test_views_stay_within_budget(self):
+        for url in [
+            reverse("management:index"),
+            reverse("management:task-list"),
+            reverse("management:project-list"),
+            reverse("management:project-detail", kwargs={"pk": self.project.id}),
+            reverse("management:team-list"),
+            reverse("management:comment-list"),
+            reverse("management:chat-list"),
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_over_budget_fails(self):
+        self.query_budgets = {"management:task-list": 1}
+        with self.assertRaisesMessage(AssertionError, "over its budget of 1"):
+            self.client.get(reverse("management:task-list"))
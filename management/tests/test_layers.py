@@ -0,0 +1,248 @@
+import asyncio
+import multiprocessing
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import psycopg2
+from django.test import SimpleTestCase
+
+from management.layers import BrokerChannelLayer, MessageTooLarge, PostgresBroker, SocketHub
+
+NUM_MESSAGES = 2000
+
+# far below what a loaded CI machine manages, but a lock or a sleep on the send path falls under it
+MIN_MESSAGES_PER_SECOND = 200
+
+
+def make_layer(port, **config):
+    return BrokerChannelLayer(
+        broker="management.layers.SocketBroker",
+        broker_options={"port": port},
+        **config,
+    )
+
+
+def receive_group(port, group, count, ready, results):
+    """Joins a group in a separate process and reports what it received."""
+    async def main():
+        layer = make_layer(port, capacity=count)
+        channel = await layer.new_channel()
+        await layer.group_add(group, channel)
+        layer._ensure_started()
+        ready.set()
+        received = []
+        while len(received) < count:
+            received.append(await layer.receive(channel))
+        results.put([m["n"] for m in received])
+        await layer.close()
+
+    asyncio.run(main())
+
+
+# ---------------------------------------------------------------------
+# Delivery between layers
+# ---------------------------------------------------------------------
+class BrokerChannelLayerTests(SimpleTestCase):
+    def setUp(self):
+        self.hub = SocketHub(port=0).start_in_thread()
+        self.addCleanup(self.hub.stop)
+
+    def layers(self, **config):
+        first, second = make_layer(self.hub.port, **config), make_layer(self.hub.port, **config)
+        first._ensure_started()
+        second._ensure_started()
+        return first, second
+
+    async def wait_for_clients(self, count):
+        while len(self.hub.clients) < count:
+            await asyncio.sleep(0.01)
+
+    async def test_group_send_reaches_other_layer(self):
+        first, second = self.layers()
+        await self.wait_for_clients(2)
+        local = await first.new_channel()
+        remote = await second.new_channel()
+        await first.group_add("room", local)
+        await second.group_add("room", remote)
+
+        await first.group_send("room", {"type": "chat.message", "text": "hi"})
+
+        self.assertEqual((await asyncio.wait_for(first.receive(local), 1))["text"], "hi")
+        self.assertEqual((await asyncio.wait_for(second.receive(remote), 1))["text"], "hi")
+        await first.close()
+        await second.close()
+
+    async def test_send_to_channel_of_other_layer(self):
+        first, second = self.layers()
+        await self.wait_for_clients(2)
+        channel = await second.new_channel()
+
+        await first.send(channel, {"type": "ping"})
+
+        self.assertEqual(await asyncio.wait_for(second.receive(channel), 1), {"type": "ping"})
+        await first.close()
+        await second.close()
+
+    async def test_discarded_channel_gets_nothing(self):
+        first, second = self.layers()
+        await self.wait_for_clients(2)
+        channel = await second.new_channel()
+        await second.group_add("room", channel)
+        await second.group_discard("room", channel)
+
+        await first.group_send("room", {"type": "ping"})
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(second.receive(channel), 0.2)
+        await first.close()
+        await second.close()
+
+    async def test_publish_reconnects_a_dead_socket(self):
+        first, second = self.layers()
+        await self.wait_for_clients(2)
+        channel = await second.new_channel()
+        await second.group_add("room", channel)
+        first.broker._sock.close()
+
+        with self.assertLogs("management.layers", "WARNING"):
+            await first.group_send("room", {"type": "ping"})
+
+        self.assertEqual(await asyncio.wait_for(second.receive(channel), 1), {"type": "ping"})
+        await first.close()
+        await second.close()
+
+
+# ---------------------------------------------------------------------
+# Postgres listener
+# ---------------------------------------------------------------------
+class FakeListener:
+    """A LISTEN connection whose poll() fails or yields one notification."""
+
+    def __init__(self, payload=None):
+        self.reader, self.writer = socket.socketpair()
+        self.writer.send(b"x")
+        self.payload = payload
+        self.notifies = []
+        self.statements = []
+        self.closed = False
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def cursor(self):
+        listener = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def execute(self, sql):
+                listener.statements.append(sql)
+
+        return Cursor()
+
+    def poll(self):
+        if self.payload is None:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        self.reader.recv(1)
+        self.notifies.append(SimpleNamespace(payload=self.payload))
+        self.payload = b""
+
+    def close(self):
+        self.closed = True
+        self.reader.close()
+        self.writer.close()
+
+
+class PostgresBrokerTests(SimpleTestCase):
+    def test_listener_reconnects_and_listens_again(self):
+        listeners = [FakeListener(), FakeListener(payload="hello")]
+        broker = PostgresBroker(poll_interval=0.05, reconnect_delay=0.01)
+        connections = iter(listeners)
+        broker._connect = lambda: next(connections)
+        received = threading.Event()
+
+        with self.assertLogs("management.layers", "WARNING") as logs:
+            broker.start(lambda payload: payload == "hello" and received.set())
+            self.assertTrue(received.wait(5))
+        broker.stop()
+        broker._thread.join(5)
+
+        self.assertIn("lost its connection", logs.output[0])
+        self.assertTrue(listeners[0].closed)
+        self.assertEqual([listener.statements for listener in listeners], [['LISTEN "taskhive_layer"']] * 2)
+
+    def notifying_layer(self):
+        layer = BrokerChannelLayer(broker=PostgresBroker)
+        layer._started = True
+        notified = []
+        layer.broker._notify = notified.append
+        return layer, notified
+
+    async def test_long_non_ascii_message_is_sent_as_utf8(self):
+        layer, notified = self.notifying_layer()
+        # 4200 bytes as UTF-8, 12600 as \uXXXX escapes
+        text = "привіт " * 300
+
+        await layer.group_send("room", {"type": "chat.message", "text": text})
+
+        self.assertEqual(len(notified), 1)
+        self.assertLess(len(notified[0].encode()), PostgresBroker.MAX_PAYLOAD)
+        self.assertIn(text, notified[0])
+
+    async def test_too_large_message_reaches_nobody(self):
+        layer, notified = self.notifying_layer()
+        channel = await layer.new_channel()
+        await layer.group_add("room", channel)
+
+        with self.assertRaises(MessageTooLarge):
+            await layer.group_send("room", {"type": "chat.message", "text": "привіт " * 1000})
+
+        self.assertEqual(notified, [])
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive(channel), 0.1)
+
+
+# ---------------------------------------------------------------------
+# Two consumer processes in one group
+# ---------------------------------------------------------------------
+class MultiProcessGroupTests(SimpleTestCase):
+    def test_group_delivery_and_throughput(self):
+        hub = SocketHub(port=0).start_in_thread()
+        self.addCleanup(hub.stop)
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = []
+        for _ in range(2):
+            ready = context.Event()
+            process = context.Process(
+                target=receive_group,
+                args=(hub.port, "room", NUM_MESSAGES, ready, results),
+            )
+            process.start()
+            self.addCleanup(process.kill)
+            self.assertTrue(ready.wait(30))
+            processes.append(process)
+
+        async def send_all():
+            layer = make_layer(hub.port)
+            layer._ensure_started()
+            while len(hub.clients) < 3:
+                await asyncio.sleep(0.01)
+            for n in range(NUM_MESSAGES):
+                await layer.group_send("room", {"type": "chat.message", "n": n})
+            await layer.close()
+
+        start = time.perf_counter()
+        asyncio.run(send_all())
+        for _ in processes:
+            self.assertEqual(results.get(timeout=30), list(range(NUM_MESSAGES)))
+        rate = NUM_MESSAGES / (time.perf_counter() - start)
+        self.assertGreater(rate, MIN_MESSAGES_PER_SECOND, f"{rate:.0f} messages/s to two processes")
+        for process in processes:
+            process.join(10)
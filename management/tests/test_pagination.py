@@ -0,0 +1,153 @@
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from management.models import ChatRoom, Comment, Message, Organization, Project, Task, TaskType
+from management.pagination import CursorPaginator, decode_cursor, encode_cursor
+
+User = get_user_model()
+COMMENTS = reverse("management:comment-list")
+CHATROOMS = reverse("management:chat-list")
+
+
+# ---------------------------------------------------------------------
+# Cursor tokens
+# ---------------------------------------------------------------------
+class CursorTokenTests(TestCase):
+    def test_round_trip(self):
+        moment = timezone.now()
+        token = encode_cursor("n", [moment, None, 5, "text"])
+        self.assertEqual(decode_cursor(token), ("n", [moment, None, 5, "text"]))
+
+    def test_invalid_token(self):
+        for token in ["garbage", encode_cursor("x", [1]), "W10"]:
+            with self.assertRaises(ValueError):
+                decode_cursor(token)
+
+
+# ---------------------------------------------------------------------
+# CursorPaginator
+# ---------------------------------------------------------------------
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.project = Project.objects.create(name="P1", organization=self.org)
+        self.task = Task.objects.create(
+            name="Task", description="d", project=self.project,
+            type=TaskType.objects.create(name="Bug"), organization=self.org,
+        )
+        comments = Comment.objects.bulk_create(
+            Comment(worker=self.user, task=self.task, text=str(i), organization=self.org)
+            for i in range(25)
+        )
+        # several comments share a timestamp, the id breaks the tie
+        base = timezone.now()
+        for i, comment in enumerate(comments):
+            comment.created_at = base - timedelta(minutes=i // 3)
+        Comment.objects.bulk_update(comments, ["created_at"])
+        self.expected = list(Comment.objects.order_by("-created_at", "-id"))
+
+    def walk_forward(self, paginator):
+        seen, page = [], paginator.page()
+        pages = [page]
+        seen += page.object_list
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pages.append(page)
+            seen += page.object_list
+        return seen, pages
+
+    def test_walks_all_rows_in_order(self):
+        paginator = CursorPaginator(Comment.objects.all(), 10, ("-created_at", "-id"))
+        seen, pages = self.walk_forward(paginator)
+
+        self.assertEqual(seen, self.expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        self.assertFalse(pages[0].has_previous())
+
+    def test_previous_pages_mirror_next_pages(self):
+        paginator = CursorPaginator(Comment.objects.all(), 10, ("-created_at", "-id"))
+        _, pages = self.walk_forward(paginator)
+
+        previous = paginator.page(pages[2].previous_cursor)
+        self.assertEqual(previous.object_list, pages[1].object_list)
+        first = paginator.page(previous.previous_cursor)
+        self.assertEqual(first.object_list, pages[0].object_list)
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+    def test_page_runs_single_query(self):
+        paginator = CursorPaginator(Comment.objects.all(), 10, ("-created_at", "-id"))
+        page = paginator.page()
+        with CaptureQueriesContext(connection) as queries:
+            paginator.page(page.next_cursor)
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("COUNT", queries[0]["sql"].upper())
+        self.assertNotIn("OFFSET", queries[0]["sql"].upper())
+
+    def test_async_pages_match_sync_pages(self):
+        paginator = CursorPaginator(Comment.objects.all(), 10, ("-created_at", "-id"))
+        _, pages = self.walk_forward(paginator)
+
+        page = async_to_sync(paginator.apage)(pages[0].next_cursor)
+
+        self.assertEqual(page.object_list, pages[1].object_list)
+        self.assertEqual(page.next_cursor, pages[1].next_cursor)
+
+
+# ---------------------------------------------------------------------
+# Cursor pagination in list views
+# ---------------------------------------------------------------------
+class CursorPaginatedViewTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.other = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        self.client.force_login(self.user)
+
+    def test_chat_list_pages_rooms_without_messages_last(self):
+        rooms = ChatRoom.objects.bulk_create(
+            ChatRoom(name=f"Room {i}", organization=self.org) for i in range(15)
+        )
+        for room in rooms:
+            room.members.add(self.user)
+        for room in rooms[:8]:
+            Message.objects.create(sender=self.other, content="hi", room=room)
+
+        first = self.client.get(CHATROOMS)
+        page = first.context["page_obj"]
+        self.assertTrue(first.context["is_paginated"])
+        second = self.client.get(CHATROOMS, {"cursor": page.next_cursor})
+
+        listed = list(first.context["chat_list"]) + list(second.context["chat_list"])
+        self.assertEqual(len(listed), 15)
+        self.assertEqual(len(set(listed)), 15)
+        self.assertEqual(set(listed[:8]), set(rooms[:8]))
+        self.assertEqual([room.id for room in listed[8:]], [room.id for room in rooms[8:]])
+        self.assertFalse(second.context["page_obj"].has_next())
+
+    def test_cursor_link_keeps_search_query(self):
+        project = Project.objects.create(name="P1", organization=self.org)
+        task = Task.objects.create(
+            name="Task", description="d", project=project,
+            type=TaskType.objects.create(name="Bug"), organization=self.org,
+        )
+        task.workers.add(self.user)
+        for i in range(15):
+            Comment.objects.create(worker=self.other, task=task, text=str(i), organization=self.org)
+
+        response = self.client.get(COMMENTS, {"query": "u2", "page": "3"})
+        cursor = response.context["page_obj"].next_cursor
+        self.assertContains(response, f"?query=u2&amp;cursor={cursor}")
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(COMMENTS, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,141 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+
+from management.consumers import history_queryset
+from management.lookups import worker_lookup_queryset
+from management.models import (
+    ChatRoom, Comment, Message, Organization, Project, Task, TaskType,
+)
+from management.views import ChatRoomListView, CommentListView, TaskListView
+
+User = get_user_model()
+
+NUM_ORGANIZATIONS = 5
+WORKERS_PER_ORGANIZATION = 20
+NUM_TASKS = 3000
+COMMENTS_PER_TASK = 2
+NUM_ROOMS = 100
+NUM_MESSAGES = 10000
+
+
+def sequential_scans(queryset):
+    """Returns the tables the database plans to read in full for a queryset."""
+    plan = queryset.explain()
+    if connection.vendor == "postgresql":
+        return re.findall(r"Seq Scan on (\w+)", plan)
+    return re.findall(r"\bSCAN (\w+)", plan)
+
+
+# ---------------------------------------------------------------------
+# EXPLAIN checks for the hot queries on a seeded dataset
+# ---------------------------------------------------------------------
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizations = Organization.objects.bulk_create(
+            Organization(name=f"Org {i}") for i in range(NUM_ORGANIZATIONS)
+        )
+        User.objects.bulk_create(
+            User(username=f"{org.name} worker {i}", organization=org)
+            for org in organizations
+            for i in range(WORKERS_PER_ORGANIZATION)
+        )
+        workers = list(User.objects.order_by("id"))
+        task_type = TaskType.objects.create(name="Bug")
+        projects = Project.objects.bulk_create(
+            Project(name=f"Project {i}", organization=organizations[i % NUM_ORGANIZATIONS])
+            for i in range(NUM_ORGANIZATIONS * 10)
+        )
+        statuses = [value for value, _ in Task.Status.choices]
+        tasks = Task.objects.bulk_create(
+            Task(
+                name=f"Task {i}",
+                description="",
+                type=task_type,
+                project=projects[i % len(projects)],
+                organization=projects[i % len(projects)].organization,
+                status=statuses[i % len(statuses)],
+            )
+            for i in range(NUM_TASKS)
+        )
+        org_workers = {
+            org.id: [w for w in workers if w.organization_id == org.id]
+            for org in organizations
+        }
+        Task.workers.through.objects.bulk_create(
+            Task.workers.through(
+                task_id=task.id,
+                worker_id=org_workers[task.organization_id][i % WORKERS_PER_ORGANIZATION].id,
+            )
+            for i, task in enumerate(tasks)
+        )
+        Comment.objects.bulk_create(
+            Comment(
+                task=task,
+                worker=org_workers[task.organization_id][(i + 1) % WORKERS_PER_ORGANIZATION],
+                text="comment",
+                organization_id=task.organization_id,
+            )
+            for i, task in enumerate(tasks * COMMENTS_PER_TASK)
+        )
+        rooms = ChatRoom.objects.bulk_create(
+            ChatRoom(name=f"Room {i}", organization=organizations[i % NUM_ORGANIZATIONS])
+            for i in range(NUM_ROOMS)
+        )
+        ChatRoom.members.through.objects.bulk_create(
+            ChatRoom.members.through(
+                chatroom_id=room.id,
+                worker_id=org_workers[room.organization_id][(i + k) % WORKERS_PER_ORGANIZATION].id,
+            )
+            for i, room in enumerate(rooms)
+            for k in range(5)
+        )
+        Message.objects.bulk_create(
+            Message(
+                room=rooms[i % NUM_ROOMS],
+                sender=org_workers[rooms[i % NUM_ROOMS].organization_id][0],
+                content="message",
+            )
+            for i in range(NUM_MESSAGES)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        cls.user = workers[0]
+        cls.room = rooms[0]
+
+    def view_queryset(self, view_class, **params):
+        request = RequestFactory().get("/", params)
+        request.user = self.user
+        view = view_class()
+        view.setup(request)
+        return view.get_queryset()
+
+    def assertNoSequentialScan(self, queryset, lookup_tables=()):
+        scans = [table for table in sequential_scans(queryset) if table not in lookup_tables]
+        self.assertEqual(scans, [], queryset.explain())
+
+    def test_task_list_query(self):
+        # task types are a handful of rows shared by all organizations
+        self.assertNoSequentialScan(self.view_queryset(TaskListView), ("management_tasktype",))
+
+    def test_task_status_queries(self):
+        for value, _ in Task.Status.choices:
+            self.assertNoSequentialScan(
+                Task.objects.filter(organization=self.user.organization, status=value)
+            )
+
+    def test_comment_list_query(self):
+        self.assertNoSequentialScan(self.view_queryset(CommentListView))
+
+    def test_chat_list_query(self):
+        self.assertNoSequentialScan(self.view_queryset(ChatRoomListView))
+
+    def test_chat_history_query(self):
+        self.assertNoSequentialScan(history_queryset(self.room.id))
+
+    def test_worker_lookup_query(self):
+        self.assertNoSequentialScan(worker_lookup_queryset(self.user.organization_id, "org wor"))
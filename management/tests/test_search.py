@@ -0,0 +1,211 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from management.forms import SearchForm
+from management.models import (
+    Comment, Organization, Project, SearchDocument, Task, TaskType, Team,
+)
+from management.pagination import CursorPaginator
+from management.search import index_queryset, search_ids, search_queryset
+
+User = get_user_model()
+
+TASKS = reverse("management:task-list")
+COMMENTS = reverse("management:comment-list")
+
+
+# ---------------------------------------------------------------------
+# Index maintenance
+# ---------------------------------------------------------------------
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user(
+            "u1", "u1@test.com", "12345", organization=self.org,
+            first_name="Alice", last_name="Smith",
+        )
+        self.project = Project.objects.create(name="Website", organization=self.org)
+        self.type = TaskType.objects.create(name="Bug")
+
+    def create_task(self, name, description="", organization=None):
+        return Task.objects.create(
+            name=name, description=description, project=self.project, type=self.type,
+            organization=organization or self.org,
+        )
+
+    def test_saved_objects_are_indexed(self):
+        task = self.create_task("Deploy backend", "Roll out the api")
+        team = Team.objects.create(name="Platform", organization=self.org)
+
+        self.assertEqual(search_ids("task", "deploy", self.org.id), [task.id])
+        self.assertEqual(search_ids("task", "api", self.org.id), [task.id])
+        self.assertEqual(search_ids("team", "plat", self.org.id), [team.id])
+        self.assertEqual(search_ids("project", "web", self.org.id), [self.project.id])
+
+    @skipUnless(connection.vendor == "postgresql", "ts_rank() is a Postgres float4")
+    def test_rank_pages_have_no_gaps_or_repeats(self):
+        # ties, and ranks that only differ in the last float4 digits
+        for i in range(40):
+            self.create_task("Deploy", "deploy " * (i % 3) + "word " * (i * 7 % 11))
+        tasks = search_queryset(Task.objects.all(), "deploy", self.org.id)
+        paginator = CursorPaginator(tasks, 7, ("-search_rank", "id"))
+
+        seen, cursor = [], None
+        while True:
+            page = paginator.page(cursor)
+            seen += [task.id for task in page.object_list]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, list(tasks.values_list("id", flat=True)))
+
+    def test_update_and_delete_follow_the_object(self):
+        task = self.create_task("Deploy backend")
+        task.name = "Write docs"
+        task.save()
+        self.assertEqual(search_ids("task", "deploy", self.org.id), [])
+        self.assertEqual(search_ids("task", "docs", self.org.id), [task.id])
+
+        task.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind="task").exists())
+
+    def test_all_words_must_match(self):
+        self.create_task("Deploy backend")
+        frontend = self.create_task("Deploy frontend")
+
+        self.assertEqual(search_ids("task", "deploy front", self.org.id), [frontend.id])
+
+    def test_scoped_to_organization(self):
+        other = Organization.objects.create(name="Other")
+        self.create_task("Deploy backend", organization=other)
+
+        self.assertEqual(search_ids("task", "deploy", self.org.id), [])
+
+    def test_better_matches_rank_first(self):
+        weak = self.create_task("Release", "deploy")
+        strong = self.create_task("Deploy deploy", "deploy the deploy script")
+
+        self.assertEqual(search_ids("task", "deploy", self.org.id), [strong.id, weak.id])
+
+    def test_comments_follow_task_and_author_names(self):
+        task = self.create_task("Deploy backend")
+        comment = Comment.objects.create(worker=self.user, task=task, text="done", organization=self.org)
+        self.assertEqual(search_ids("comment", "alice", self.org.id), [comment.id])
+
+        task.name = "Migrate database"
+        task.save()
+        self.user.last_name = "Jones"
+        self.user.save()
+
+        self.assertEqual(search_ids("comment", "migrate jones", self.org.id), [comment.id])
+
+    def test_punctuation_only_query_matches_nothing(self):
+        self.create_task("Deploy backend")
+        self.assertEqual(search_ids("task", "\"*()", self.org.id), [])
+
+    def test_rebuild_command(self):
+        task = self.create_task("Deploy backend")
+        SearchDocument.objects.all().delete()
+
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        self.assertEqual(search_ids("task", "deploy", self.org.id), [task.id])
+
+
+# ---------------------------------------------------------------------
+# SearchForm and list views
+# ---------------------------------------------------------------------
+class SearchViewTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.other = User.objects.create_user("u2", "u2@test.com", "12345", organization=self.org)
+        self.project = Project.objects.create(name="Website", organization=self.org)
+        self.type = TaskType.objects.create(name="Bug")
+        self.client.force_login(self.user)
+
+    def create_task(self, name, description=""):
+        task = Task.objects.create(
+            name=name, description=description, project=self.project, type=self.type,
+            organization=self.org,
+        )
+        task.workers.add(self.user)
+        return task
+
+    def test_form_without_query_leaves_queryset_alone(self):
+        queryset = Task.objects.all()
+        self.assertIs(SearchForm({"query": ""}).search(queryset), queryset)
+
+    def test_task_list_is_ranked(self):
+        weak = self.create_task("Release", "deploy")
+        strong = self.create_task("Deploy deploy", "deploy")
+        self.create_task("Unrelated")
+
+        response = self.client.get(TASKS, {"query": "deploy"})
+
+        self.assertEqual(list(response.context["task_list"]), [strong, weak])
+
+    def test_ranked_task_list_pages_with_cursor(self):
+        tasks = [self.create_task(f"Deploy {i}") for i in range(25)]
+
+        first = self.client.get(TASKS, {"query": "deploy"})
+        cursor = first.context["page_obj"].next_cursor
+        second = self.client.get(TASKS, {"query": "deploy", "cursor": cursor})
+
+        listed = list(first.context["task_list"]) + list(second.context["task_list"])
+        self.assertEqual(sorted(t.id for t in listed), [t.id for t in tasks])
+
+    def test_comment_list_searches_author_and_task(self):
+        task = self.create_task("Deploy backend")
+        comment = Comment.objects.create(worker=self.other, task=task, text="ok", organization=self.org)
+        Comment.objects.create(worker=self.other, task=self.create_task("Other"), text="ok", organization=self.org)
+
+        by_author = self.client.get(COMMENTS, {"query": "u2 deploy"})
+
+        self.assertEqual(list(by_author.context["comment_list"]), [comment])
+
+    def test_comment_list_keeps_low_ranked_matches_in_scope(self):
+        # hundreds of better matches the user cannot see: not on their tasks
+        elsewhere = Task.objects.create(name="Elsewhere", project=self.project, type=self.type, organization=self.org)
+        Comment.objects.bulk_create(
+            Comment(worker=self.other, task=elsewhere, text="deploy deploy deploy", organization=self.org)
+            for _ in range(600)
+        )
+        index_queryset(Comment.objects.all())
+        mine = Comment.objects.create(
+            worker=self.other, task=self.create_task("Release"), text="deploy", organization=self.org,
+        )
+
+        response = self.client.get(COMMENTS, {"query": "deploy"})
+
+        self.assertEqual(list(response.context["comment_list"]), [mine])
+
+    def test_every_match_is_kept(self):
+        tasks = Task.objects.bulk_create(
+            Task(name=f"Deploy {i}", project=self.project, type=self.type, organization=self.org)
+            for i in range(600)
+        )
+        index_queryset(Task.objects.all())
+
+        self.assertEqual(SearchForm({"query": "deploy"}).search(Task.objects.all(), self.org.id).count(), len(tasks))
+
+    def test_project_list_ranks_within_the_organization(self):
+        other_org = Organization.objects.create(name="Other")
+        Project.objects.bulk_create(
+            Project(name="Website website website", organization=other_org) for _ in range(600)
+        )
+        index_queryset(Project.objects.all())
+        team = Team.objects.create(name="Web", organization=self.org)
+        team.workers.add(self.user)
+        self.project.teams.add(team)
+
+        response = self.client.get(reverse("management:project-list"), {"query": "website"})
+
+        self.assertEqual(list(response.context["project_list"]), [self.project])
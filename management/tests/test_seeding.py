@@ -0,0 +1,114 @@
+import io
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from management import seeding
+from management.models import ChatRoom, Comment, Message, Organization, SearchDocument, Task, Worker
+
+SCALE = dict(organizations=3, workers=30, teams=6, projects=9, tasks=120, comments=60, rooms=6, messages=300)
+
+
+def snapshot(organizations):
+    return {
+        "organizations": list(organizations.order_by("name").values_list("name", "code")),
+        "workers": list(
+            Worker.objects.filter(organization__in=organizations)
+            .order_by("username").values_list("username", "first_name", "last_name")
+        ),
+        "tasks": list(
+            Task.objects.filter(organization__in=organizations)
+            .order_by("organization__name", "id").values_list("name", "status", "deadline")
+        ),
+        "messages": list(
+            Message.objects.filter(organization__in=organizations)
+            .order_by("room__organization__name", "id").values_list("content", "timestamp")
+        ),
+    }
+
+
+# ---------------------------------------------------------------------
+# Scale seeding
+# ---------------------------------------------------------------------
+class SeedingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_split_is_skewed_and_exact(self):
+        shares = seeding.split(100, 4)
+
+        self.assertEqual(sum(shares), 100)
+        self.assertEqual(shares, sorted(shares, reverse=True))
+
+    def test_creates_the_requested_totals(self):
+        counts = seeding.ScaleSeeder(batch_size=50).run(**SCALE)
+
+        self.assertEqual(Organization.objects.count(), 3)
+        self.assertEqual(Worker.objects.count(), 30)
+        self.assertEqual(Task.objects.count(), 120)
+        self.assertEqual(Comment.objects.count(), 60)
+        self.assertEqual(ChatRoom.objects.count(), 6)
+        self.assertEqual(Message.objects.count(), 300)
+        self.assertEqual(counts["messages"], 300)
+        self.assertEqual(SearchDocument.objects.filter(kind=SearchDocument.Kind.task).count(), 120)
+
+    def test_rows_stay_inside_their_organization(self):
+        seeding.ScaleSeeder().run(**SCALE)
+
+        self.assertFalse(Task.objects.exclude(project__organization=F("organization")).exists())
+        self.assertFalse(Message.objects.exclude(sender__organization=F("room__organization")).exists())
+        self.assertFalse(Comment.objects.exclude(worker__organization=F("task__organization")).exists())
+
+    def test_same_seed_same_data(self):
+        seeder = seeding.ScaleSeeder(seed=7)
+        seeder.run(**SCALE)
+        first = snapshot(seeder.organizations())
+        seeding.flush()
+        # other seeded organizations and another day change nothing
+        seeding.ScaleSeeder(seed=3).run(**SCALE)
+
+        with mock.patch("django.utils.timezone.localdate", return_value=date(2031, 5, 6)):
+            seeder = seeding.ScaleSeeder(seed=7)
+            seeder.run(**SCALE)
+
+        self.assertEqual(snapshot(seeder.organizations()), first)
+        self.assertEqual(seeder.start, seeding.EPOCH)
+
+    def test_timestamps_are_spread_out(self):
+        seeder = seeding.ScaleSeeder()
+        seeder.run(**SCALE)
+
+        timestamps = list(Message.objects.values_list("timestamp", flat=True))
+        self.assertGreater(max(timestamps) - min(timestamps), timedelta(days=30))
+        self.assertLess(max(Comment.objects.values_list("created_at", flat=True)), seeder.start)
+        self.assertTrue(Message._meta.get_field("timestamp").auto_now_add)
+
+    def test_flush_deletes_only_seeded_organizations(self):
+        Organization.objects.create(name="Real")
+        seeding.ScaleSeeder().run(**SCALE)
+
+        self.assertEqual(seeding.flush(), 3)
+
+        self.assertEqual(list(Organization.objects.values_list("name", flat=True)), ["Real"])
+        self.assertFalse(Message.objects.exists())
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_command(self):
+        out = io.StringIO()
+
+        call_command("seed_scale_data", organizations=2, tasks=10, messages=20, stdout=out)
+        call_command("seed_scale_data", organizations=2, tasks=10, messages=20, flush=True, stdout=out)
+
+        self.assertIn("Deleted 2 seeded organizations.", out.getvalue())
+        self.assertEqual(Task.objects.count(), 10)
+        with self.assertRaisesMessage(CommandError, "--flush"):
+            call_command("seed_scale_data", organizations=2, tasks=10, messages=20, stdout=out)
+
+    def test_command_start(self):
+        call_command("seed_scale_data", organizations=1, tasks=10, messages=20, start=date(2030, 6, 1), stdout=io.StringIO())
+
+        self.assertEqual(Message.objects.latest("timestamp").timestamp.year, 2030)
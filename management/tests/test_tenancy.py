@@ -0,0 +1,114 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from management.models import Organization, Task
+from management.tenancy import OrganizationCache, organization_cache
+
+User = get_user_model()
+
+
+# ---------------------------------------------------------------------
+# Organization cache
+# ---------------------------------------------------------------------
+class OrganizationCacheTests(TestCase):
+    def setUp(self):
+        organization_cache.clear()
+        self.org = Organization.objects.create(name="Org")
+
+    def test_second_lookup_is_served_from_memory(self):
+        organization_cache.get(self.org.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(organization_cache.get(self.org.id).name, "Org")
+
+    def test_save_and_delete_invalidate(self):
+        organization_cache.get(self.org.id)
+
+        self.org.name = "Renamed"
+        self.org.save()
+        self.assertEqual(organization_cache.get(self.org.id).name, "Renamed")
+
+        self.org.delete()
+        self.assertIsNone(organization_cache.get(self.org.id))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = OrganizationCache(maxsize=2)
+        others = [Organization.objects.create(name=f"Org {i}") for i in range(2)]
+        cache.get(self.org.id)
+        cache.get(others[0].id)
+        cache.get(self.org.id)
+
+        cache.get(others[1].id)
+
+        with self.assertNumQueries(0):
+            cache.get(self.org.id)
+        with self.assertNumQueries(1):
+            cache.get(others[0].id)
+
+    def test_expired_entries_are_reloaded(self):
+        cache = OrganizationCache(ttl=0)
+        cache.get(self.org.id)
+
+        with self.assertNumQueries(1):
+            cache.get(self.org.id)
+
+
+# ---------------------------------------------------------------------
+# RequireOrganizationMiddleware
+# ---------------------------------------------------------------------
+class OrganizationMiddlewareTests(TestCase):
+    def setUp(self):
+        organization_cache.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+
+    def test_org_id_is_set_without_loading_the_organization(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("management:task-list"))
+
+        self.assertEqual(response.wsgi_request.org_id, self.org.id)
+        self.assertNotIn("organization", response.wsgi_request.user._state.fields_cache)
+        self.assertEqual(response.wsgi_request.organization.name, "Org")
+
+    def test_user_without_organization_is_sent_to_assign(self):
+        self.client.force_login(User.objects.create_user("u2", "u2@test.com", "12345"))
+
+        response = self.client.get(reverse("management:task-list"))
+
+        self.assertRedirects(
+            response, reverse("management:assign-organization"), fetch_redirect_response=False,
+        )
+        self.assertEqual(self.client.get(reverse("management:assign-organization")).status_code, 200)
+
+    def test_profile_reads_the_cached_organization(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("management:profile"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("management:profile"))
+
+        self.assertContains(response, "<strong>Organization:</strong> Org")
+        self.assertFalse([q for q in queries if 'FROM "management_organization"' in q["sql"]])
+
+    def test_static_paths_skip_the_session(self):
+        self.client.force_login(self.user)
+
+        with self.assertNumQueries(0):
+            self.client.get("/static/js/task_board.js")
+
+
+    def test_created_objects_get_the_request_organization(self):
+        self.client.force_login(self.user)
+        project = self.org.project_set.create(name="P1")
+
+        self.client.post(reverse("management:task-create"), {
+            "name": "Task1", "description": "d", "create_new_type": "on", "new_type_name": "Bug",
+            "new_type_color": "#ffd6d1", "priority": "urgent", "status": "todo",
+            "project": project.id, "deadline": "2025-01-01",
+        })
+
+        self.assertEqual(Task.objects.get().organization_id, self.org.id)
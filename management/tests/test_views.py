@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.timezone import now
 from soupsieve.css_parser import COMMENTS
@@ -13,6 +15,12 @@ TEAMS = reverse("management:team-list")
 CHATROOMS = reverse("management:chat-list")
 COMMENTS= reverse("management:comment-list")
 
+
+def app_queries(queries):
+    """Queries outside of the cache table, whose tier depends on timing."""
+    return [query["sql"] for query in queries if "taskhive_cache" not in query["sql"]]
+
+
 # ---------------------------------------------------------------------
 # Tests for register view
 # ---------------------------------------------------------------------
@@ -96,6 +104,53 @@ class TaskListViewTests(TestCase):
         )
         self.client.force_login(self.user)
 
+    def add_tasks(self, count, assigned=True):
+        project = Project.objects.create(name=f"Project {Project.objects.count()}", organization=self.org)
+        task_type = TaskType.objects.create(name="Bug", color="#ffd6d1")
+        statuses = [value for value, _ in Task.Status.choices]
+        tasks = []
+        for i in range(count):
+            task = Task.objects.create(
+                name=f"Task {i}", description="d", project=project, type=task_type,
+                organization=self.org, status=statuses[i % len(statuses)],
+            )
+            if assigned:
+                task.workers.add(self.user)
+            tasks.append(task)
+        return tasks
+
+    def test_lists_only_assigned_tasks(self):
+        assigned = self.add_tasks(2)
+        self.add_tasks(2, assigned=False)
+
+        response = self.client.get(TASKS)
+
+        self.assertEqual(list(response.context["task_list"]), assigned)
+        self.assertContains(response, "#ffd6d1")
+
+    def test_status_groups_partition_assigned_tasks(self):
+        self.add_tasks(6)
+        self.add_tasks(3, assigned=False)
+
+        response = self.client.get(TASKS)
+
+        groups = response.context["status_groups"]
+        self.assertEqual([group["value"] for group in groups], [value for value, _ in Task.Status.choices])
+        for group in groups:
+            self.assertEqual(len(group["tasks"]), 2)
+            self.assertTrue(all(task["status"] == group["value"] for task in group["tasks"]))
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        self.add_tasks(3)
+        self.client.get(TASKS)  # fill the cached sidebar fragment first
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(TASKS)
+        self.add_tasks(15)
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(TASKS)
+
+        self.assertEqual(len(app_queries(large)), len(app_queries(small)))
+
 
 def test_retreat_tasks(self):
         Task.objects.create(name="Define models")
@@ -140,6 +195,57 @@ class ProjectListViewTests(TestCase):
         )
         self.assertTemplateUsed(response, "management/project_list.html")
 
+class ProjectDetailViewTests(TestCase):
+    def setUp(self) -> None:
+        self.org = Organization.objects.create(name="Test Org")
+        self.user = User.objects.create_user(
+            username="test_user",
+            password="<PASSWORD>",
+            organization=self.org
+        )
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(name="Mobile app", organization=self.org)
+        self.task_type = TaskType.objects.create(name="Bug")
+
+    def add_tasks(self, count, comments_per_task):
+        team = Team.objects.create(name=f"Team {Team.objects.count()}", organization=self.org)
+        self.project.teams.add(team)
+        for i in range(count):
+            task = Task.objects.create(
+                name=f"Task {i}", description="d", project=self.project,
+                type=self.task_type, organization=self.org,
+            )
+            author = User.objects.create_user(
+                username=f"author_{task.id}", password="<PASSWORD>", organization=self.org
+            )
+            for j in range(comments_per_task):
+                Comment.objects.create(task=task, worker=author, text=f"comment {j}", organization=self.org)
+
+    def get_detail(self):
+        return self.client.get(reverse("management:project-detail", kwargs={"pk": self.project.id}))
+
+    def test_comments_are_ordered(self):
+        self.add_tasks(1, 3)
+        response = self.get_detail()
+        task = response.context["tasks"][0]
+        self.assertEqual(
+            [comment.text for comment in task.comment_set.all()],
+            ["comment 0", "comment 1", "comment 2"],
+        )
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        self.add_tasks(2, 1)
+        self.get_detail()  # fill the cached sidebar fragment first
+        with CaptureQueriesContext(connection) as small:
+            self.get_detail()
+        self.add_tasks(10, 5)
+        with CaptureQueriesContext(connection) as large:
+            response = self.get_detail()
+
+        self.assertContains(response, "comment 4")
+        self.assertEqual(len(app_queries(large)), len(app_queries(small)))
+
+
 # ---------------------------------------------------------------------
 # Tests for TeamListView/TeamDetailView
 # ---------------------------------------------------------------------
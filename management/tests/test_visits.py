@@ -0,0 +1,108 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from management.models import Organization, WorkerStats
+from management.visits import VisitCounter, visit_counter
+
+User = get_user_model()
+
+INDEX = reverse("management:index")
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+# ---------------------------------------------------------------------
+# Buffered visit counter
+# ---------------------------------------------------------------------
+class VisitCounterTests(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create(username="u1", organization=self.org)
+        self.other = User.objects.create(username="u2", organization=self.org)
+        self.counter = VisitCounter(interval=None)
+
+    def test_visits_are_aggregated_until_flush(self):
+        for _ in range(3):
+            self.counter.record(self.user.id)
+        self.counter.record(self.other.id)
+        self.assertFalse(WorkerStats.objects.exists())
+
+        self.counter.flush()
+        self.counter.record(self.user.id)
+        self.counter.flush()
+
+        stats = dict(WorkerStats.objects.values_list("worker_id", "dashboard_visits"))
+        self.assertEqual(stats, {self.user.id: 4, self.other.id: 1})
+        self.assertEqual(len(self.counter), 0)
+
+    def test_deleted_workers_are_skipped(self):
+        self.counter.record(self.other.id)
+        self.other.delete()
+
+        self.counter.flush()
+
+        self.assertFalse(WorkerStats.objects.exists())
+
+    def test_failed_flush_keeps_the_counts(self):
+        self.counter.record(self.user.id)
+
+        with mock.patch.object(self.counter, "_write", side_effect=DatabaseError), \
+                self.assertLogs("management.visits", "WARNING"):
+            self.counter.flush()
+        self.counter.flush()
+
+        self.assertEqual(WorkerStats.objects.get().dashboard_visits, 1)
+
+
+# ---------------------------------------------------------------------
+# Dashboard without writes
+# ---------------------------------------------------------------------
+class DashboardWritesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        visit_counter.clear()
+        self.org = Organization.objects.create(name="Org")
+        self.user = User.objects.create_user("u1", "u1@test.com", "12345", organization=self.org)
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        visit_counter.clear()
+
+    def test_dashboard_get_does_not_write(self):
+        self.client.get(INDEX)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(INDEX)
+
+        self.assertEqual(response.status_code, 200)
+        writes = [q["sql"] for q in queries if q["sql"].lstrip().upper().startswith(WRITES)]
+        self.assertEqual(writes, [])
+
+    def test_visit_count_includes_unflushed_visits(self):
+        self.client.get(INDEX)
+        visit_counter.flush()
+        self.client.get(INDEX)
+
+        response = self.client.get(INDEX)
+
+        self.assertEqual(response.context["num_visits"], 2)
+
+
+# ---------------------------------------------------------------------
+# Session engine benchmark
+# ---------------------------------------------------------------------
+class BenchmarkSessionsCommandTests(TestCase):
+    def test_reports_every_engine(self):
+        out = StringIO()
+
+        call_command("benchmark_sessions", iterations=2, stdout=out)
+
+        self.assertIn("cached_db", out.getvalue())
+        self.assertIn("signed_cookies", out.getvalue())
@@ -0,0 +1,91 @@
+import asyncio
+import base64
+import hashlib
+import io
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from management.benchmarking import RawWebSocket
+from management.models import ChatRoom, Message, Organization, Worker
+
+
+# ---------------------------------------------------------------------
+# Websocket client
+# ---------------------------------------------------------------------
+class RawWebSocketTests(SimpleTestCase):
+    def test_frames_round_trip(self):
+        socket_ = RawWebSocket("ws://127.0.0.1:1", "/ws/", [])
+        for size in (5, 300, 70000):
+            with self.subTest(size=size):
+                frame = socket_._frame(0x1, b"x" * size)
+                header = 2 + {5: 0, 300: 2, 70000: 8}[size]
+                mask = frame[header:header + 4]
+                payload = bytes(byte ^ mask[n % 4] for n, byte in enumerate(frame[header + 4:]))
+
+                self.assertEqual(frame[0], 0x81)
+                self.assertEqual(payload, b"x" * size)
+
+    def test_handshake_and_messages_against_a_server(self):
+        async def handle(reader, writer):
+            lines = []
+            while (line := await reader.readline()) != b"\r\n":
+                lines.append(line.decode())
+            key = next(line.split(":", 1)[1].strip() for line in lines if line.lower().startswith("sec-websocket-key"))
+            accept = base64.b64encode(hashlib.sha1(key.encode() + RawWebSocket.GUID).digest()).decode()
+            writer.write(
+                f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+            )
+            # a ping, then a text message in two fragments
+            writer.write(b"\x89\x00" + b"\x01\x03hel" + b"\x80\x02lo")
+            await writer.drain()
+            pong = await reader.readexactly(6)
+            writer.write(b"\x81\x01" + bytes([pong[0] & 0x0F]))
+            await writer.drain()
+
+        async def main():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            socket_ = RawWebSocket(f"ws://127.0.0.1:{port}", "/ws/", [(b"host", b"x"), (b"cookie", b"a=b")])
+            await socket_.connect(5)
+            received = [await socket_.receive(5), await socket_.receive(5)]
+            await socket_.close()
+            server.close()
+            return received
+
+        self.assertEqual(asyncio.run(main()), ["hello", "\n"])
+
+
+# ---------------------------------------------------------------------
+# Command, in process
+# ---------------------------------------------------------------------
+class WebsocketBenchmarkCommandTests(TransactionTestCase):
+    def run_command(self, *args):
+        out = io.StringIO()
+        call_command(
+            "benchmark_websockets", "--rooms", "2", "--members", "3", "--messages", "3", "--connections", "6",
+            "--history", "120", "--rate", "50", "--duration", "0.3", "--host", "testserver", *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def test_scenarios(self):
+        output = self.run_command()
+
+        self.assertIn("18/18 delivered", output)
+        self.assertIn("6 ok, 0 failed", output)
+        # the history plus what fanout sent to the first room
+        self.assertIn("paging through 123 messages", output)
+        self.assertIn("KiB per connection", output)
+        self.assertIn("sustained:", output)
+        # the run cleans up after itself
+        self.assertFalse(Organization.objects.exists())
+        self.assertFalse(Worker.objects.exists())
+        self.assertFalse(ChatRoom.objects.exists())
+        self.assertFalse(Message.objects.exists())
+
+    def test_private_rooms(self):
+        output = self.run_command("--private", "--scenario", "fanout")
+
+        self.assertIn("2 rooms x 2 members", output)
+        self.assertIn("12/12 delivered", output)
@@ -1,5 +1,6 @@
 from django.urls import path
 
+from management.async_views import select_view
 from management.views import (
     index,
     WorkerListView,
@@ -10,25 +11,31 @@ from management.views import (
     profile, ProjectUpdateView, chat_view, ChatRoomListView, ChatRoomCreateView, chat_room, CommentListView,
     TaskCreateView, TaskUpdateView, ProjectCreateView, TeamCreateView, TeamUpdateView, add_comment, delete_comment,
     TaskDeleteView, ProjectDeleteView, TeamDeleteView, WorkerDeleteView, feedback_view, AboutView, login_view,
+    task_board, task_bulk, task_import, worker_autocomplete, export,
 )
 
 urlpatterns = [
-    path("", index, name="index"),
+    path("", select_view("index", index), name="index"),
     path("register", register, name="register"),
     path("profile", profile, name="profile"),
     path("login/", login_view, name="login"),
     #path("dashboard"),
     path("workers/", WorkerListView.as_view(), name="worker-list"),
+    path("workers/autocomplete/", worker_autocomplete, name="worker-autocomplete"),
     path("workers/<int:pk>", WorkerDetailView.as_view(), name="worker-detail"),
     path("workers/<int:pk>/update", WorkerUpdateView.as_view(), name="worker-update"),
     path("workers/<int:pk>/delete", WorkerDeleteView.as_view(), name="worker-delete"),
-    path("tasks/", TaskListView.as_view(), name="task-list"),
-    path("task/<int:pk>", TaskDetailView.as_view(), name="task-detail"),
+    path("tasks/", select_view("task-list", TaskListView.as_view()), name="task-list"),
+    path("tasks/board/", task_board, name="task-board"),
+    path("tasks/bulk/", task_bulk, name="task-bulk"),
+    path("tasks/import/", task_import, name="task-import"),
+    path("export/<slug:kind>/", export, name="export"),
+    path("task/<int:pk>", select_view("task-detail", TaskDetailView.as_view()), name="task-detail"),
     path("task/create", TaskCreateView.as_view(), name="task-create"),
     path("task/<int:pk>/update", TaskUpdateView.as_view(), name="task-update"),
     path("task/<int:pk>/delete", TaskDeleteView.as_view(), name="task-delete"),
-    path("projects/", ProjectListView.as_view(), name="project-list"),
-    path("projects/<int:pk>", ProjectDetailView.as_view(), name="project-detail"),
+    path("projects/", select_view("project-list", ProjectListView.as_view()), name="project-list"),
+    path("projects/<int:pk>", select_view("project-detail", ProjectDetailView.as_view()), name="project-detail"),
     path("projects/create", ProjectCreateView.as_view(), name="project-create"),
     path("projects/<int:pk>/update", ProjectUpdateView.as_view(), name="project-update"),
     path("projects/<int:pk>/delete", ProjectDeleteView.as_view(), name="project-delete"),
@@ -41,7 +48,7 @@ urlpatterns = [
     path("chats/", ChatRoomListView.as_view(), name="chat-list"),
     path("chat/<int:pk>", chat_room, name="chat-room"),
     path("chat/create", ChatRoomCreateView.as_view(), name="chat-create"),
-    path("comments/", CommentListView.as_view(), name="comment-list"),
+    path("comments/", select_view("comment-list", CommentListView.as_view()), name="comment-list"),
     path("tasks/<int:task_id>/add-comment", add_comment, name="add_comment"),
     path("comments/<int:comment_id>/delete", delete_comment, name="delete_comment"),
     path("feedback/submit/", feedback_view, name="feedback"),
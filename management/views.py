@@ -5,16 +5,30 @@ from django.contrib import messages
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Max, Q, Count
-from django.http import HttpResponseForbidden
+from django.db.models import Max, Prefetch, Q
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy, reverse
 from django.views import generic, View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from django.views.generic import TemplateView
 
-from management.forms import WorkerRegistrationForm, WorkerUpdateForm, ChatGroupForm, TaskForm, \
-    ProjectForm, TeamForm, CommentForm, SearchForm, FeedbackForm
+from management.board import (
+    board_etag, board_last_modified, build_board, build_status_groups, get_board_version, worker_tasks,
+)
+from management.calendar_data import get_month_tasks, group_by_day
+from management.dashboard import get_dashboard_stats
+from management.exports import EXPORTS, FORMATS, aiterate, export_stream
+from management.forms import TaskImportForm, WorkerRegistrationForm, WorkerUpdateForm, ChatGroupForm, TaskForm, \
+    ProjectForm, TeamForm, CommentForm, SearchForm, FeedbackForm, PrivateChatForm, BulkTaskForm
+from management.lookups import worker_lookup_page
 from management.models import Worker, Task, Project, Comment, Organization, Team, ChatRoom
+from management.pagination import CursorPaginationMixin
+from management.search import SearchRankOrderingMixin
+from management.tenancy import request_org_id
+from management.visits import visit_count, visit_counter
 
 from datetime import date
 
@@ -39,7 +53,7 @@ class OrganizationScopedMixin:
     """
     def get_queryset(self):
         qs = super().get_queryset()
-        return qs.filter(organization=self.request.user.organization)
+        return qs.filter(organization_id=request_org_id(self.request))
 
 
 @login_required
@@ -58,14 +72,15 @@ def assign_organization(request):
 
 @login_required
 def index(request):
-    num_workers = Worker.objects.all().count()
-    num_visits = request.session.get('num_visits', 0)
-    request.session["num_visits"] = num_visits + 1
+    organization_id = request_org_id(request)
+    num_visits = visit_count(request.user.id)
+    visit_counter.record(request.user.id)
 
+    project_list = Project.objects.filter(organization_id=organization_id)
     project_id = request.GET.get("project")
     selected_project = None
     if project_id:
-        selected_project = Project.objects.get(id=project_id)
+        selected_project = project_list.filter(id=project_id).first()
     cal_view = CalendarView()
     cal_view.request = request
     calendar_context = cal_view.get_context_data(selected_project=selected_project)
@@ -86,46 +101,15 @@ def index(request):
     for key, default in calendar_defaults.items():
         calendar_context.setdefault(key, default)
 
-    tasks = Task.objects.all()
-
-    if selected_project:
-        tasks = tasks.filter(project=selected_project)
-        workers = Worker.objects.filter(tasks__in=tasks).distinct().annotate(
-            done_tasks_count=Count("tasks", filter=Q(tasks__status="done")),
-            tasks_count=Count("tasks")
-        )
-    else:
-        workers = Worker.objects.annotate(
-            done_tasks_count=Count("tasks", filter=Q(tasks__status="done")),
-            tasks_count=Count("tasks")
-        )
-
-    num_tasks = tasks.count()
-    num_tasks_done = tasks.filter(status__icontains="done").count()
-    num_tasks_todo = tasks.exclude(status__icontains="done").count()
-    datapoints = [
-        {
-            "label": f"{worker.first_name} {worker.last_name}",
-            "y": f"{worker.tasks_count}"
-        }
-        for worker in workers
-    ]
-    priority_counts = [
-        {"label": "Urgent", "y": tasks.filter(priority="urgent").count()},
-        {"label": "Medium", "y": tasks.filter(priority="medium").count()},
-        {"label": "Low", "y": tasks.filter(priority="low").count()},
-    ]
+    stats = get_dashboard_stats(
+        organization_id,
+        selected_project.id if selected_project else None,
+    )
     context = {
         "num_visits": num_visits,
-        "num_workers": num_workers,
-        "project_list": Project.objects.all(),
-        "workers": workers,
+        "project_list": project_list,
         "selected_project": selected_project,
-        "num_tasks": num_tasks,
-        "num_tasks_done": num_tasks_done,
-        "num_tasks_todo": num_tasks_todo,
-        "datapoints": datapoints,
-        "priority_counts": priority_counts,
+        **stats,
         **calendar_context,
     }
     return render(request, "management/index.html", context)
@@ -163,7 +147,7 @@ def chat_room(request, pk):
 
 
 
-class WorkerListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListView):
+class WorkerListView(LoginRequiredMixin, OrganizationScopedMixin, CursorPaginationMixin, generic.ListView):
     model = Worker
     template_name = "management/worker_list.html"
     context_object_name = "worker_list"
@@ -179,11 +163,37 @@ class WorkerListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListVi
 class WorkerDetailView(LoginRequiredMixin, OrganizationScopedMixin, generic.DetailView):
     model = Worker
 
-class TaskListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListView):
+
+@login_required
+def worker_autocomplete(request):
+    """Paged workers of the user's organization whose names start with the words of ?q=."""
+    exclude = [request.user.id] if request.GET.get("exclude_self") else []
+    try:
+        page = worker_lookup_page(
+            request_org_id(request),
+            request.GET.get("q", ""),
+            request.GET.get("cursor"),
+            exclude,
+        )
+    except ValueError:
+        raise Http404("Invalid cursor")
+    return JsonResponse(page)
+
+
+class OrganizationWorkersFormMixin:
+    """Passes the organization to forms whose worker choices are scoped by it."""
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["organization_id"] = request_org_id(self.request)
+        return kwargs
+
+
+class TaskListView(LoginRequiredMixin, OrganizationScopedMixin, SearchRankOrderingMixin, CursorPaginationMixin, generic.ListView):
     model = Task
     template_name = "management/task_list.html"
     context_object_name = "task_list"
-    queryset = model.objects.order_by("id")
+    queryset = model.objects.select_related("type").order_by("id")
     paginate_by = 20
 
     def get_context_data(self, **kwargs):
@@ -193,34 +203,77 @@ class TaskListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListView
         context["search_form"] = SearchForm(initial={"query": query})
         context["search_form"].fields["query"].widget.attrs["placeholder"] = "Search tasks..."
 
-        tasks = self.model.objects.filter(workers=self.request.user)
-
-        COLORS = {
-            Task.Status.todo: "#3498db",
-            Task.Status.in_progress: "#f1c40f",
-            Task.Status.done: "#2ecc71",
-        }
-
-        status_groups = [
-            {
-                "label": label,
-                "value": value,
-                "tasks": tasks.filter(status=value),
-                "color": COLORS.get(value, "#ccc")
-            }
-            for value, label in Task.Status.choices
-        ]
-        context["status_groups"] = status_groups
+        tasks = worker_tasks(self.request.user).values("id", "name", "status")
+        context["status_groups"] = build_status_groups(tasks)
         return context
 
     def get_queryset(self):
         form = SearchForm(self.request.GET)
-        qs = super().get_queryset()
-        if form.is_valid():
-            query = form.cleaned_data.get("query")
-            if query:
-                qs = qs.filter(name__icontains=query)
-        return qs
+        qs = super().get_queryset().filter(workers=self.request.user)
+        return form.search(qs, request_org_id(self.request))
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=board_etag, last_modified_func=board_last_modified)
+def task_board(request):
+    """The worker's kanban columns as JSON; answers 304 until a task of the organization changes."""
+    revision, _ = get_board_version(request)
+    return JsonResponse({"revision": revision, "columns": build_board(request.user)})
+
+
+@login_required
+@require_POST
+def task_bulk(request):
+    """Applies one action to many tasks of the organization; answers with how many changed."""
+    form = BulkTaskForm(request.POST, organization_id=request_org_id(request))
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    return JsonResponse({"action": form.cleaned_data["action"], "count": form.save()})
+
+
+# skipped rows shown after an import, the rest are only counted
+IMPORT_ERRORS_SHOWN = 100
+
+
+@login_required
+def task_import(request):
+    """Creates tasks from an uploaded file, listing the rows that were skipped."""
+    result = None
+    form = TaskImportForm(request.POST or None, request.FILES or None, organization_id=request_org_id(request))
+    if request.method == "POST" and form.is_valid():
+        result = form.save()
+        if result.created:
+            messages.success(request, f"Imported {result.created} tasks.")
+    return render(request, "management/task_import.html", {
+        "form": form,
+        "result": result,
+        "errors": result.errors[:IMPORT_ERRORS_SHOWN] if result else [],
+    })
+
+
+@login_required
+def export(request, kind):
+    """
+    Streams the organization's tasks, comments or (the user's) chat history as
+    ?format=csv or jsonl, gzipped on the fly with ?gzip=1.
+    """
+    fmt = request.GET.get("format", "csv")
+    if kind not in EXPORTS or fmt not in FORMATS:
+        raise Http404
+    filters = {}
+    if kind == "messages":
+        filters["worker_id"] = request.user.id
+        if request.GET.get("room", "").isdigit():
+            filters["room_id"] = int(request.GET["room"])
+    compress = request.GET.get("gzip") == "1"
+    stream = export_stream(kind, request_org_id(request), fmt, compress, **filters)
+    if isinstance(request, ASGIRequest):
+        stream = aiterate(stream)
+    filename = f"{kind}.{fmt}" + (".gz" if compress else "")
+    response = StreamingHttpResponse(stream, content_type="application/gzip" if compress else FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
 
 class TaskDetailView(LoginRequiredMixin, OrganizationScopedMixin, generic.DetailView):
     model = Task
@@ -237,11 +290,7 @@ class ProjectListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListV
         qs = Project.objects.filter(teams__workers=user).distinct()
 
         form = SearchForm(self.request.GET)
-        if form.is_valid():
-            q = form.cleaned_data.get("query")
-            if q:
-                qs = qs.filter(name__icontains=q)
-        return qs
+        return form.search(qs, request_org_id(self.request))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -254,20 +303,23 @@ class ProjectListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListV
 class ProjectDetailView(LoginRequiredMixin, OrganizationScopedMixin, generic.DetailView):
     model = Project
 
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related("teams")
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["comment_form"] = CommentForm()
-        tasks = self.object.task_set.all()
+        comments = Comment.objects.select_related("worker").order_by("created_at", "id")
+        tasks = self.object.task_set.prefetch_related(Prefetch("comment_set", queryset=comments))
         query = self.request.GET.get("query", "")
         context["search_form"] = SearchForm(initial={"query": query})
         context["search_form"].fields["query"].widget.attrs["placeholder"] = "Search tasks..."
-        if query:
-            tasks = tasks.filter(name__icontains=query)
+        tasks = SearchForm(self.request.GET).search(tasks, self.object.organization_id)
         context["tasks"] = tasks
         return context
 
 
-class TeamListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListView):
+class TeamListView(LoginRequiredMixin, OrganizationScopedMixin, SearchRankOrderingMixin, CursorPaginationMixin, generic.ListView):
     model = Team
     template_name = "management/team_list.html"
     context_object_name = "team_list"
@@ -284,12 +336,7 @@ class TeamListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListView
 
     def get_queryset(self):
         form = SearchForm(self.request.GET)
-        qs = super().get_queryset()
-        if form.is_valid():
-            query = form.cleaned_data.get("query")
-            if query:
-                qs = qs.filter(name__icontains=query)
-        return qs
+        return form.search(super().get_queryset(), request_org_id(self.request))
 
 class TeamDetailView(LoginRequiredMixin, OrganizationScopedMixin, generic.DetailView):
     model = Team
@@ -321,16 +368,18 @@ class TeamDetailView(LoginRequiredMixin, OrganizationScopedMixin, generic.Detail
         return context
 
 
-class ChatRoomListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListView):
+class ChatRoomListView(LoginRequiredMixin, OrganizationScopedMixin, CursorPaginationMixin, generic.ListView):
     model = ChatRoom
     template_name = "management/chat.html"
     context_object_name = "chat_list"
     paginate_by = 10
+    cursor_ordering = ("-last_message", "id")
 
     def get_queryset(self):
-        qs = (ChatRoom.objects.filter(members=self.request.user)
+        qs = (super().get_queryset()
+              .filter(members=self.request.user)
               .annotate(last_message=Max("chats__timestamp"))
-              .order_by("-last_message")
+              .order_by("-last_message", "id")
               .distinct())
         return qs
 
@@ -347,12 +396,13 @@ class ChatRoomListView(LoginRequiredMixin, OrganizationScopedMixin, generic.List
 
         return context
 
-class CommentListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListView):
+class CommentListView(LoginRequiredMixin, OrganizationScopedMixin, SearchRankOrderingMixin, CursorPaginationMixin, generic.ListView):
     model = Comment
     template_name = "management/comment_list.html"
     context_object_name = "comment_list"
-    queryset = model.objects.order_by("-created_at")
+    queryset = model.objects.select_related("worker", "task").order_by("-created_at")
     paginate_by = 10
+    cursor_ordering = ("-created_at", "-id")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -364,82 +414,77 @@ class CommentListView(LoginRequiredMixin, OrganizationScopedMixin, generic.ListV
 
     def get_queryset(self):
         form = SearchForm(self.request.GET)
-        qs = super().get_queryset()
-        if form.is_valid():
-            query = form.cleaned_data.get("query")
-            if query:
-                qs = qs.filter(
-                    Q(worker__username__icontains=query) |
-                    Q(worker__first_name__icontains=query) |
-                    Q(worker__last_name__icontains=query) |
-                    Q(task__name__icontains=query)
-                )
-        return qs.exclude(worker=self.request.user).filter(task__workers=self.request.user)
+        qs = super().get_queryset().exclude(worker=self.request.user).filter(task__workers=self.request.user)
+        return form.search(qs, request_org_id(self.request))
+
+
+def calendar_month(request):
+    """The (year, month) of ?year=&month=, defaulting to the current month."""
+    today = date.today()
+    return int(request.GET.get("year", today.year)), int(request.GET.get("month", today.month))
+
+
+def calendar_context(request, year, month, tasks):
+    start_date = date.today()
+    num_days = calendar.monthrange(year, month)[1]
+    days = [date(year, month, day) for day in range(1, num_days + 1)]
+
+    tasks_by_day = group_by_day(tasks, days)
+
+    first_day = date(year, month, 1)
+    num_padding_days = first_day.weekday()
+    prev_month_last_day = first_day - timedelta(days=1)
+    next_month_first_day = date(year, month, num_days) + timedelta(days=1)
+    selected_day_str = request.GET.get("day")
+    if selected_day_str:
+        selected_day = datetime.strptime(selected_day_str, "%Y-%m-%d").date()
+    else:
+        selected_day = start_date
+
+    padded_days = [None] * num_padding_days + days
+    weeks = [padded_days[i:i + 7] for i in range(0, len(padded_days), 7)]
+    weekday_names = [calendar.day_abbr[i] for i in range(7)]
+    month_name = calendar.month_name[month]
+    return {
+        "days": days,
+        "tasks_by_day": tasks_by_day,
+        "month": month,
+        "month_name": month_name,
+        "year": year,
+        "num_padding_days": num_padding_days,
+        "prev_month": {
+            "month": prev_month_last_day.month,
+            "year": prev_month_last_day.year,
+        },
+        "next_month": {
+            "month": next_month_first_day.month,
+            "year": next_month_first_day.year,
+        },
+        "now": start_date,
+        "selected_day": selected_day,
+        "weeks": weeks,
+        'weekday_names': weekday_names,
+    }
 
 
 class CalendarView(TemplateView):
     def get_context_data(self, **kwargs):
         selected_project = kwargs.get("selected_project")
         context = super().get_context_data(**kwargs)
-
-        start_date = date.today()
-        month = int(self.request.GET.get("month", start_date.month))
-        year = int(self.request.GET.get("year", start_date.year))
-
-        num_days = calendar.monthrange(year, month)[1]
-        days = [date(year, month, day) for day in range(1, num_days + 1)]
+        year, month = calendar_month(self.request)
 
         user = self.request.user
         if user.is_authenticated:
-            tasks = Task.objects.filter(
-                deadline__date__gte=days[0],
-                deadline__date__lte=days[-1],
-                workers=user,
-            ).order_by("deadline")
-        else:
-            tasks = Task.objects.none()
-
-        if selected_project:
-            tasks = tasks.filter(project=selected_project)
-
-        tasks_by_day = {d: [] for d in days}
-        for task in tasks:
-            tasks_by_day[task.deadline.date()].append(task)
-
-        first_day = date(year, month, 1)
-        num_padding_days = first_day.weekday()
-        prev_month_last_day = first_day - timedelta(days=1)
-        next_month_first_day = date(year, month, num_days) + timedelta(days=1)
-        selected_day_str = self.request.GET.get("day")
-        if selected_day_str:
-            selected_day = datetime.strptime(selected_day_str, "%Y-%m-%d").date()
+            tasks = get_month_tasks(
+                user.id,
+                year,
+                month,
+                selected_project.id if selected_project else None,
+            )
         else:
-            selected_day = start_date
-
-        padded_days = [None] * num_padding_days + days
-        weeks = [padded_days[i:i + 7] for i in range(0, len(padded_days), 7)]
-        weekday_names = [calendar.day_abbr[i] for i in range(7)]
-        month_name = calendar.month_name[month]
-        context.update({
-            "days": days,
-            "tasks_by_day": tasks_by_day,
-            "month": month,
-            "month_name": month_name,
-            "year": year,
-            "num_padding_days": num_padding_days,
-            "prev_month": {
-                "month": prev_month_last_day.month,
-                "year": prev_month_last_day.year,
-            },
-            "next_month": {
-                "month": next_month_first_day.month,
-                "year": next_month_first_day.year,
-            },
-            "now": start_date,
-            "selected_day": selected_day,
-            "weeks": weeks,
-            'weekday_names': weekday_names,
-        })
+            tasks = []
+
+        context.update(calendar_context(self.request, year, month, tasks))
         return context
 
 
@@ -473,14 +518,14 @@ class OrganizationCreateView(LoginRequiredMixin, OrganizationScopedMixin, generi
     fields = "__all__"
     template_name = "management/organization_form.html"
 
-class TaskCreateView(LoginRequiredMixin, OrganizationScopedMixin, generic.CreateView):
+class TaskCreateView(LoginRequiredMixin, OrganizationScopedMixin, OrganizationWorkersFormMixin, generic.CreateView):
     model = Task
     form_class = TaskForm
     template_name = "management/task_form.html"
     success_url = reverse_lazy("management:task-list")
 
     def form_valid(self, form):
-        form.instance.organization = self.request.user.organization
+        form.instance.organization_id = request_org_id(self.request)
         return super().form_valid(form)
 
 class ProjectCreateView(LoginRequiredMixin, OrganizationScopedMixin, generic.CreateView):
@@ -488,48 +533,48 @@ class ProjectCreateView(LoginRequiredMixin, OrganizationScopedMixin, generic.Cre
     form_class = ProjectForm
     template_name = "management/project_form.html"
     def form_valid(self, form):
-        form.instance.organization = self.request.user.organization
+        form.instance.organization_id = request_org_id(self.request)
         return super().form_valid(form)
 
-class TeamCreateView(LoginRequiredMixin, OrganizationScopedMixin, generic.CreateView):
+class TeamCreateView(LoginRequiredMixin, OrganizationScopedMixin, OrganizationWorkersFormMixin, generic.CreateView):
     model = Team
     form_class = TeamForm
     template_name = "management/team_form.html"
     def form_valid(self, form):
-        form.instance.organization = self.request.user.organization
+        form.instance.organization_id = request_org_id(self.request)
         return super().form_valid(form)
 class ChatRoomCreateView(LoginRequiredMixin, OrganizationScopedMixin, View):
-    def get(self, request):
-        group_form = ChatGroupForm()
-        workers = Worker.objects.exclude(id=request.user.id)
+    def render_forms(self, request, group_form=None, private_form=None):
+        organization_id = request_org_id(request)
         return render(request, "management/chat_form.html", {
-            "group_form": group_form,
-            "workers": workers,
+            "group_form": group_form or ChatGroupForm(organization_id=organization_id),
+            "private_form": private_form or PrivateChatForm(organization_id=organization_id),
         })
 
+    def get(self, request):
+        return self.render_forms(request)
+
     def post(self, request):
         if "create_group" in request.POST:
-            form = ChatGroupForm(request.POST)
+            form = ChatGroupForm(request.POST, organization_id=request_org_id(request))
             if form.is_valid():
                 chat = form.save(commit=False)
-                chat.organization = request.user.organization
+                chat.organization_id = request_org_id(request)
                 chat.save()
                 form.save_m2m()
                 return redirect("management:chat-list")
-            workers = Worker.objects.exclude(id=request.user.id)
-            return render(request, "management/chat_form.html", {
-                "group_form": form,
-                "workers": workers,
-            })
+            return self.render_forms(request, group_form=form)
         if "start_private" in request.POST:
             return self.start_private(request)
 
         return redirect("management:chat-create")
 
     def start_private(self, request):
-        worker_id = request.POST.get("worker_id")
+        form = PrivateChatForm(request.POST, organization_id=request_org_id(request))
+        if not form.is_valid():
+            return self.render_forms(request, private_form=form)
         user1 = request.user
-        user2 = Worker.objects.get(pk=worker_id)
+        user2 = form.cleaned_data["worker_id"]
 
         chats = (
             ChatRoom.objects
@@ -544,7 +589,7 @@ class ChatRoomCreateView(LoginRequiredMixin, OrganizationScopedMixin, View):
 
         chat = ChatRoom.objects.create(
             name=f"private_{user1.id}_{user2.id}",
-            organization=request.user.organization,
+            organization_id=request_org_id(request),
         )
         chat.members.add(user1, user2)
         return redirect("management:chat-list")
@@ -552,16 +597,16 @@ class ChatRoomCreateView(LoginRequiredMixin, OrganizationScopedMixin, View):
 
 @login_required
 def add_comment(request, task_id):
-    task = Task.objects.get(id=task_id)
+    task = get_object_or_404(Task, id=task_id, organization_id=request_org_id(request))
     if request.method == "POST":
         form = CommentForm(request.POST)
         if form.is_valid():
             comment = form.save(commit=False)
             comment.task = task
             comment.worker = request.user
-            comment.organization = task.project.organization
+            comment.organization_id = request_org_id(request)
             comment.save()
-    return redirect("management:project-detail", pk=task.project.pk)
+    return redirect("management:project-detail", pk=task.project_id)
 
 
 #----UPDATE VIEWS----
@@ -571,7 +616,7 @@ class WorkerUpdateView(LoginRequiredMixin, OrganizationScopedMixin, generic.Upda
     success_url = reverse_lazy("management:worker-list")
 
     def form_valid(self, form):
-        form.instance.organization = self.request.user.organization
+        form.instance.organization_id = request_org_id(self.request)
         return super().form_valid(form)
 
 
@@ -580,17 +625,17 @@ class ProjectUpdateView(LoginRequiredMixin, OrganizationScopedMixin, generic.Upd
     form_class = ProjectForm
     success_url = reverse_lazy("management:project-list")
 
-class TaskUpdateView(LoginRequiredMixin, OrganizationScopedMixin, generic.UpdateView):
+class TaskUpdateView(LoginRequiredMixin, OrganizationScopedMixin, OrganizationWorkersFormMixin, generic.UpdateView):
     model = Task
     form_class = TaskForm
     template_name = "management/task_form.html"
     success_url = reverse_lazy("management:task-list")
 
     def form_valid(self, form):
-        form.instance.organization = self.request.user.organization
+        form.instance.organization_id = request_org_id(self.request)
         return super().form_valid(form)
 
-class TeamUpdateView(LoginRequiredMixin, OrganizationScopedMixin, generic.UpdateView):
+class TeamUpdateView(LoginRequiredMixin, OrganizationScopedMixin, OrganizationWorkersFormMixin, generic.UpdateView):
     model = Team
     form_class = TeamForm
     template_name = "management/team_form.html"
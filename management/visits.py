@@ -0,0 +1,105 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from management.models import Worker, WorkerStats
+
+logger = logging.getLogger(__name__)
+
+
+class VisitCounter:
+    """
+    Counts dashboard visits per worker in memory and adds them to WorkerStats
+    from a background timer every `interval` seconds, so page views do not write.
+    Whatever is left is written when the process exits.
+    """
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, worker_id):
+        with self._lock:
+            count, _ = self._pending.get(worker_id, (0, None))
+            self._pending[worker_id] = (count + 1, timezone.now())
+            if self._timer is None and self.interval:
+                self._timer = threading.Timer(self.interval, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def clear(self):
+        self._take()
+
+    def pending(self, worker_id):
+        """Visits of a worker recorded since the last flush."""
+        return self._pending.get(worker_id, (0, None))[0]
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+        close_old_connections()
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def _take(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _restore(self, pending):
+        with self._lock:
+            for worker_id, (count, last) in pending.items():
+                current, current_last = self._pending.get(worker_id, (0, None))
+                self._pending[worker_id] = (current + count, current_last or last)
+
+    def _write(self, pending):
+        existing = set(Worker.objects.filter(pk__in=pending).values_list("pk", flat=True))
+        with transaction.atomic():
+            WorkerStats.objects.bulk_create(
+                [WorkerStats(worker_id=worker_id) for worker_id in existing],
+                ignore_conflicts=True,
+            )
+            for worker_id in existing:
+                count, last = pending[worker_id]
+                WorkerStats.objects.filter(pk=worker_id).update(
+                    dashboard_visits=F("dashboard_visits") + count,
+                    last_visit_at=last,
+                )
+
+    def flush(self):
+        pending = self._take()
+        if not pending:
+            return
+        try:
+            self._write(pending)
+        except DatabaseError:
+            logger.warning("Could not save visits of %d workers, keeping them for the next flush", len(pending))
+            self._restore(pending)
+
+
+visit_counter = VisitCounter(interval=settings.VISIT_FLUSH_INTERVAL)
+
+
+def visit_count(worker_id):
+    """Saved plus not yet flushed dashboard visits of a worker."""
+    saved = WorkerStats.objects.filter(pk=worker_id).values_list("dashboard_visits", flat=True).first()
+    return (saved or 0) + visit_counter.pending(worker_id)
+
+
+async def avisit_count(worker_id):
+    """visit_count() with the async ORM."""
+    saved = await WorkerStats.objects.filter(pk=worker_id).values_list("dashboard_visits", flat=True).afirst()
+    return (saved or 0) + visit_counter.pending(worker_id)